@@ -19,6 +19,7 @@
 """Command interface."""
 
 import abc
+from typing import Optional
 
 
 class Command(abc.ABC):
@@ -30,7 +31,7 @@ class Command(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def execute(self, source: str, round: int, **kwargs) -> None:
+    def execute(self, source: str, round: int, **kwargs) -> Optional[bool]:
         """
         Execute the command.
 
@@ -39,5 +40,24 @@ class Command(abc.ABC):
             round: The round of the command.
             **kwargs: The command arguments.
 
+        Returns:
+            Weights commands return True if the weights have been taken (or were not needed anymore), so duplicates of
+            them can be skipped. Other commands return None.
+
         """
         raise NotImplementedError
+
+    def admit(self, source: str, round: int, **kwargs) -> bool:
+        """
+        Check if the command would take the weights of a message, before they are decoded (or received).
+
+        Args:
+            source: The source of the command.
+            round: The round of the command.
+            **kwargs: The command arguments (without the weights).
+
+        Returns:
+            False if the message can be discarded.
+
+        """
+        return True
@@ -0,0 +1,99 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""AsyncUpdateCommand command."""
+
+from typing import Callable, List, Optional, Union
+
+from p2pfl.communication.commands.command import Command
+from p2pfl.learning.aggregators.aggregator import Aggregator
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError, ModelNotMatchingError
+from p2pfl.learning.frameworks.learner import Learner
+from p2pfl.management.logger import logger
+from p2pfl.node_state import NodeState
+
+
+class AsyncUpdateCommand(Command):
+    """
+    Update of a node in an asynchronous aggregation (FedBuff).
+
+    The round of the message is the round of the model the update started from. Updates are buffered by the aggregator
+    whatever their round, as it only changes their staleness.
+    """
+
+    def __init__(
+        self,
+        state: NodeState,
+        stop: Callable[[], None],
+        aggregator: Aggregator,
+        learner: Learner,
+    ) -> None:
+        """Initialize AsyncUpdateCommand."""
+        self.state = state
+        self.stop = stop
+        self.aggregator = aggregator
+        self.learner = learner
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the command name."""
+        return "async_update"
+
+    def admit(self, source: str, round: int, contributors: Optional[List[str]] = None, **kwargs) -> bool:
+        """Check, before decoding the weights, if the node is running an asynchronous aggregation."""
+        return self.state.round is not None and self.aggregator.asynchronous and bool(contributors)
+
+    def execute(
+        self,
+        source: str,
+        round: int,
+        weights: Optional[Union[bytes, bytearray]] = None,
+        contributors: Optional[List[str]] = None,
+        num_samples: Optional[int] = None,
+        **kwargs,
+    ) -> bool:
+        """Execute the command. Returns True if the update has been buffered."""
+        if weights is None or contributors is None or num_samples is None:
+            raise ValueError("Weights, contributors and weight are required")
+
+        if not self.admit(source, round, contributors):
+            logger.debug(self.state.addr, f"Update from {source} discarded (no asynchronous aggregation running).")
+            return False
+
+        try:
+            update = self.learner.get_model().build_detached_copy(
+                params=weights,
+                num_samples=num_samples,
+                contributors=list(contributors),
+            )
+            self.aggregator.add_update(update, round)
+            return True
+
+        # Warning: these stops can cause a denegation of service attack
+        except DecodingParamsError:
+            logger.error(self.state.addr, "Error decoding parameters.")
+            self.stop()
+
+        except ModelNotMatchingError:
+            logger.error(self.state.addr, "Models not matching.")
+            self.stop()
+
+        except Exception as e:
+            logger.error(self.state.addr, f"Unknown error adding update: {e}")
+            self.stop()
+        return False
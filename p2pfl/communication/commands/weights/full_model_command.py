@@ -21,8 +21,10 @@
 from typing import Callable, Optional
 
 from p2pfl.communication.commands.command import Command
+from p2pfl.communication.commands.message.delta_base_missing_command import DeltaBaseMissingCommand
+from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
 from p2pfl.learning.aggregators.aggregator import Aggregator
-from p2pfl.learning.frameworks.exceptions import DecodingParamsError, ModelNotMatchingError
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError, DeltaBaseMissingError, ModelNotMatchingError
 from p2pfl.learning.frameworks.learner import Learner
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
@@ -31,11 +33,19 @@ from p2pfl.node_state import NodeState
 class FullModelCommand(Command):
     """FullModelCommand."""
 
-    def __init__(self, state: NodeState, stop: Callable[[], None], aggregator: Aggregator, learner: Learner) -> None:
+    def __init__(
+        self,
+        state: NodeState,
+        stop: Callable[[], None],
+        aggregator: Aggregator,
+        comm_proto: CommunicationProtocol,
+        learner: Learner,
+    ) -> None:
         """Initialize FullModelCommand."""
         self.state = state
         self.stop = stop
         self.aggregator = aggregator
+        self.communication_protocol = comm_proto
         self.learner = learner
 
     @staticmethod
@@ -43,14 +53,18 @@ class FullModelCommand(Command):
         """Get the command name."""
         return "add_model"
 
+    def admit(self, source: str, round: int, **kwargs) -> bool:
+        """Check, before decoding the weights, if the aggregated model of the round is still expected."""
+        return self.state.round is not None and round == self.state.round and not self.state.aggregated_model_event.is_set()
+
     def execute(
         self,
         source: str,
         round: int,
         weights: Optional[bytes] = None,
         **kwargs,
-    ) -> None:
-        """Execute the command."""
+    ) -> bool:
+        """Execute the command. Returns True if the weights have been taken (or were not needed anymore)."""
         if weights is None:
             raise ValueError("Weights, contributors and weight are required")
 
@@ -62,16 +76,24 @@ class FullModelCommand(Command):
                     self.state.addr,
                     f"Model reception in a late round ({round} != {self.state.round}).",
                 )
-                return
+                return False
             if self.state.aggregated_model_event.is_set():
                 logger.debug(self.state.addr, "😲 Aggregated model not expected.")
-                return
+                return True
             try:
                 logger.info(self.state.addr, "📦 Aggregated model received.")
                 # Decode and set model
                 self.learner.set_model(weights)
                 # Release here caused the simulation to crash before
                 self.state.aggregated_model_event.set()
+                return True
+
+            # Ask for full weights
+            except DeltaBaseMissingError:
+                logger.warning(self.state.addr, "⚠️ Base model of the delta not available. Requesting full weights.")
+                self.communication_protocol.broadcast(
+                    self.communication_protocol.build_msg(DeltaBaseMissingCommand.get_name(), round=self.state.round)
+                )
 
             # Warning: these stops can cause a denegation of service attack
             except DecodingParamsError:
@@ -87,3 +109,4 @@ class FullModelCommand(Command):
                 self.stop()
         else:
             logger.debug(self.state.addr, "❌ Tried to add a model while learning is not running")
+        return False
@@ -43,17 +43,21 @@ class InitModelCommand(Command):
         """Get the command name."""
         return "init_model"
 
+    def admit(self, source: str, round: int, **kwargs) -> bool:
+        """Check, before decoding the weights, if the model is still waiting to be initialized."""
+        return self.state.round is not None and round == self.state.round and self.state.model_initialized_lock.locked()
+
     def execute(
         self,
         source: str,
         round: int,
         weights: Optional[bytes] = None,
         **kwargs,
-    ) -> None:
-        """Execute the command."""
+    ) -> bool:
+        """Execute the command. Returns True if the weights have been taken (or were not needed anymore)."""
         if weights is None:
             logger.error(self.state.addr, "Invalid InitModelCommand message")
-            return
+            return False
 
         # Check if Learning is running
         if self.state.round is not None:
@@ -63,7 +67,7 @@ class InitModelCommand(Command):
                     self.state.addr,
                     f"Model initiallization in a late round ({round} != {self.state.round}).",
                 )
-                return
+                return False
 
             # Check moment (not init and invalid round)
             if not self.state.model_initialized_lock.locked():
@@ -71,7 +75,7 @@ class InitModelCommand(Command):
                     self.state.addr,
                     "Model initizalization message when the model is already initialized. Ignored.",
                 )
-                return
+                return True
 
             try:
                 # Set new weights
@@ -79,6 +83,7 @@ class InitModelCommand(Command):
                 # Release lock
                 self.state.model_initialized_lock.release()
                 logger.info(self.state.addr, "🤖 Model Weights Initialized")
+                return True
 
             # Warning: these stops can cause a denegation of service attack
             except DecodingParamsError:
@@ -95,3 +100,4 @@ class InitModelCommand(Command):
 
         else:
             logger.debug(self.state.addr, "Tried to add a model while learning is not running")
+        return False
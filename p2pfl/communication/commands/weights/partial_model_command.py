@@ -21,10 +21,11 @@
 from typing import Callable, List, Optional
 
 from p2pfl.communication.commands.command import Command
+from p2pfl.communication.commands.message.delta_base_missing_command import DeltaBaseMissingCommand
 from p2pfl.communication.commands.message.models_agregated_command import ModelsAggregatedCommand
 from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
 from p2pfl.learning.aggregators.aggregator import Aggregator
-from p2pfl.learning.frameworks.exceptions import DecodingParamsError, ModelNotMatchingError
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError, DeltaBaseMissingError, ModelNotMatchingError
 from p2pfl.learning.frameworks.learner import Learner
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
@@ -53,6 +54,16 @@ class PartialModelCommand(Command):
         """Get the command name."""
         return "partial_model"
 
+    def admit(self, source: str, round: int, contributors: Optional[List[str]] = None, **kwargs) -> bool:
+        """Check, before decoding the weights, if the model is needed for the aggregation of the round."""
+        return (
+            self.state.round is not None
+            and round == self.state.round
+            and len(self.state.train_set) > 0
+            and contributors is not None
+            and self.aggregator.is_model_needed(list(contributors))
+        )
+
     def execute(
         self,
         source: str,
@@ -61,8 +72,8 @@ class PartialModelCommand(Command):
         contributors: Optional[List[str]] = None,  # TIPO ESTA MAL (NECESARIO CASTEARLO AL LLAMAR)
         num_samples: Optional[int] = None,
         **kwargs,
-    ) -> None:
-        """Execute the command."""
+    ) -> bool:
+        """Execute the command. Returns True if the weights have been taken (or were not needed anymore)."""
         if weights is None or contributors is None or num_samples is None:
             raise ValueError("Weights, contributors and weight are required")
 
@@ -74,16 +85,25 @@ class PartialModelCommand(Command):
                     self.state.addr,
                     f"Model reception in a late round ({round} != {self.state.round}).",
                 )
-                return
+                return False
 
             # Check moment (not init and invalid round)
             if len(self.state.train_set) == 0:
                 logger.error(self.state.addr, "Model Reception when there is no trainset")
-                return
+                return False
+
+            # Check contributors before decoding
+            if not self.aggregator.is_model_needed(list(contributors)):
+                logger.debug(self.state.addr, f"🙅 Model from {list(contributors)} not needed. Discarded before decoding.")
+                return False
 
             try:
                 # Add model to aggregator
-                model = self.laerner.get_model().build_copy(params=weights, num_samples=num_samples, contributors=list(contributors))
+                model = self.laerner.get_model().build_detached_copy(
+                    params=weights,
+                    num_samples=num_samples,
+                    contributors=list(contributors),
+                )
                 models_added = self.aggregator.add_model(model)
                 if models_added != []:
                     # Communicate Aggregation
@@ -94,6 +114,14 @@ class PartialModelCommand(Command):
                             round=self.state.round,
                         )
                     )
+                    return True
+
+            # Ask for full weights
+            except DeltaBaseMissingError:
+                logger.warning(self.state.addr, "Base model of the delta not available. Requesting full weights.")
+                self.communication_protocol.broadcast(
+                    self.communication_protocol.build_msg(DeltaBaseMissingCommand.get_name(), round=self.state.round)
+                )
 
             # Warning: these stops can cause a denegation of service attack
             except DecodingParamsError:
@@ -110,3 +138,4 @@ class PartialModelCommand(Command):
 
         else:
             logger.debug(self.state.addr, "Tried to add a model while learning is not running")
+        return False
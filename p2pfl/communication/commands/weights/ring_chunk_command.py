@@ -0,0 +1,83 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Ring all-reduce chunk commands."""
+
+from typing import List, Optional, Union
+
+from p2pfl.communication.commands.command import Command
+from p2pfl.management.logger import logger
+from p2pfl.node_state import NodeState
+
+
+class RingReduceScatterCommand(Command):
+    """
+    Chunk of the reduce-scatter phase of a ring all-reduce (partial sum of a chunk of the weighted parameters).
+
+    Chunks are stored in the node state until the ring all-reduce stage reaches their step.
+    """
+
+    def __init__(self, state: NodeState) -> None:
+        """Initialize the command."""
+        self.state = state
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the command name."""
+        return "ring_reduce_scatter"
+
+    def admit(self, source: str, round: int, **kwargs) -> bool:
+        """Check, before decoding the chunk, that it is not from a past round (neighbors can be a round ahead)."""
+        return self.state.round is not None and round >= self.state.round
+
+    def execute(
+        self,
+        source: str,
+        round: int,
+        weights: Optional[Union[bytes, bytearray]] = None,
+        contributors: Optional[List[str]] = None,
+        num_samples: Optional[int] = None,
+        chunk_index: int = 0,
+        **kwargs,
+    ) -> bool:
+        """
+        Execute the command.
+
+        Chunks are sent once and equal payloads can carry different chunks, so they are never reported as taken.
+
+        """
+        if weights is None or contributors is None or num_samples is None:
+            raise ValueError("Weights, contributors and weight are required")
+
+        if not self.admit(source, round):
+            logger.debug(self.state.addr, f"Ring chunk from {source} discarded (round {round}, current {self.state.round}).")
+            return False
+
+        with self.state.ring_chunks_condition:
+            self.state.ring_chunks[(round, self.get_name(), chunk_index)] = (weights, list(contributors), num_samples)
+            self.state.ring_chunks_condition.notify_all()
+        return False
+
+
+class RingAllGatherCommand(RingReduceScatterCommand):
+    """Chunk of the all-gather phase of a ring all-reduce (aggregated chunk of the weighted parameters)."""
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the command name."""
+        return "ring_all_gather"
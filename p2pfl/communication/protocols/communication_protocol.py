@@ -75,7 +75,13 @@ class CommunicationProtocol(ABC):
 
     @abstractmethod
     def build_weights(
-        self, cmd: str, round: int, serialized_model: bytes, contributors: Optional[List[str]] = None, weight: int = 1
+        self,
+        cmd: str,
+        round: int,
+        serialized_model: bytes,
+        contributors: Optional[List[str]] = None,
+        weight: int = 1,
+        chunk_index: int = 0,
     ) -> Any:
         """
         Build weights.
@@ -86,6 +92,7 @@ class CommunicationProtocol(ABC):
             serialized_model: The serialized model.
             contributors: The model contributors.
             weight: The weight of the model (amount of samples used).
+            chunk_index: Index of the chunk of the parameters, if only a chunk is sent (e.g. ring all-reduce).
 
         """
         pass
@@ -97,6 +104,7 @@ class CommunicationProtocol(ABC):
         msg: Any,
         raise_error: bool = False,
         remove_on_error: bool = True,
+        create_connection: bool = False,
     ) -> None:
         """
         Send a message to a neighbor.
@@ -106,6 +114,7 @@ class CommunicationProtocol(ABC):
             msg: The message to send.
             raise_error: If raise error.
             remove_on_error: If remove on error.
+            create_connection: Create a temporary connection if the neighbor is not directly connected.
 
         """
         pass
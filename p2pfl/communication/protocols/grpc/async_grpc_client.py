@@ -0,0 +1,181 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""asyncio GRPC client."""
+
+import asyncio
+from typing import List, Optional
+
+import grpc
+
+from p2pfl.communication.protocols.exceptions import CommunicationError, NeighborNotConnectedError
+from p2pfl.communication.protocols.grpc.async_grpc_neighbors import AsyncGrpcNeighbors, create_channel
+from p2pfl.communication.protocols.grpc.event_loop import run_blocking, run_coroutine
+from p2pfl.communication.protocols.grpc.grpc_client import GrpcClient
+from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+
+class AsyncGrpcClient(GrpcClient):
+    """
+    Client side of the asyncio GRPC communication protocol.
+
+    Messages are sent from the event loop: sending does not block the caller (unless it needs the outcome) and
+    broadcasts reach all the neighbors concurrently.
+
+    Args:
+        self_addr: Address of the node.
+        neighbors: Neighbors of the node.
+
+    """
+
+    def __init__(self, self_addr: str, neighbors: AsyncGrpcNeighbors) -> None:
+        """Initialize the asyncio GRPC client."""
+        super().__init__(self_addr, neighbors)
+        self.__self_addr = self_addr
+        self.__neighbors = neighbors
+
+    ####
+    # Message Sending
+    ####
+
+    def send(
+        self,
+        nei: str,
+        msg: node_pb2.RootMessage,
+        create_connection: bool = False,
+        raise_error: bool = False,
+        remove_on_error: bool = True,
+    ) -> None:
+        """
+        Send a message to a neighbor.
+
+        Only waits for the message to be delivered if errors are raised or the message carries weights (so model
+        gossip keeps the pace of the network).
+
+        Args:
+            nei: Neighbor address.
+            msg: Message to send.
+            create_connection: Create a connection if not exists.
+            raise_error: Raise error if an error occurs.
+            remove_on_error: Remove neighbor if an error occurs.
+
+        """
+        future = run_coroutine(self.send_async(nei, msg, create_connection, raise_error, remove_on_error))
+        if raise_error or msg.HasField("weights"):
+            future.result()
+
+    async def send_async(
+        self,
+        nei: str,
+        msg: node_pb2.RootMessage,
+        create_connection: bool = False,
+        raise_error: bool = False,
+        remove_on_error: bool = True,
+    ) -> None:
+        """
+        Send a message to a neighbor. Must be awaited in the event loop.
+
+        Args:
+            nei: Neighbor address.
+            msg: Message to send.
+            create_connection: Create a connection if not exists.
+            raise_error: Raise error if an error occurs.
+            remove_on_error: Remove neighbor if an error occurs.
+
+        """
+        channel = None
+        try:
+            # Get neighbor
+            try:
+                node_stub = self.__neighbors.get(nei)[1]
+            except KeyError as e:
+                raise NeighborNotConnectedError(f"Neighbor {nei} not found.") from e
+
+            # Check if direct connection
+            if node_stub is None and create_connection:
+                channel = create_channel(nei)
+                node_stub = node_pb2_grpc.NodeServicesStub(channel)
+
+            # Compress weights
+            compression = self.__neighbors.get_compression(nei)
+            if compression and msg.HasField("weights"):
+                msg = await run_blocking(self._compress_weights, msg, compression)
+
+            # Send
+            if node_stub is not None:
+                # Send message (large models are streamed in chunks)
+                if msg.HasField("weights") and len(msg.weights.weights) > Settings.GRPC_CHUNK_SIZE:
+                    res = await self.__send_stream(node_stub, msg)
+                else:
+                    res = await node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT)
+            else:
+                raise NeighborNotConnectedError("Neighbor not directly connected (Stub not defined and create_connection is false).")
+            if res.error:
+                raise CommunicationError(f"Error while sending a message: {msg.cmd}: {res.error}")
+        except Exception as e:
+            # Remove neighbor
+            logger.info(
+                self.__self_addr,
+                f"Cannot send message {msg.cmd} to {nei}. Error: {str(e)}",
+            )
+            if remove_on_error:
+                await run_blocking(self.__neighbors.remove, nei, disconnect_msg=True)
+            # Re-raise
+            if raise_error:
+                raise e
+
+        finally:
+            if channel is not None:
+                await channel.close()
+
+    async def __send_stream(self, node_stub: node_pb2_grpc.NodeServicesStub, msg: node_pb2.RootMessage) -> node_pb2.ResponseMessage:
+        try:
+            return await node_stub.send_stream(self._chunk_weights(msg), timeout=Settings.GRPC_TIMEOUT)
+        except grpc.RpcError as e:
+            # Neighbors without the streaming RPC
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                return await node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT)
+            raise e
+
+    def broadcast(self, msg: node_pb2.RootMessage, node_list: Optional[List[str]] = None) -> None:
+        """
+        Broadcast a message to all the neighbors, concurrently and without waiting for the deliveries.
+
+        Args:
+            msg: Message to send.
+            node_list: List of neighbors to send the message. If None, send to all the neighbors.
+
+        """
+        # Node list
+        nodes = node_list if node_list is not None else list(self.__neighbors.get_all(only_direct=True).keys())
+
+        # Send
+        run_coroutine(self.broadcast_async(msg, nodes))
+
+    async def broadcast_async(self, msg: node_pb2.RootMessage, node_list: List[str]) -> None:
+        """
+        Send a message to several neighbors concurrently. Must be awaited in the event loop.
+
+        Args:
+            msg: Message to send.
+            node_list: List of neighbors to send the message.
+
+        """
+        await asyncio.gather(*[self.send_async(n, msg) for n in node_list])
@@ -0,0 +1,68 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""asyncio GRPC communication protocol."""
+
+from typing import List, Optional
+
+from p2pfl.communication.commands.command import Command
+from p2pfl.communication.commands.message.heartbeat_command import HeartbeatCommand
+from p2pfl.communication.protocols.gossiper import Gossiper
+from p2pfl.communication.protocols.grpc.address import AddressParser
+from p2pfl.communication.protocols.grpc.async_grpc_client import AsyncGrpcClient
+from p2pfl.communication.protocols.grpc.async_grpc_neighbors import AsyncGrpcNeighbors
+from p2pfl.communication.protocols.grpc.async_grpc_server import AsyncGrpcServer
+from p2pfl.communication.protocols.grpc.grpc_communication_protocol import GrpcCommunicationProtocol
+from p2pfl.communication.protocols.heartbeater import Heartbeater
+
+
+class AsyncGrpcCommunicationProtocol(GrpcCommunicationProtocol):
+    """
+    GRPC communication protocol built on ``grpc.aio``.
+
+    Servers, channels and sends of all the nodes of the process run in a single event loop, and the rest of the
+    blocking work runs in a pool of threads shared by the nodes (``Settings.GRPC_ASYNC_WORKERS``), so requests waiting
+    for a command do not hold threads. Sends do not block the caller and broadcasts are sent concurrently. It is
+    compatible with :class:`GrpcCommunicationProtocol` nodes.
+
+    Args:
+        addr: Address of the node.
+        commands: Commands to add to the communication protocol.
+
+    """
+
+    def __init__(self, addr: str = "127.0.0.1", commands: Optional[List[Command]] = None) -> None:
+        """Initialize the asyncio GRPC communication protocol."""
+        # Parse IP address
+        parsed_address = AddressParser(addr)
+        self.addr = parsed_address.get_parsed_address()
+        # Neighbors
+        self._neighbors = AsyncGrpcNeighbors(self.addr)
+        # GRPC Client
+        self._client = AsyncGrpcClient(self.addr, self._neighbors)
+        # Gossip
+        self._gossiper = Gossiper(self.addr, self._client)
+        # GRPC
+        self._server = AsyncGrpcServer(self.addr, self._gossiper, self._neighbors, commands)
+        # Hearbeat
+        self._heartbeater = Heartbeater(self.addr, self._neighbors, self._client)
+        # Commands
+        self.add_command(HeartbeatCommand(self._heartbeater))
+        if commands is None:
+            commands = []
+        self.add_command(commands)
@@ -0,0 +1,130 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""asyncio gRPC neighbors."""
+
+import time
+from os.path import isfile
+from typing import Optional, Tuple
+
+import grpc
+
+from p2pfl.communication.protocols.grpc.compression import get_supported_compressions
+from p2pfl.communication.protocols.grpc.event_loop import run_coroutine
+from p2pfl.communication.protocols.grpc.grpc_neighbors import GrpcNeighbors
+from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+
+def create_channel(addr: str) -> grpc.aio.Channel:
+    """
+    Create an asyncio channel to a node (with mutual TLS if enabled). Must be called from the event loop.
+
+    Args:
+        addr: Address of the node.
+
+    """
+    if Settings.USE_SSL and isfile(Settings.SERVER_CRT):
+        with open(Settings.CLIENT_KEY) as key_file, open(Settings.CLIENT_CRT) as crt_file, open(Settings.CA_CRT) as ca_file:
+            private_key = key_file.read().encode()
+            certificate_chain = crt_file.read().encode()
+            root_certificates = ca_file.read().encode()
+        creds = grpc.ssl_channel_credentials(
+            root_certificates=root_certificates, private_key=private_key, certificate_chain=certificate_chain
+        )
+        return grpc.aio.secure_channel(addr, creds)
+    return grpc.aio.insecure_channel(addr)
+
+
+class AsyncGrpcNeighbors(GrpcNeighbors):
+    """
+    Neighbors of the asyncio GRPC communication protocol. Channels and stubs are bound to the event loop.
+
+    Args:
+        self_addr: Address of the node.
+
+    """
+
+    def connect(
+        self, addr: str, non_direct: bool = False, handshake_msg: bool = True
+    ) -> Tuple[Optional[grpc.aio.Channel], Optional[node_pb2_grpc.NodeServicesStub], float]:
+        """
+        Connect to a neighbor. Blocks until the handshake finishes, so it must not be called from the event loop.
+
+        Args:
+            addr: Address of the neighbor to connect.
+            non_direct: If the connection is direct or not.
+            handshake_msg: If a handshake message is needed.
+
+        """
+        if non_direct:
+            logger.debug(self.self_addr, f"🔍 Found node {addr}")
+            return (None, None, time.time())
+        logger.info(self.self_addr, f"🤝 Adding {addr}")
+        return run_coroutine(self.__build_direct_neighbor(addr, handshake_msg)).result()
+
+    async def __build_direct_neighbor(
+        self, addr: str, handshake_msg: bool
+    ) -> Tuple[grpc.aio.Channel, node_pb2_grpc.NodeServicesStub, float]:
+        try:
+            channel = create_channel(addr)
+            stub = node_pb2_grpc.NodeServicesStub(channel)
+
+            # Handshake
+            if handshake_msg:
+                res = await stub.handshake(
+                    node_pb2.HandShakeRequest(addr=self.self_addr, compressions=get_supported_compressions()),
+                    timeout=Settings.GRPC_TIMEOUT,
+                )
+                if res.error:
+                    logger.info(self.self_addr, f"Cannot add a neighbor: {res.error}")
+                    await channel.close()
+                    raise Exception(f"Cannot add a neighbor: {res.error}")
+                self.set_compression(addr, res.compression)
+
+            return (channel, stub, time.time())
+
+        except Exception as e:
+            logger.info(self.self_addr, f"Crash while adding a neighbor: {e}")
+            raise e
+
+    def disconnect(self, addr: str, disconnect_msg: bool = True) -> None:
+        """
+        Disconnect from a neighbor. The disconnect message is sent in the background.
+
+        Args:
+            addr: Address of the neighbor to disconnect.
+            disconnect_msg: If a disconnect message is needed.
+
+        """
+        super().disconnect(addr, disconnect_msg=False)
+        if disconnect_msg and addr in self.neis:
+            node_channel, node_stub, _ = self.get(addr)
+            run_coroutine(self.__disconnect(node_channel, node_stub))
+
+    async def __disconnect(self, node_channel: Optional[grpc.aio.Channel], node_stub: Optional[node_pb2_grpc.NodeServicesStub]) -> None:
+        try:
+            # If the other node still connected, disconnect
+            if node_stub is not None:
+                await node_stub.disconnect(node_pb2.HandShakeRequest(addr=self.self_addr), timeout=Settings.GRPC_TIMEOUT)
+        except Exception:
+            pass
+        finally:
+            if node_channel is not None:
+                await node_channel.close()
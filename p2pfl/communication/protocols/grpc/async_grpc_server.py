@@ -0,0 +1,163 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""asyncio GRPC server."""
+
+import asyncio
+from typing import AsyncIterator, List, Optional
+
+import google.protobuf.empty_pb2
+import grpc
+
+from p2pfl.communication.commands.command import Command
+from p2pfl.communication.protocols.gossiper import Gossiper
+from p2pfl.communication.protocols.grpc.async_grpc_neighbors import AsyncGrpcNeighbors
+from p2pfl.communication.protocols.grpc.event_loop import iterate, run_blocking, run_coroutine
+from p2pfl.communication.protocols.grpc.execution_lane import WEIGHTS_LANE
+from p2pfl.communication.protocols.grpc.grpc_server import SERVER_OPTIONS, GrpcServer
+from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
+
+
+class AsyncGrpcServer(GrpcServer):
+    """
+    Server side of the asyncio GRPC communication protocol.
+
+    Requests are handled in the event loop, and the messages are processed (as in :class:`GrpcServer`) in the threads
+    of their lane, as commands may block. Requests waiting for a lane do not hold any thread.
+
+    Args:
+        addr: Address of the server.
+        gossiper: Gossiper instance.
+        neighbors: Neighbors instance.
+        commands: List of commands to be executed by the server.
+
+    """
+
+    def __init__(
+        self,
+        addr: str,
+        gossiper: Gossiper,
+        neighbors: AsyncGrpcNeighbors,
+        commands: Optional[List[Command]] = None,
+    ) -> None:
+        """Initialize the asyncio GRPC server."""
+        super().__init__(addr, gossiper, neighbors, commands)
+        self.__server: Optional[grpc.aio.Server] = None
+
+    ####
+    # Management
+    ####
+
+    def start(self, wait: bool = False) -> None:
+        """
+        Start the GRPC server.
+
+        Args:
+            wait: If True, wait for termination.
+
+        """
+        run_coroutine(self.__start()).result()
+
+    async def __start(self) -> None:
+        server = grpc.aio.server(options=SERVER_OPTIONS)
+        node_pb2_grpc.add_NodeServicesServicer_to_server(self, server)
+        self._add_port(server)
+        await server.start()
+        self.__server = server
+
+    def stop(self) -> None:
+        """Stop the GRPC server."""
+        if self.__server is not None:
+            run_coroutine(self.__server.stop(0)).result()
+            self.__server = None
+        super().stop()
+
+    def wait_for_termination(self) -> None:
+        """Wait for termination."""
+        if self.__server is not None:
+            run_coroutine(self.__server.wait_for_termination()).result()
+
+    def is_running(self) -> bool:
+        """
+        Check if the server is running.
+
+        Returns:
+            True if the server is running, False otherwise.
+
+        """
+        return self.__server is not None
+
+    ####
+    # GRPC Services
+    ####
+
+    async def handshake(self, request: node_pb2.HandShakeRequest, context: grpc.aio.ServicerContext) -> node_pb2.HandShakeResponse:  # type: ignore[override]
+        """
+        GRPC service. It is called when a node connects to another. The compression of the weights is agreed here.
+
+        Args:
+            request: Request message.
+            context: Context.
+
+        """
+        return await run_blocking(super().handshake, request, context)
+
+    async def disconnect(self, request: node_pb2.HandShakeRequest, context: grpc.aio.ServicerContext) -> google.protobuf.empty_pb2.Empty:  # type: ignore[override]
+        """
+        GRPC service. It is called when a node disconnects from another.
+
+        Args:
+            request: Request message.
+            context: Context.
+
+        """
+        return await run_blocking(super().disconnect, request, context)
+
+    async def send(self, request: node_pb2.RootMessage, context: grpc.aio.ServicerContext) -> node_pb2.ResponseMessage:  # type: ignore[override]
+        """
+        GRPC service. Handles both regular messages and model weights.
+
+        Args:
+            request: The RootMessage containing either a Message or Weights payload.
+            context: Context.
+
+        """
+        future = self._submit(self._get_lane_name(request), super().send, request, context)
+        if future is None:
+            self._log_discarded(request)
+            return node_pb2.ResponseMessage()
+        return await asyncio.wrap_future(future)
+
+    async def send_stream(  # type: ignore[override]
+        self, request_iterator: AsyncIterator[node_pb2.WeightsChunk], context: grpc.aio.ServicerContext
+    ) -> node_pb2.ResponseMessage:
+        """
+        GRPC service. Handles model weights streamed in chunks.
+
+        Chunks are read from the event loop as the thread of the weights lane consumes them, so the stream is still
+        answered right away if the model is not needed.
+
+        Args:
+            request_iterator: The chunks (header, model chunks and trailer).
+            context: Context.
+
+        """
+        future = self._submit(WEIGHTS_LANE, super().send_stream, iterate(request_iterator), context)
+        if future is None:
+            return node_pb2.ResponseMessage()
+        return await asyncio.wrap_future(future)
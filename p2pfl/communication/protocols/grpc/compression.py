@@ -0,0 +1,132 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Lossless compression of weight payloads.
+
+Compressions are agreed per neighbor in the handshake: the node that connects offers the compressions it supports (the
+one in ``Settings.WEIGHTS_COMPRESSION`` first) and the other node picks the first one it also supports. zstd and lz4
+are only available if their packages are installed.
+"""
+
+import functools
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from p2pfl.settings import Settings
+
+_COMPRESSIONS: Dict[str, Tuple[Callable[[bytes, Optional[int]], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (
+        lambda data, level: zlib.compress(data, -1 if level is None else level),
+        zlib.decompress,
+    ),
+}
+
+try:
+    import zstandard  # type: ignore
+
+    _COMPRESSIONS["zstd"] = (
+        lambda data, level: zstandard.ZstdCompressor(level=3 if level is None else level).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+except ImportError:
+    pass
+
+try:
+    import lz4.frame  # type: ignore
+
+    _COMPRESSIONS["lz4"] = (
+        lambda data, level: lz4.frame.compress(data, compression_level=0 if level is None else level),
+        lz4.frame.decompress,
+    )
+except ImportError:
+    pass
+
+
+class CompressionError(Exception):
+    """Exception raised when a compression is not available or a payload can not be decompressed."""
+
+    pass
+
+
+def get_supported_compressions() -> List[str]:
+    """
+    Get the compressions offered in the handshake, in order of preference.
+
+    Returns:
+        The available compressions, starting with ``Settings.WEIGHTS_COMPRESSION`` (empty if it is "none").
+
+    """
+    if Settings.WEIGHTS_COMPRESSION == "none":
+        return []
+    return sorted(_COMPRESSIONS, key=lambda c: c != Settings.WEIGHTS_COMPRESSION)
+
+
+def negotiate(offered: List[str]) -> str:
+    """
+    Pick the compression of a neighbor.
+
+    Args:
+        offered: The compressions offered by the neighbor, in order of preference.
+
+    Returns:
+        The agreed compression (empty string if none).
+
+    """
+    if Settings.WEIGHTS_COMPRESSION == "none":
+        return ""
+    return next((c for c in offered if c in _COMPRESSIONS), "")
+
+
+@functools.lru_cache(maxsize=2)
+def compress(data: bytes, compression: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress a payload. The last results are cached, as the same payload is usually sent to several neighbors.
+
+    Args:
+        data: The payload.
+        compression: The compression.
+        level: The compression level (default of the compression if None).
+
+    Raises:
+        CompressionError: If the compression is not available.
+
+    """
+    if compression not in _COMPRESSIONS:
+        raise CompressionError(f"Compression {compression} not available")
+    return _COMPRESSIONS[compression][0](data, level)
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    """
+    Decompress a payload.
+
+    Args:
+        data: The compressed payload.
+        compression: The compression.
+
+    Raises:
+        CompressionError: If the compression is not available or the payload is corrupted.
+
+    """
+    if compression not in _COMPRESSIONS:
+        raise CompressionError(f"Compression {compression} not available")
+    try:
+        return _COMPRESSIONS[compression][1](data)
+    except Exception as e:
+        raise CompressionError(f"Cannot decompress the payload ({compression}): {e}") from e
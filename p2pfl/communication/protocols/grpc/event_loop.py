@@ -0,0 +1,110 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Event loop shared by the asyncio gRPC protocol.
+
+All the nodes of a process share one event loop (running in a background thread) and one pool of threads for the
+blocking work (executing commands). Synchronous callers (stages, gossiper, heartbeater) schedule coroutines in the loop.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, Optional, TypeVar
+
+from p2pfl.settings import Settings
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the event loop of the process, starting it if needed.
+
+    Returns:
+        The event loop.
+
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="grpc-event-loop", daemon=True).start()
+        return _loop
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T]) -> "Future[T]":
+    """
+    Schedule a coroutine in the event loop. Can be called from any thread.
+
+    Args:
+        coro: The coroutine.
+
+    Returns:
+        The future of the result (do not wait for it from the event loop).
+
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function in the pool of threads, without blocking the event loop.
+
+    Args:
+        fn: The function.
+        args: The positional arguments.
+        kwargs: The keyword arguments.
+
+    Returns:
+        The result of the function.
+
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Settings.GRPC_ASYNC_WORKERS, thread_name_prefix="grpc-worker")
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+def iterate(iterator: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Iterate an asynchronous iterator of the event loop from another thread.
+
+    Args:
+        iterator: The asynchronous iterator.
+
+    Yields:
+        The items of the iterator, fetched one by one.
+
+    """
+
+    async def next_item() -> T:
+        return await iterator.__anext__()
+
+    while True:
+        try:
+            yield run_coroutine(next_item()).result()
+        except StopAsyncIteration:
+            return
@@ -0,0 +1,112 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Execution lanes of the GRPC servers.
+
+Received commands are executed in separate pools of threads depending on their kind: control messages (heartbeats,
+votes...) and weight payloads. Slow model transfers and aggregations can not delay control messages, so neighbors are
+not evicted for heartbeat timeout while models are being exchanged.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+CONTROL_LANE = "control"
+WEIGHTS_LANE = "weights"
+
+
+class ExecutionLane:
+    """
+    Pool of threads that executes one kind of request, with a bounded queue.
+
+    Functions submitted from a thread of the lane are executed in place.
+
+    Args:
+        name: Name of the lane.
+        workers: Number of threads.
+        queue_size: Maximum number of requests waiting for a thread (unbounded if None).
+
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: Optional[int] = None) -> None:
+        """Initialize the lane."""
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__queued = 0
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Optional["Future[T]"]:
+        """
+        Submit a function to the lane.
+
+        Args:
+            fn: The function.
+            args: The positional arguments.
+            kwargs: The keyword arguments.
+
+        Returns:
+            The future of the result, None if the queue is full.
+
+        """
+        # Already in the lane
+        if getattr(self.__local, "active", False):
+            future: Future[T] = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        with self.__lock:
+            if self.is_full():
+                return None
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-lane")
+            self.__queued += 1
+            return self.__executor.submit(self.__run, fn, *args, **kwargs)
+
+    def __run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self.__lock:
+            self.__queued -= 1
+        self.__local.active = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.__local.active = False
+
+    def is_full(self) -> bool:
+        """Check if the queue of the lane is full."""
+        return self.queue_size is not None and self.__queued >= self.queue_size
+
+    def get_queue_depth(self) -> int:
+        """Get the number of requests waiting for a thread."""
+        return self.__queued
+
+    def shutdown(self) -> None:
+        """Stop the threads of the lane once their requests finish (the lane can be used again)."""
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown(wait=False)
+            self.__executor = None
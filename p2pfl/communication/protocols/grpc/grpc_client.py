@@ -17,15 +17,18 @@
 
 """GRPC client."""
 
+import hashlib
 import random
+import zlib
 from datetime import datetime
 from os.path import isfile
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 import grpc
 
 from p2pfl.communication.protocols.client import Client
 from p2pfl.communication.protocols.exceptions import CommunicationError, NeighborNotConnectedError
+from p2pfl.communication.protocols.grpc.compression import compress
 from p2pfl.communication.protocols.grpc.grpc_neighbors import GrpcNeighbors
 from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
 from p2pfl.management.logger import logger
@@ -89,16 +92,20 @@ class GrpcClient(Client):
         serialized_model: bytes,
         contributors: Optional[List[str]] = None,
         weight: int = 1,
+        chunk_index: int = 0,
     ) -> node_pb2.RootMessage:
         """
         Build a RootMessage with a Weights payload to send to the neighbors.
 
+        The payload carries a content hash (digest), so neighbors that already have it can skip it.
+
         Args:
             cmd: Command of the message.
             round: Round of the message.
             serialized_model: Serialized model to send.
             contributors: List of contributors.
             weight: Weight of the message (number of samples).
+            chunk_index: Index of the chunk of the parameters, if only a chunk is sent.
 
         Returns:
             RootMessage to send.
@@ -114,6 +121,8 @@ class GrpcClient(Client):
                 weights=serialized_model,
                 contributors=contributors,
                 num_samples=weight,
+                digest=hashlib.blake2b(serialized_model, digest_size=16).hexdigest(),
+                chunk_index=chunk_index,
             ),
         )
 
@@ -165,10 +174,18 @@ class GrpcClient(Client):
                     channel = grpc.insecure_channel(nei)
                 node_stub = node_pb2_grpc.NodeServicesStub(channel)
 
+            # Compress weights
+            compression = self.__neighbors.get_compression(nei)
+            if compression and msg.HasField("weights"):
+                msg = self._compress_weights(msg, compression)
+
             # Send
             if node_stub is not None:
-                # Send message
-                res = node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT)
+                # Send message (large models are streamed in chunks)
+                if msg.HasField("weights") and len(msg.weights.weights) > Settings.GRPC_CHUNK_SIZE:
+                    res = self.__send_stream(node_stub, msg)
+                else:
+                    res = node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT)
             else:
                 raise NeighborNotConnectedError("Neighbor not directly connected (Stub not defined and create_connection is false).")
             if res.error:
@@ -189,6 +206,63 @@ class GrpcClient(Client):
             if channel is not None:
                 channel.close()
 
+    @staticmethod
+    def _compress_weights(msg: node_pb2.RootMessage, compression: str) -> node_pb2.RootMessage:
+        """Copy a weights message with the model compressed."""
+        return node_pb2.RootMessage(
+            source=msg.source,
+            round=msg.round,
+            cmd=msg.cmd,
+            weights=node_pb2.Weights(
+                weights=compress(msg.weights.weights, compression, Settings.WEIGHTS_COMPRESSION_LEVEL),
+                contributors=msg.weights.contributors,
+                num_samples=msg.weights.num_samples,
+                compression=compression,
+                digest=msg.weights.digest,
+                chunk_index=msg.weights.chunk_index,
+            ),
+        )
+
+    def __send_stream(self, node_stub: node_pb2_grpc.NodeServicesStub, msg: node_pb2.RootMessage) -> node_pb2.ResponseMessage:
+        try:
+            return node_stub.send_stream(self._chunk_weights(msg), timeout=Settings.GRPC_TIMEOUT)
+        except grpc.RpcError as e:
+            # Neighbors without the streaming RPC
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                return node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT)
+            raise e
+
+    @staticmethod
+    def _chunk_weights(msg: node_pb2.RootMessage) -> Iterator[node_pb2.WeightsChunk]:
+        """
+        Split a weights message into a header, fixed-size chunks of the model and a trailer with its checksum.
+
+        The header is the message without the model. Chunks are generated lazily, so nothing but the header is sent if
+        the neighbor already has the model.
+        """
+        weights = msg.weights.weights
+        header = node_pb2.RootMessage(
+            source=msg.source,
+            round=msg.round,
+            cmd=msg.cmd,
+            weights=node_pb2.Weights(
+                contributors=msg.weights.contributors,
+                num_samples=msg.weights.num_samples,
+                compression=msg.weights.compression,
+                digest=msg.weights.digest,
+                chunk_index=msg.weights.chunk_index,
+            ),
+        )
+        yield node_pb2.WeightsChunk(header=node_pb2.WeightsHeader(message=header, size=len(weights)))
+
+        view = memoryview(weights)
+        crc32 = 0
+        for start in range(0, len(weights), Settings.GRPC_CHUNK_SIZE):
+            chunk = view[start : start + Settings.GRPC_CHUNK_SIZE]
+            crc32 = zlib.crc32(chunk, crc32)
+            yield node_pb2.WeightsChunk(data=chunk.tobytes())
+        yield node_pb2.WeightsChunk(trailer=node_pb2.WeightsTrailer(crc32=crc32))
+
     def broadcast(self, msg: node_pb2.RootMessage, node_list: Optional[List[str]] = None) -> None:
         """
         Broadcast a message to all the neighbors.
@@ -54,7 +54,6 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
         addr: Address of the node.
         commands: Commands to add to the communication protocol.
 
-    .. todo:: https://grpc.github.io/grpc/python/grpc_asyncio.html
     .. todo:: Decouple the heeartbeat command.
 
     """
@@ -159,6 +158,7 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
         serialized_model: bytes,
         contributors: Optional[List[str]] = None,
         weight: int = 1,
+        chunk_index: int = 0,
     ) -> Any:
         """
         Build weights.
@@ -169,11 +169,12 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
             serialized_model: The serialized model.
             contributors: The model contributors.
             weight: The weight of the model (amount of samples used).
+            chunk_index: Index of the chunk of the parameters, if only a chunk is sent (e.g. ring all-reduce).
 
         """
         if contributors is None:
             contributors = []
-        return self._client.build_weights(cmd, round, serialized_model, contributors, weight)
+        return self._client.build_weights(cmd, round, serialized_model, contributors, weight, chunk_index)
 
     @running
     def send(
@@ -182,6 +183,7 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
         msg: Union[node_pb2.RootMessage],
         raise_error: bool = False,
         remove_on_error: bool = True,
+        create_connection: bool = False,
     ) -> None:
         """
         Send a message to a neighbor.
@@ -191,9 +193,10 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
             msg: The message to send.
             raise_error: If raise error.
             remove_on_error: If remove on error.
+            create_connection: Create a temporary connection if the neighbor is not directly connected.
 
         """
-        self._client.send(nei, msg, raise_error=raise_error, remove_on_error=remove_on_error)
+        self._client.send(nei, msg, create_connection=create_connection, raise_error=raise_error, remove_on_error=remove_on_error)
 
     @running
     def broadcast(self, msg: node_pb2.RootMessage, node_list: Optional[List[str]] = None) -> None:
@@ -19,10 +19,11 @@
 
 import time
 from os.path import isfile
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import grpc
 
+from p2pfl.communication.protocols.grpc.compression import get_supported_compressions
 from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
 from p2pfl.communication.protocols.neighbors import Neighbors
 from p2pfl.management.logger import logger
@@ -30,7 +31,44 @@ from p2pfl.settings import Settings
 
 
 class GrpcNeighbors(Neighbors):
-    """Implementation of the neighbors for a GRPC communication protocol."""
+    """
+    Implementation of the neighbors for a GRPC communication protocol.
+
+    The compression of the weight payloads agreed in the handshake is stored per direct neighbor.
+
+    Args:
+        self_addr: Address of the node.
+
+    """
+
+    def __init__(self, self_addr) -> None:
+        """Initialize the neighbors."""
+        super().__init__(self_addr)
+        self.__compressions: Dict[str, str] = {}
+
+    def set_compression(self, addr: str, compression: str) -> None:
+        """
+        Set the compression agreed with a neighbor.
+
+        Args:
+            addr: Address of the neighbor.
+            compression: The compression (empty string if none).
+
+        """
+        self.__compressions[addr] = compression
+
+    def get_compression(self, addr: str) -> str:
+        """
+        Get the compression agreed with a neighbor.
+
+        Args:
+            addr: Address of the neighbor.
+
+        Returns:
+            The compression (empty string if none).
+
+        """
+        return self.__compressions.get(addr, "")
 
     def refresh_or_add(self, addr: str, time: float) -> None:
         """
@@ -103,13 +141,14 @@ class GrpcNeighbors(Neighbors):
             # Handshake
             if handshake_msg:
                 res = stub.handshake(
-                    node_pb2.HandShakeRequest(addr=self.self_addr),
+                    node_pb2.HandShakeRequest(addr=self.self_addr, compressions=get_supported_compressions()),
                     timeout=Settings.GRPC_TIMEOUT,
                 )
                 if res.error:
                     logger.info(self.self_addr, f"Cannot add a neighbor: {res.error}")
                     channel.close()
                     raise Exception(f"Cannot add a neighbor: {res.error}")
+                self.set_compression(addr, res.compression)
 
             # Add neighbor
             return (channel, stub, time.time())
@@ -131,6 +170,7 @@ class GrpcNeighbors(Neighbors):
             disconnect_msg: If a disconnect message is needed.
 
         """
+        self.__compressions.pop(addr, None)
         try:
             # If the other node still connected, disconnect
             node_channel, node_stub, _ = self.get(addr)
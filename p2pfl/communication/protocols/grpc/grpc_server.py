@@ -17,26 +17,41 @@
 
 """GRPC server."""
 
+import threading
 import traceback
+import zlib
 from concurrent import futures
+from concurrent.futures import Future
 from os.path import isfile
-from typing import List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import google.protobuf.empty_pb2
 import grpc
 
 from p2pfl.communication.commands.command import Command
 from p2pfl.communication.protocols.gossiper import Gossiper
+from p2pfl.communication.protocols.grpc.compression import decompress, negotiate
+from p2pfl.communication.protocols.grpc.execution_lane import CONTROL_LANE, WEIGHTS_LANE, ExecutionLane
 from p2pfl.communication.protocols.grpc.grpc_neighbors import GrpcNeighbors
 from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
 
+MAX_MESSAGE_LENGTH = 1024 * 1024 * 1024
+SERVER_OPTIONS = [
+    ("grpc.max_send_message_length", MAX_MESSAGE_LENGTH),
+    ("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH),
+]
+
 
 class GrpcServer(node_pb2_grpc.NodeServicesServicer):
     """
     Implementation of the server side of a GRPC communication protocol.
 
+    Commands are executed in two lanes (pools of threads): one for control messages and one for weight payloads, so
+    control messages are not delayed by model transfers. Weights that do not fit in the queue of their lane are
+    discarded (they are gossiped again).
+
     Args:
         addr: Address of the server.
         gossiper: Gossiper instance.
@@ -61,15 +76,8 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         # Address
         self.addr = addr
 
-        # Server
-        maxMsgLength = 1024 * 1024 * 1024
-        self.__server = grpc.server(
-            futures.ThreadPoolExecutor(max_workers=2),
-            options=[
-                ("grpc.max_send_message_length", maxMsgLength),
-                ("grpc.max_receive_message_length", maxMsgLength),
-            ],
-        )
+        # Server (created when started)
+        self.__server: Optional[grpc.Server] = None
         self.__server_started = False
 
         # Gossiper
@@ -78,6 +86,16 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         # Neighbors
         self.__neighbors = neighbors
 
+        # Execution lanes
+        self.__lanes = {
+            CONTROL_LANE: ExecutionLane(CONTROL_LANE, Settings.GRPC_CONTROL_WORKERS),
+            WEIGHTS_LANE: ExecutionLane(WEIGHTS_LANE, Settings.GRPC_WEIGHTS_WORKERS, Settings.GRPC_WEIGHTS_QUEUE_SIZE),
+        }
+
+        # Digests of the weights taken by the commands, per round
+        self.__received_weights: Dict[int, Set[Tuple[str, str]]] = {}
+        self.__received_weights_lock = threading.Lock()
+
     ####
     # Management
     ####
@@ -90,33 +108,26 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
             wait: If True, wait for termination.
 
         """
-        # Server
+        # Server (requests wait for their lane in its threads)
+        max_workers = Settings.GRPC_CONTROL_WORKERS + Settings.GRPC_WEIGHTS_WORKERS + Settings.GRPC_WEIGHTS_QUEUE_SIZE
+        self.__server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), options=SERVER_OPTIONS)
         node_pb2_grpc.add_NodeServicesServicer_to_server(self, self.__server)
-        try:
-            if Settings.USE_SSL and isfile(Settings.SERVER_KEY) and isfile(Settings.SERVER_CRT):
-                with open(Settings.SERVER_KEY) as key_file, open(Settings.SERVER_CRT) as crt_file, open(Settings.CA_CRT) as ca_file:
-                    private_key = key_file.read().encode()
-                    certificate_chain = crt_file.read().encode()
-                    root_certificates = ca_file.read().encode()
-                server_credentials = grpc.ssl_server_credentials(
-                    [(private_key, certificate_chain)], root_certificates=root_certificates, require_client_auth=True
-                )
-                self.__server.add_secure_port(self.addr, server_credentials)
-            else:
-                self.__server.add_insecure_port(self.addr)
-        except Exception as e:
-            raise Exception(f"Cannot bind the address ({self.addr}): {e}") from e
+        self._add_port(self.__server)
         self.__server.start()
         self.__server_started = True
 
     def stop(self) -> None:
         """Stop the GRPC server."""
-        self.__server.stop(0)
+        if self.__server is not None:
+            self.__server.stop(0)
         self.__server_started = False
+        for lane in self.__lanes.values():
+            lane.shutdown()
 
     def wait_for_termination(self) -> None:
         """Wait for termination."""
-        self.__server.wait_for_termination()
+        if self.__server is not None:
+            self.__server.wait_for_termination()
 
     def is_running(self) -> bool:
         """
@@ -128,13 +139,46 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         """
         return self.__server_started
 
+    def get_queue_depth(self) -> Dict[str, int]:
+        """
+        Get the number of requests waiting for a thread in every lane.
+
+        Returns:
+            The queue depth of every lane (control and weights).
+
+        """
+        return {name: lane.get_queue_depth() for name, lane in self.__lanes.items()}
+
+    def _add_port(self, server: Union[grpc.Server, grpc.aio.Server]) -> None:
+        """
+        Bind the address of the node to a server (with mutual TLS if enabled).
+
+        Args:
+            server: The server.
+
+        """
+        try:
+            if Settings.USE_SSL and isfile(Settings.SERVER_KEY) and isfile(Settings.SERVER_CRT):
+                with open(Settings.SERVER_KEY) as key_file, open(Settings.SERVER_CRT) as crt_file, open(Settings.CA_CRT) as ca_file:
+                    private_key = key_file.read().encode()
+                    certificate_chain = crt_file.read().encode()
+                    root_certificates = ca_file.read().encode()
+                server_credentials = grpc.ssl_server_credentials(
+                    [(private_key, certificate_chain)], root_certificates=root_certificates, require_client_auth=True
+                )
+                server.add_secure_port(self.addr, server_credentials)
+            else:
+                server.add_insecure_port(self.addr)
+        except Exception as e:
+            raise Exception(f"Cannot bind the address ({self.addr}): {e}") from e
+
     ####
     # GRPC Services
     ####
 
-    def handshake(self, request: node_pb2.HandShakeRequest, _: grpc.ServicerContext) -> node_pb2.ResponseMessage:
+    def handshake(self, request: node_pb2.HandShakeRequest, _: grpc.ServicerContext) -> node_pb2.HandShakeResponse:
         """
-        GRPC service. It is called when a node connects to another.
+        GRPC service. It is called when a node connects to another. The compression of the weights is agreed here.
 
         Args:
             request: Request message.
@@ -142,9 +186,11 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
 
         """
         if self.__neighbors.add(request.addr, non_direct=False, handshake_msg=False):
-            return node_pb2.ResponseMessage()
+            compression = negotiate(list(request.compressions))
+            self.__neighbors.set_compression(request.addr, compression)
+            return node_pb2.HandShakeResponse(compression=compression)
         else:
-            return node_pb2.ResponseMessage(error="Cannot add the node (duplicated or wrong direction)")
+            return node_pb2.HandShakeResponse(error="Cannot add the node (duplicated or wrong direction)")
 
     def disconnect(self, request: node_pb2.HandShakeRequest, _: grpc.ServicerContext) -> google.protobuf.empty_pb2.Empty:
         """
@@ -177,6 +223,115 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
             return node_pb2.ResponseMessage()
 
         # Process message/model
+        error = self.__execute(request)
+        if error is not None:
+            return error
+
+        # If message gossip
+        if request.HasField("message") and request.message.ttl > 0:
+            # Update ttl and gossip
+            request.message.ttl -= 1
+            pending_neis = [n for n in self.__neighbors.get_all(only_direct=True) if n != request.source]
+            self.__gossiper.add_message(request, pending_neis)
+
+        return node_pb2.ResponseMessage()
+
+    def send_stream(self, request_iterator: Iterator[node_pb2.WeightsChunk], _: grpc.ServicerContext) -> node_pb2.ResponseMessage:
+        """
+        GRPC service. Handles model weights streamed in chunks.
+
+        The first chunk is a header with the message (without the model) and the size of the model. Chunks are written
+        into a preallocated buffer, which is checked against the checksum of the trailer. If the model of the header has
+        already been received or is not needed, the stream is answered right away, so the model is not transferred.
+
+        Args:
+            request_iterator: The chunks (header, model chunks and trailer).
+            _: Context.
+
+        """
+        request: Optional[node_pb2.RootMessage] = None
+        buffer = bytearray()
+        offset = 0
+        crc32 = 0
+        for chunk in request_iterator:
+            chunk_type = chunk.WhichOneof("chunk_type")
+            if chunk_type == "header" and request is None and chunk.header.size >= 0:
+                request = chunk.header.message
+                if self.__has_weights(request) or not self.__admit(request):
+                    return node_pb2.ResponseMessage()
+                # Not transferred if it would be discarded
+                if self.__lanes[WEIGHTS_LANE].is_full():
+                    self._log_discarded(request)
+                    return node_pb2.ResponseMessage()
+                buffer = bytearray(chunk.header.size)
+            elif chunk_type == "data" and request is not None:
+                data = chunk.data
+                if offset + len(data) > len(buffer):
+                    return node_pb2.ResponseMessage(error="Corrupted weights: larger than expected")
+                buffer[offset : offset + len(data)] = data
+                offset += len(data)
+                crc32 = zlib.crc32(data, crc32)
+            elif chunk_type == "trailer" and request is not None and offset == len(buffer):
+                if chunk.trailer.crc32 != crc32:
+                    return node_pb2.ResponseMessage(error="Corrupted weights: checksum mismatch")
+                error = self.__execute(request, weights=buffer)
+                return error if error is not None else node_pb2.ResponseMessage()
+            else:
+                return node_pb2.ResponseMessage(error=f"Unexpected weights chunk: {chunk_type}")
+        return node_pb2.ResponseMessage(error="Incomplete weights stream")
+
+    @staticmethod
+    def _get_lane_name(request: node_pb2.RootMessage) -> str:
+        """Get the lane of a message (weights or control)."""
+        return WEIGHTS_LANE if request.HasField("weights") else CONTROL_LANE
+
+    def _submit(self, lane: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Optional[Future]:
+        """
+        Submit a function to a lane.
+
+        Args:
+            lane: Name of the lane.
+            fn: The function.
+            args: The positional arguments.
+            kwargs: The keyword arguments.
+
+        Returns:
+            The future of the result, None if the queue of the lane is full.
+
+        """
+        return self.__lanes[lane].submit(fn, *args, **kwargs)
+
+    def _log_discarded(self, request: node_pb2.RootMessage) -> None:
+        """Log a message discarded because its lane is full."""
+        logger.info(self.addr, f"🚦 {request.cmd.upper()} from {request.source} discarded, the {self._get_lane_name(request)} lane is full.")
+
+    def __execute(
+        self,
+        request: node_pb2.RootMessage,
+        weights: Optional[Union[bytes, bytearray]] = None,
+    ) -> Optional[node_pb2.ResponseMessage]:
+        future = self._submit(self._get_lane_name(request), self.__process, request, weights)
+        if future is None:
+            self._log_discarded(request)
+            return None
+        return future.result()
+
+    def __process(
+        self,
+        request: node_pb2.RootMessage,
+        weights: Optional[Union[bytes, bytearray]] = None,
+    ) -> Optional[node_pb2.ResponseMessage]:
+        """
+        Execute the command of a message.
+
+        Args:
+            request: The message.
+            weights: The model, if not included in the message (streamed).
+
+        Returns:
+            The error response, None if the command has been executed.
+
+        """
         if request.cmd != "beat" or (not Settings.EXCLUDE_BEAT_LOGS and request.cmd == "beat"):
             logger.debug(
                 self.addr,
@@ -187,13 +342,23 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
                 if request.HasField("message"):
                     self.__commands[request.cmd].execute(request.source, request.round, *request.message.args)
                 elif request.HasField("weights"):
-                    self.__commands[request.cmd].execute(
+                    # Already taken (e.g. the same aggregation from several neighbors) or not needed
+                    if self.__has_weights(request) or not self.__admit(request):
+                        return None
+                    if weights is None:
+                        weights = request.weights.weights
+                    if request.weights.compression:
+                        weights = decompress(weights, request.weights.compression)
+                    taken = self.__commands[request.cmd].execute(
                         request.source,
                         request.round,
-                        weights=request.weights.weights,
+                        weights=weights,
                         contributors=request.weights.contributors,
                         num_samples=request.weights.num_samples,
+                        chunk_index=request.weights.chunk_index,
                     )
+                    if taken:
+                        self.__add_received_weights(request)
                 else:
                     error_text = f"Error while processing command: {request.cmd}: No message or weights"
                     logger.error(self.addr, error_text)
@@ -206,15 +371,36 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
             # disconnect node
             logger.error(self.addr, f"Unknown command: {request.cmd} from {request.source}")
             return node_pb2.ResponseMessage(error=f"Unknown command: {request.cmd}")
-
-        # If message gossip
-        if request.HasField("message") and request.message.ttl > 0:
-            # Update ttl and gossip
-            request.message.ttl -= 1
-            pending_neis = [n for n in self.__neighbors.get_all(only_direct=True) if n != request.source]
-            self.__gossiper.add_message(request, pending_neis)
-
-        return node_pb2.ResponseMessage()
+        return None
+
+    def __admit(self, request: node_pb2.RootMessage) -> bool:
+        if request.cmd not in self.__commands:
+            return True
+        admitted = self.__commands[request.cmd].admit(
+            request.source,
+            request.round,
+            contributors=request.weights.contributors,
+            num_samples=request.weights.num_samples,
+            chunk_index=request.weights.chunk_index,
+        )
+        if not admitted:
+            logger.debug(self.addr, f"🙅 {request.cmd.upper()} from {request.source} not needed. Discarded before decoding.")
+        return admitted
+
+    def __has_weights(self, request: node_pb2.RootMessage) -> bool:
+        if not request.weights.digest:
+            return False
+        with self.__received_weights_lock:
+            return (request.cmd, request.weights.digest) in self.__received_weights.get(request.round, set())
+
+    def __add_received_weights(self, request: node_pb2.RootMessage) -> None:
+        if not request.weights.digest:
+            return
+        with self.__received_weights_lock:
+            self.__received_weights.setdefault(request.round, set()).add((request.cmd, request.weights.digest))
+            # Only the digests of the last rounds are kept
+            for round in [r for r in self.__received_weights if r < request.round - 1]:
+                del self.__received_weights[round]
 
     ####
     # Commands
@@ -15,7 +15,7 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nnode.proto\x12\x04node\x1a\x1bgoogle/protobuf/empty.proto\"\x9c\x01\n\x0bRootMessage\x12\x0e\n\x06source\x18\x01 \x01(\t\x12\x12\n\x05round\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x0b\n\x03\x63md\x18\x03 \x01(\t\x12 \n\x07message\x18\x04 \x01(\x0b\x32\r.node.MessageH\x00\x12 \n\x07weights\x18\x05 \x01(\x0b\x32\r.node.WeightsH\x00\x42\x0e\n\x0cpayload_typeB\x08\n\x06_round\"2\n\x07Message\x12\x0b\n\x03ttl\x18\x01 \x01(\x05\x12\x0c\n\x04hash\x18\x02 \x01(\x03\x12\x0c\n\x04\x61rgs\x18\x03 \x03(\t\"E\n\x07Weights\x12\x0f\n\x07weights\x18\x01 \x01(\x0c\x12\x14\n\x0c\x63ontributors\x18\x02 \x03(\t\x12\x13\n\x0bnum_samples\x18\x03 \x01(\x05\" \n\x10HandShakeRequest\x12\x0c\n\x04\x61\x64\x64r\x18\x01 \x01(\t\"/\n\x0fResponseMessage\x12\x12\n\x05\x65rror\x18\x01 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error2\xba\x01\n\x0cNodeServices\x12:\n\thandshake\x12\x16.node.HandShakeRequest\x1a\x15.node.ResponseMessage\x12<\n\ndisconnect\x12\x16.node.HandShakeRequest\x1a\x16.google.protobuf.Empty\x12\x30\n\x04send\x12\x11.node.RootMessage\x1a\x15.node.ResponseMessageb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nnode.proto\x12\x04node\x1a\x1bgoogle/protobuf/empty.proto\"\x9c\x01\n\x0bRootMessage\x12\x0e\n\x06source\x18\x01 \x01(\t\x12\x12\n\x05round\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x0b\n\x03\x63md\x18\x03 \x01(\t\x12 \n\x07message\x18\x04 \x01(\x0b\x32\r.node.MessageH\x00\x12 \n\x07weights\x18\x05 \x01(\x0b\x32\r.node.WeightsH\x00\x42\x0e\n\x0cpayload_typeB\x08\n\x06_round\"2\n\x07Message\x12\x0b\n\x03ttl\x18\x01 \x01(\x05\x12\x0c\n\x04hash\x18\x02 \x01(\x03\x12\x0c\n\x04\x61rgs\x18\x03 \x03(\t\"\x7f\n\x07Weights\x12\x0f\n\x07weights\x18\x01 \x01(\x0c\x12\x14\n\x0c\x63ontributors\x18\x02 \x03(\t\x12\x13\n\x0bnum_samples\x18\x03 \x01(\x05\x12\x13\n\x0b\x63ompression\x18\x04 \x01(\t\x12\x0e\n\x06\x64igest\x18\x05 \x01(\t\x12\x13\n\x0b\x63hunk_index\x18\x06 \x01(\x05\"|\n\x0cWeightsChunk\x12%\n\x06header\x18\x01 \x01(\x0b\x32\x13.node.WeightsHeaderH\x00\x12\x0e\n\x04\x64\x61ta\x18\x02 \x01(\x0cH\x00\x12\'\n\x07trailer\x18\x03 \x01(\x0b\x32\x14.node.WeightsTrailerH\x00\x42\x0c\n\nchunk_type\"A\n\rWeightsHeader\x12\"\n\x07message\x18\x01 \x01(\x0b\x32\x11.node.RootMessage\x12\x0c\n\x04size\x18\x02 \x01(\x03\"\x1f\n\x0eWeightsTrailer\x12\r\n\x05\x63rc32\x18\x01 \x01(\r\"6\n\x10HandShakeRequest\x12\x0c\n\x04\x61\x64\x64r\x18\x01 \x01(\t\x12\x14\n\x0c\x63ompressions\x18\x02 \x03(\t\"F\n\x11HandShakeResponse\x12\x12\n\x05\x65rror\x18\x01 \x01(\tH\x00\x88\x01\x01\x12\x13\n\x0b\x63ompression\x18\x02 \x01(\tB\x08\n\x06_error\"/\n\x0fResponseMessage\x12\x12\n\x05\x65rror\x18\x01 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error2\xf8\x01\n\x0cNodeServices\x12<\n\thandshake\x12\x16.node.HandShakeRequest\x1a\x17.node.HandShakeResponse\x12<\n\ndisconnect\x12\x16.node.HandShakeRequest\x1a\x16.google.protobuf.Empty\x12\x30\n\x04send\x12\x11.node.RootMessage\x1a\x15.node.ResponseMessage\x12:\n\x0bsend_stream\x12\x12.node.WeightsChunk\x1a\x15.node.ResponseMessage(\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -27,11 +27,19 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_MESSAGE']._serialized_start=208
   _globals['_MESSAGE']._serialized_end=258
   _globals['_WEIGHTS']._serialized_start=260
-  _globals['_WEIGHTS']._serialized_end=329
-  _globals['_HANDSHAKEREQUEST']._serialized_start=331
-  _globals['_HANDSHAKEREQUEST']._serialized_end=363
-  _globals['_RESPONSEMESSAGE']._serialized_start=365
-  _globals['_RESPONSEMESSAGE']._serialized_end=412
-  _globals['_NODESERVICES']._serialized_start=415
-  _globals['_NODESERVICES']._serialized_end=601
+  _globals['_WEIGHTS']._serialized_end=387
+  _globals['_WEIGHTSCHUNK']._serialized_start=389
+  _globals['_WEIGHTSCHUNK']._serialized_end=513
+  _globals['_WEIGHTSHEADER']._serialized_start=515
+  _globals['_WEIGHTSHEADER']._serialized_end=580
+  _globals['_WEIGHTSTRAILER']._serialized_start=582
+  _globals['_WEIGHTSTRAILER']._serialized_end=613
+  _globals['_HANDSHAKEREQUEST']._serialized_start=615
+  _globals['_HANDSHAKEREQUEST']._serialized_end=669
+  _globals['_HANDSHAKERESPONSE']._serialized_start=671
+  _globals['_HANDSHAKERESPONSE']._serialized_end=741
+  _globals['_RESPONSEMESSAGE']._serialized_start=743
+  _globals['_RESPONSEMESSAGE']._serialized_end=790
+  _globals['_NODESERVICES']._serialized_start=793
+  _globals['_NODESERVICES']._serialized_end=1041
 # @@protoc_insertion_point(module_scope)
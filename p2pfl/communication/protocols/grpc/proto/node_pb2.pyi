@@ -77,8 +77,14 @@ class Weights(google.protobuf.message.Message):
     WEIGHTS_FIELD_NUMBER: builtins.int
     CONTRIBUTORS_FIELD_NUMBER: builtins.int
     NUM_SAMPLES_FIELD_NUMBER: builtins.int
+    COMPRESSION_FIELD_NUMBER: builtins.int
+    DIGEST_FIELD_NUMBER: builtins.int
+    CHUNK_INDEX_FIELD_NUMBER: builtins.int
     weights: builtins.bytes
     num_samples: builtins.int
+    compression: builtins.str
+    digest: builtins.str
+    chunk_index: builtins.int
     @property
     def contributors(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
     def __init__(
@@ -87,26 +93,113 @@ class Weights(google.protobuf.message.Message):
         weights: builtins.bytes = ...,
         contributors: collections.abc.Iterable[builtins.str] | None = ...,
         num_samples: builtins.int = ...,
+        compression: builtins.str = ...,
+        digest: builtins.str = ...,
+        chunk_index: builtins.int = ...,
     ) -> None: ...
-    def ClearField(self, field_name: typing.Literal["contributors", b"contributors", "num_samples", b"num_samples", "weights", b"weights"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["chunk_index", b"chunk_index", "compression", b"compression", "contributors", b"contributors", "digest", b"digest", "num_samples", b"num_samples", "weights", b"weights"]) -> None: ...
 
 global___Weights = Weights
 
+@typing.final
+class WeightsChunk(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    HEADER_FIELD_NUMBER: builtins.int
+    DATA_FIELD_NUMBER: builtins.int
+    TRAILER_FIELD_NUMBER: builtins.int
+    data: builtins.bytes
+    @property
+    def header(self) -> global___WeightsHeader: ...
+    @property
+    def trailer(self) -> global___WeightsTrailer: ...
+    def __init__(
+        self,
+        *,
+        header: global___WeightsHeader | None = ...,
+        data: builtins.bytes = ...,
+        trailer: global___WeightsTrailer | None = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing.Literal["chunk_type", b"chunk_type", "data", b"data", "header", b"header", "trailer", b"trailer"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["chunk_type", b"chunk_type", "data", b"data", "header", b"header", "trailer", b"trailer"]) -> None: ...
+    def WhichOneof(self, oneof_group: typing.Literal["chunk_type", b"chunk_type"]) -> typing.Literal["header", "data", "trailer"] | None: ...
+
+global___WeightsChunk = WeightsChunk
+
+@typing.final
+class WeightsHeader(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    MESSAGE_FIELD_NUMBER: builtins.int
+    SIZE_FIELD_NUMBER: builtins.int
+    size: builtins.int
+    @property
+    def message(self) -> global___RootMessage: ...
+    def __init__(
+        self,
+        *,
+        message: global___RootMessage | None = ...,
+        size: builtins.int = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing.Literal["message", b"message"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["message", b"message", "size", b"size"]) -> None: ...
+
+global___WeightsHeader = WeightsHeader
+
+@typing.final
+class WeightsTrailer(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    CRC32_FIELD_NUMBER: builtins.int
+    crc32: builtins.int
+    def __init__(
+        self,
+        *,
+        crc32: builtins.int = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["crc32", b"crc32"]) -> None: ...
+
+global___WeightsTrailer = WeightsTrailer
+
 @typing.final
 class HandShakeRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
     ADDR_FIELD_NUMBER: builtins.int
+    COMPRESSIONS_FIELD_NUMBER: builtins.int
     addr: builtins.str
+    @property
+    def compressions(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
     def __init__(
         self,
         *,
         addr: builtins.str = ...,
+        compressions: collections.abc.Iterable[builtins.str] | None = ...,
     ) -> None: ...
-    def ClearField(self, field_name: typing.Literal["addr", b"addr"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["addr", b"addr", "compressions", b"compressions"]) -> None: ...
 
 global___HandShakeRequest = HandShakeRequest
 
+@typing.final
+class HandShakeResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    ERROR_FIELD_NUMBER: builtins.int
+    COMPRESSION_FIELD_NUMBER: builtins.int
+    error: builtins.str
+    compression: builtins.str
+    def __init__(
+        self,
+        *,
+        error: builtins.str | None = ...,
+        compression: builtins.str = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing.Literal["_error", b"_error", "error", b"error"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["_error", b"_error", "compression", b"compression", "error", b"error"]) -> None: ...
+    def WhichOneof(self, oneof_group: typing.Literal["_error", b"_error"]) -> typing.Literal["error"] | None: ...
+
+global___HandShakeResponse = HandShakeResponse
+
 @typing.final
 class ResponseMessage(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -18,7 +18,7 @@ class NodeServicesStub(object):
         self.handshake = channel.unary_unary(
                 '/node.NodeServices/handshake',
                 request_serializer=node__pb2.HandShakeRequest.SerializeToString,
-                response_deserializer=node__pb2.ResponseMessage.FromString,
+                response_deserializer=node__pb2.HandShakeResponse.FromString,
                 )
         self.disconnect = channel.unary_unary(
                 '/node.NodeServices/disconnect',
@@ -30,6 +30,11 @@ class NodeServicesStub(object):
                 request_serializer=node__pb2.RootMessage.SerializeToString,
                 response_deserializer=node__pb2.ResponseMessage.FromString,
                 )
+        self.send_stream = channel.stream_unary(
+                '/node.NodeServices/send_stream',
+                request_serializer=node__pb2.WeightsChunk.SerializeToString,
+                response_deserializer=node__pb2.ResponseMessage.FromString,
+                )
 
 
 class NodeServicesServicer(object):
@@ -53,13 +58,19 @@ class NodeServicesServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def send_stream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_NodeServicesServicer_to_server(servicer, server):
     rpc_method_handlers = {
             'handshake': grpc.unary_unary_rpc_method_handler(
                     servicer.handshake,
                     request_deserializer=node__pb2.HandShakeRequest.FromString,
-                    response_serializer=node__pb2.ResponseMessage.SerializeToString,
+                    response_serializer=node__pb2.HandShakeResponse.SerializeToString,
             ),
             'disconnect': grpc.unary_unary_rpc_method_handler(
                     servicer.disconnect,
@@ -71,6 +82,11 @@ def add_NodeServicesServicer_to_server(servicer, server):
                     request_deserializer=node__pb2.RootMessage.FromString,
                     response_serializer=node__pb2.ResponseMessage.SerializeToString,
             ),
+            'send_stream': grpc.stream_unary_rpc_method_handler(
+                    servicer.send_stream,
+                    request_deserializer=node__pb2.WeightsChunk.FromString,
+                    response_serializer=node__pb2.ResponseMessage.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'node.NodeServices', rpc_method_handlers)
@@ -94,7 +110,7 @@ class NodeServices(object):
             metadata=None):
         return grpc.experimental.unary_unary(request, target, '/node.NodeServices/handshake',
             node__pb2.HandShakeRequest.SerializeToString,
-            node__pb2.ResponseMessage.FromString,
+            node__pb2.HandShakeResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
@@ -131,3 +147,20 @@ class NodeServices(object):
             node__pb2.ResponseMessage.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def send_stream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/node.NodeServices/send_stream',
+            node__pb2.WeightsChunk.SerializeToString,
+            node__pb2.ResponseMessage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -24,7 +24,7 @@ class NodeServicesStub:
     def __init__(self, channel: typing.Union[grpc.Channel, grpc.aio.Channel]) -> None: ...
     handshake: grpc.UnaryUnaryMultiCallable[
         node_pb2.HandShakeRequest,
-        node_pb2.ResponseMessage,
+        node_pb2.HandShakeResponse,
     ]
 
     disconnect: grpc.UnaryUnaryMultiCallable[
@@ -37,10 +37,15 @@ class NodeServicesStub:
         node_pb2.ResponseMessage,
     ]
 
+    send_stream: grpc.StreamUnaryMultiCallable[
+        node_pb2.WeightsChunk,
+        node_pb2.ResponseMessage,
+    ]
+
 class NodeServicesAsyncStub:
     handshake: grpc.aio.UnaryUnaryMultiCallable[
         node_pb2.HandShakeRequest,
-        node_pb2.ResponseMessage,
+        node_pb2.HandShakeResponse,
     ]
 
     disconnect: grpc.aio.UnaryUnaryMultiCallable[
@@ -53,13 +58,18 @@ class NodeServicesAsyncStub:
         node_pb2.ResponseMessage,
     ]
 
+    send_stream: grpc.aio.StreamUnaryMultiCallable[
+        node_pb2.WeightsChunk,
+        node_pb2.ResponseMessage,
+    ]
+
 class NodeServicesServicer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def handshake(
         self,
         request: node_pb2.HandShakeRequest,
         context: _ServicerContext,
-    ) -> typing.Union[node_pb2.ResponseMessage, collections.abc.Awaitable[node_pb2.ResponseMessage]]: ...
+    ) -> typing.Union[node_pb2.HandShakeResponse, collections.abc.Awaitable[node_pb2.HandShakeResponse]]: ...
 
     @abc.abstractmethod
     def disconnect(
@@ -75,4 +85,11 @@ class NodeServicesServicer(metaclass=abc.ABCMeta):
         context: _ServicerContext,
     ) -> typing.Union[node_pb2.ResponseMessage, collections.abc.Awaitable[node_pb2.ResponseMessage]]: ...
 
+    @abc.abstractmethod
+    def send_stream(
+        self,
+        request_iterator: _MaybeAsyncIterator[node_pb2.WeightsChunk],
+        context: _ServicerContext,
+    ) -> typing.Union[node_pb2.ResponseMessage, collections.abc.Awaitable[node_pb2.ResponseMessage]]: ...
+
 def add_NodeServicesServicer_to_server(servicer: NodeServicesServicer, server: typing.Union[grpc.Server, grpc.aio.Server]) -> None: ...
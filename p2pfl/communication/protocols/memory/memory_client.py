@@ -81,6 +81,7 @@ class InMemoryClient(Client):
         serialized_model: bytes,
         contributors: Optional[List[str]] = None,
         weight: int = 1,
+        chunk_index: int = 0,
     ) -> Dict[str, Union[str, int, bytes, List[str]]]:
         """
         Build a weight message to send to the neighbors.
@@ -91,6 +92,7 @@ class InMemoryClient(Client):
             serialized_model: Serialized model to send.
             contributors: List of contributors.
             weight: Weight of the message.
+            chunk_index: Index of the chunk of the parameters, if only a chunk is sent.
 
         """
         if contributors is None:
@@ -101,6 +103,7 @@ class InMemoryClient(Client):
             "weights": serialized_model,
             "contributors": contributors,
             "weight": weight,
+            "chunk_index": chunk_index,
             "cmd": cmd,
         }
 
@@ -163,6 +163,7 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
         serialized_model: bytes,
         contributors: Optional[List[str]] = None,
         weight: int = 1,
+        chunk_index: int = 0,
     ) -> Any:
         """
         Build weights.
@@ -173,11 +174,12 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
             serialized_model: The serialized model.
             contributors: The model contributors.
             weight: The weight of the model (amount of samples used).
+            chunk_index: Index of the chunk of the parameters, if only a chunk is sent (e.g. ring all-reduce).
 
         """
         if contributors is None:
             contributors = []
-        return self._client.build_weights(cmd, round, serialized_model, contributors, weight)
+        return self._client.build_weights(cmd, round, serialized_model, contributors, weight, chunk_index)
 
     @running
     def send(
@@ -189,6 +191,7 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
         ],
         raise_error: bool = False,
         remove_on_error: bool = True,
+        create_connection: bool = False,
     ) -> None:
         """
         Send a message to a neighbor.
@@ -198,9 +201,10 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
             msg: The message to sen
             raise_error: If raise error.
             remove_on_error: If remove on error.d.
+            create_connection: Create a temporary connection if the neighbor is not directly connected.
 
         """
-        self._client.send(nei, msg, raise_error=raise_error, remove_on_error=remove_on_error)
+        self._client.send(nei, msg, create_connection=create_connection, raise_error=raise_error, remove_on_error=remove_on_error)
 
     @running
     def broadcast(
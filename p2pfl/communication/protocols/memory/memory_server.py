@@ -187,12 +187,23 @@ class InMemoryServer:
         # Process message
         if request["cmd"] in self.__commands:
             try:
+                # Discard models that are not needed before decoding them
+                if not self.__commands[request["cmd"]].admit(
+                    request["source"],
+                    request["round"],
+                    contributors=request["contributors"],
+                    num_samples=request["weight"],
+                    chunk_index=request["chunk_index"],
+                ):
+                    logger.debug(self.addr, f"🙅 {request['cmd'].upper()} from {request['source']} not needed. Discarded before decoding.")
+                    return {}
                 self.__commands[request["cmd"]].execute(
                     request["source"],
                     request["round"],
                     weights=request["weights"],
                     contributors=request["contributors"],
                     num_samples=request["weight"],
+                    chunk_index=request["chunk_index"],
                 )
             except Exception as e:
                 error_text = f"Error while processing model: {request['cmd']}: {e}"
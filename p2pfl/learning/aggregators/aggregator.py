@@ -19,9 +19,9 @@
 """Abstract aggregator."""
 
 import threading
-from typing import List
+from typing import Dict, FrozenSet, List, Optional, Set
 
-from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.learning.frameworks.p2pfl_model import DetachedP2PFLModel, P2PFLModel
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
 
@@ -45,8 +45,21 @@ class Aggregator:
         """Initialize the aggregator."""
         self.node_name = node_name
         self.__train_set: List[str] = []  # TODO: Remove the trainset from the state
+        self.__train_set_nodes: Set[str] = set()
         self.__models: List[P2PFLModel] = []
+        self.__folded_contributors: List[str] = []
+
+        # Contributors of the added models (updated as models are added)
+        self.__aggregated: List[str] = []
+        self.__aggregated_nodes: Set[str] = set()
         self.partial_aggregation = False
+        self.incremental = False
+        self.asynchronous = False
+
+        # Partial aggregations (by excluded contributors), valid until a model is added
+        self.__partial_aggregations: Dict[FrozenSet[str], P2PFLModel] = {}
+        self.__models_version = 0
+        self.__partial_lock = threading.Lock()
 
         # Locks
         self.__agg_lock = threading.Lock()
@@ -63,6 +76,67 @@ class Aggregator:
         """
         raise NotImplementedError
 
+    def aggregate_partial(self, models: List[P2PFLModel], except_models: List[P2PFLModel]) -> P2PFLModel:
+        """
+        Aggregate all the models but some of them (only aggregators that support partial aggregations).
+
+        Aggregators can override it to derive the result from the aggregation of all the models.
+
+        Args:
+            models: All the models of the aggregation.
+            except_models: The models to exclude.
+
+        Returns:
+            The aggregation of the rest of the models.
+
+        """
+        return self.aggregate([m for m in models if all(m is not e for e in except_models)])
+
+    def fold_model(self, model: P2PFLModel) -> None:
+        """
+        Fold a model into the running aggregation, so it does not need to be kept (only incremental aggregators).
+
+        Args:
+            model: Model to fold.
+
+        """
+        raise NotImplementedError
+
+    def get_folded_model(self) -> P2PFLModel:
+        """
+        Get the running aggregation of the folded models as a model (only incremental aggregators).
+
+        Returns:
+            The running aggregation, weighted by the samples of the folded models.
+
+        """
+        raise NotImplementedError
+
+    def add_update(self, update: P2PFLModel, round: int) -> None:
+        """
+        Buffer the update of a node (only asynchronous aggregators).
+
+        Args:
+            update: The update (difference between the trained model and the model it started from).
+            round: The round of the model the update started from.
+
+        """
+        raise NotImplementedError
+
+    def apply_updates(self, model: P2PFLModel, round: int) -> Optional[P2PFLModel]:
+        """
+        Apply the buffered updates to a model, if enough updates are buffered (only asynchronous aggregators).
+
+        Args:
+            model: The current model.
+            round: The round of the current model.
+
+        Returns:
+            The updated model (None if there are not enough updates).
+
+        """
+        raise NotImplementedError
+
     def get_required_callbacks(self) -> List[str]:
         """
         Get the required callbacks for the aggregation.
@@ -86,6 +160,7 @@ class Aggregator:
         """
         if self._finish_aggregation_event.is_set():
             self.__train_set = nodes_to_aggregate
+            self.__train_set_nodes = set(nodes_to_aggregate)
             self._finish_aggregation_event.clear()
         else:
             raise Exception("It is not possible to set nodes to aggregate when the aggregation is running.")
@@ -94,7 +169,12 @@ class Aggregator:
         """Clear the aggregation (remove trainset and release locks)."""
         with self.__agg_lock:
             self.__train_set = []
+            self.__train_set_nodes = set()
             self.__models = []
+            self.__folded_contributors = []
+            self.__aggregated = []
+            self.__aggregated_nodes = set()
+            self.__invalidate_partial_aggregations()
             self._finish_aggregation_event.set()
 
     def get_aggregated_models(self) -> List[str]:
@@ -105,10 +185,12 @@ class Aggregator:
             Name of nodes that colaborated to get the model.
 
         """
-        models_added = []
-        for n in self.__models:
-            models_added += n.get_contributors()
-        return models_added
+        return list(self.__aggregated)
+
+    def __get_models(self) -> List[P2PFLModel]:
+        if self.__folded_contributors:
+            return self.__models + [self.get_folded_model()]
+        return self.__models.copy()
 
     def add_model(self, model: P2PFLModel) -> List[str]:
         """
@@ -136,22 +218,31 @@ class Aggregator:
         #
 
         # Check if aggregation is needed
-        if len(self.__train_set) > len(self.get_aggregated_models()):
+        contributors = model.get_contributors()
+        if len(self.__train_set_nodes) > len(self.__aggregated_nodes):
             # Check if all nodes are in the train_set
-            if all(n in self.__train_set for n in model.get_contributors()):
+            if all(n in self.__train_set_nodes for n in contributors):
                 # Check if any model was added
-                any_model_added = any(n in self.get_aggregated_models() for n in model.get_contributors())
+                any_model_added = any(n in self.__aggregated_nodes for n in contributors)
                 if not any_model_added:
-                    # Aggregate model
-                    self.__models.append(model)
-                    models_added = str(len(self.get_aggregated_models()))
+                    # Aggregate model (incremental aggregators fold the received models right away, the local model is
+                    # kept so it can still be sent on its own)
+                    if self.incremental and isinstance(model, DetachedP2PFLModel):
+                        self.fold_model(model)
+                        self.__folded_contributors += contributors
+                    else:
+                        self.__models.append(model)
+                    self.__aggregated += contributors
+                    self.__aggregated_nodes.update(contributors)
+                    self.__invalidate_partial_aggregations()
+                    models_added = str(len(self.__aggregated_nodes))
                     logger.info(
                         self.node_name,
-                        f"🧩 Model added ({models_added}/{ str(len(self.__train_set))}) from {str(model.get_contributors())}",
+                        f"🧩 Model added ({models_added}/{ str(len(self.__train_set_nodes))}) from {str(contributors)}",
                     )
 
                     # Check if all models were added
-                    if len(self.get_aggregated_models()) >= len(self.__train_set):
+                    if len(self.__aggregated_nodes) >= len(self.__train_set_nodes):
                         self._finish_aggregation_event.set()
 
                     # Unlock and Return
@@ -160,12 +251,12 @@ class Aggregator:
                 else:
                     logger.debug(
                         self.node_name,
-                        f"Can't add a model from a node ({model.get_contributors()}) that is already in the training set.",
+                        f"Can't add a model from a node ({contributors}) that is already in the training set.",
                     )
             else:
                 logger.debug(
                     self.node_name,
-                    f"Can't add a model from a node ({model.get_contributors()}) that is not in the training set.",
+                    f"Can't add a model from a node ({contributors}) that is not in the training set.",
                 )
         else:
             logger.debug(self.node_name, "🚫 Received a model when is not needed (already aggregated).")
@@ -174,6 +265,23 @@ class Aggregator:
         self.__agg_lock.release()
         return []
 
+    def is_model_needed(self, contributors: List[str]) -> bool:
+        """
+        Check if a model of the given contributors would be added, so it can be discarded before decoding it.
+
+        Args:
+            contributors: The contributors of the model.
+
+        Returns:
+            True if the model is needed for the aggregation.
+
+        """
+        return (
+            len(contributors) > 0
+            and len(self.__train_set_nodes) > len(self.__aggregated_nodes)
+            and all(n in self.__train_set_nodes and n not in self.__aggregated_nodes for n in contributors)
+        )
+
     def wait_and_get_aggregation(self, timeout: int = Settings.AGGREGATION_TIMEOUT) -> P2PFLModel:
         """
         Wait for aggregation to finish.
@@ -205,7 +313,7 @@ class Aggregator:
                 logger.info(self.node_name, "🧠 Aggregating models.")
 
         # Notify node
-        return self.aggregate(self.__models)
+        return self.aggregate(self.__get_models())
 
     def get_missing_models(self) -> set:
         """
@@ -215,10 +323,8 @@ class Aggregator:
             A set of missing models.
 
         """
-        agg_models = []
-        for m in self.__models:
-            agg_models += m.get_contributors()
-        missing_models = set(self.__train_set) - set(agg_models)
+        # Membership checks only (models can be added concurrently)
+        missing_models = {n for n in self.__train_set_nodes if n not in self.__aggregated_nodes}
         return missing_models
 
     def __get_partial_aggregation(self, except_nodes: List[str]) -> P2PFLModel:
@@ -232,12 +338,30 @@ class Aggregator:
             Aggregated model, nodes aggregated and aggregation weight.
 
         """
-        models_to_aggregate = []
-        for m in self.__models.copy():
-            if all(n not in except_nodes for n in m.get_contributors()):
-                models_to_aggregate.append(m)
-
-        return self.aggregate(models_to_aggregate)
+        with self.__partial_lock:
+            version = self.__models_version
+        models = self.__get_models()
+        except_set = set(except_nodes)
+        except_models = [m for m in models if any(n in except_set for n in m.get_contributors())]
+
+        # Memoized by the contributors that are actually excluded
+        key = frozenset(n for m in except_models for n in m.get_contributors())
+        with self.__partial_lock:
+            if key in self.__partial_aggregations:
+                return self.__partial_aggregations[key]
+
+        model = self.aggregate_partial(models, except_models)
+
+        # Not cached if a model has been added meanwhile
+        with self.__partial_lock:
+            if version == self.__models_version:
+                self.__partial_aggregations[key] = model
+        return model
+
+    def __invalidate_partial_aggregations(self) -> None:
+        with self.__partial_lock:
+            self.__partial_aggregations = {}
+            self.__models_version += 1
 
     def __get_remaining_model(self, except_nodes) -> P2PFLModel:
         """
@@ -250,9 +374,10 @@ class Aggregator:
             Aggregated model, nodes aggregated and aggregation weight.
 
         """
-        for m in self.__models.copy():
+        except_set = set(except_nodes)
+        for m in self.__get_models():
             contributors = m.get_contributors()
-            if all(n not in except_nodes for n in contributors):
+            if all(n not in except_set for n in contributors):
                 return m
         raise NoModelsToAggregateError("No remaining models available for aggregation.")
 
@@ -0,0 +1,92 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Bulyan Aggregator."""
+
+from typing import List, Optional
+
+import numpy as np
+
+from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
+from p2pfl.learning.aggregators.krum import krum_scores, pairwise_distances
+from p2pfl.learning.aggregators.trimmed_mean import trimmed_mean
+from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+
+
+class Bulyan(Aggregator):
+    """
+    Bulyan [El Mhamdi et al., 2018].
+
+    Paper: https://arxiv.org/abs/1802.07927
+
+    Selects ``n - 2f`` models by applying Krum repeatedly (the distances are computed once) and aggregates them with a
+    coordinate-wise trimmed mean that discards the ``f`` largest and smallest values. Selections need all the models,
+    so partial aggregations are not supported.
+
+    Args:
+        node_name: String with the name of the node.
+        num_byzantine: Number of byzantine models tolerated (f).
+        chunk_size: Number of coordinates of every block (``Settings.AGGREGATION_CHUNK_SIZE`` by default).
+
+    """
+
+    def __init__(self, node_name: str = "unknown", num_byzantine: int = 0, chunk_size: Optional[int] = None) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name)
+        self.partial_aggregation = False
+        self.num_byzantine = num_byzantine
+        self.chunk_size = chunk_size
+
+    def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
+        """
+        Aggregate the models selected by Krum with a trimmed mean.
+
+        Args:
+            models: List of models to aggregate.
+
+        Returns:
+            A P2PFLModel with the aggregated.
+
+        """
+        # Check if there are models to aggregate
+        if len(models) == 0:
+            raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there is no models")
+
+        # Total Samples
+        total_samples = sum([m.get_num_samples() for m in models])
+
+        # Select the models (Krum over the remaining ones)
+        weights = [m.get_parameters() for m in models]
+        distances = pairwise_distances(weights, self.chunk_size)
+        remaining = list(range(len(models)))
+        selected: List[int] = []
+        for _ in range(max(1, len(models) - 2 * self.num_byzantine)):
+            scores = krum_scores(distances[np.ix_(remaining, remaining)], self.num_byzantine)
+            selected.append(remaining.pop(int(np.argmin(scores))))
+
+        # Trimmed mean of the selected models
+        params = trimmed_mean([weights[i] for i in selected], self.num_byzantine, self.chunk_size)
+
+        # Get contributors
+        contributors: List[str] = []
+        for m in models:
+            contributors = contributors + m.get_contributors()
+
+        # Return an aggregated p2pfl model
+        return models[0].build_detached_copy(params=params, num_samples=total_samples, contributors=contributors)
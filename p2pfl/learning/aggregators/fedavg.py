@@ -18,12 +18,13 @@
 
 """Federated Averaging (FedAvg) Aggregator."""
 
-from typing import List
-
-import numpy as np
+import threading
+from typing import List, Optional, Tuple
 
 from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
-from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.learning.compression.sparsification import SparseUpdate, accumulate_sparse_updates
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters
+from p2pfl.learning.frameworks.p2pfl_model import DetachedP2PFLModel, P2PFLModel
 
 
 class FedAvg(Aggregator):
@@ -31,12 +32,35 @@ class FedAvg(Aggregator):
     Federated Averaging (FedAvg) [McMahan et al., 2016].
 
     Paper: https://arxiv.org/abs/1602.05629.
+
+    Args:
+        node_name: String with the name of the node.
+        incremental: If True, received models are folded into a running weighted sum as they arrive instead of being
+            kept until the end of the round.
+
+    Partial aggregations are derived from the weighted sum of all the models (kept while models are added), by
+    subtracting the excluded models.
+
     """
 
-    def __init__(self, node_name: str = "unknown") -> None:
+    def __init__(self, node_name: str = "unknown", incremental: bool = False) -> None:
         """Initialize the aggregator."""
         super().__init__(node_name)
         self.partial_aggregation = True
+        self.incremental = incremental
+
+        # Running aggregation (incremental)
+        self.__accum: Optional[FlatParameters] = None
+        self.__accum_samples = 0
+        self.__accum_contributors: List[str] = []
+        self.__template: Optional[P2PFLModel] = None
+        self.__folded_model: Optional[P2PFLModel] = None
+        self.__fold_lock = threading.Lock()
+
+        # Weighted sum of all the models (partial aggregations)
+        self.__total_models: List[P2PFLModel] = []
+        self.__total: Optional[FlatParameters] = None
+        self.__total_lock = threading.Lock()
 
     def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
         """
@@ -56,17 +80,12 @@ class FedAvg(Aggregator):
         # Total Samples
         total_samples = sum([m.get_num_samples() for m in models])
 
-        # Create a Zero Model using numpy
-        first_model_weights = models[0].get_parameters()
-        accum = [np.zeros_like(layer) for layer in first_model_weights]
-
-        # Add weighted models
-        for m in models:
-            for i, layer in enumerate(m.get_parameters()):
-                accum[i] = np.add(accum[i], layer * m.get_num_samples())
+        # Create a Zero Model (flat buffer) and add weighted models
+        accum = FlatParameters(models[0].get_parameters(), zeros=True)
+        self.__add_models(accum, models)
 
         # Normalize Accum
-        accum = [np.divide(layer, total_samples) for layer in accum]
+        accum.divide(total_samples)
 
         # Get contributors
         contributors: List[str] = []
@@ -74,4 +93,120 @@ class FedAvg(Aggregator):
             contributors = contributors + m.get_contributors()
 
         # Return an aggregated p2pfl model
-        return models[0].build_copy(params=accum, num_samples=total_samples, contributors=contributors)
+        return models[0].build_detached_copy(params=accum, num_samples=total_samples, contributors=contributors)
+
+    def aggregate_partial(self, models: List[P2PFLModel], except_models: List[P2PFLModel]) -> P2PFLModel:
+        """
+        Aggregate all the models but some of them.
+
+        The excluded models are subtracted from the weighted sum of all the models. If most of the models are excluded,
+        the rest are aggregated directly.
+
+        Args:
+            models: All the models of the aggregation.
+            except_models: The models to exclude.
+
+        Returns:
+            The aggregation of the rest of the models.
+
+        """
+        included = [m for m in models if all(m is not e for e in except_models)]
+        total_samples = sum([m.get_num_samples() for m in included])
+        if len(included) == 0 or total_samples == 0 or len(except_models) >= len(included):
+            return self.aggregate(included)
+
+        # Weighted sum of all the models minus the excluded ones
+        accum = self.__copy_total(models)
+        self.__add_models(accum, except_models, sign=-1)
+        accum.divide(total_samples)
+
+        # Get contributors
+        contributors: List[str] = []
+        for m in included:
+            contributors = contributors + m.get_contributors()
+
+        # Return an aggregated p2pfl model
+        return included[0].build_detached_copy(params=accum, num_samples=total_samples, contributors=contributors)
+
+    def __copy_total(self, models: List[P2PFLModel]) -> FlatParameters:
+        # Models are only appended during a round, so only the new ones are added to the sum
+        with self.__total_lock:
+            num_summed = len(self.__total_models)
+            if self.__total is None or len(models) < num_summed or any(a is not b for a, b in zip(models, self.__total_models)):
+                self.__total = FlatParameters(models[0].get_parameters(), zeros=True)
+                num_summed = 0
+            self.__add_models(self.__total, models[num_summed:])
+            self.__total_models = list(models)
+            return FlatParameters(self.__total)
+
+    @staticmethod
+    def __add_models(accum: FlatParameters, models: List[P2PFLModel], sign: int = 1) -> None:
+        # Add weighted models (sparse models are added without densifying them)
+        sparse_updates: List[Tuple[SparseUpdate, float]] = []
+        for m in models:
+            update = m.get_sparse_update()
+            if update is not None:
+                sparse_updates.append((update, sign * m.get_num_samples()))
+                continue
+            accum.add_scaled(m.get_parameters(), sign * m.get_num_samples())
+        accumulate_sparse_updates(accum, sparse_updates)
+
+    def fold_model(self, model: P2PFLModel) -> None:
+        """
+        Add the weighted parameters of a model to the running sum. The model is not kept.
+
+        Args:
+            model: Model to fold.
+
+        """
+        num_samples = model.get_num_samples()
+        with self.__fold_lock:
+            if self.__accum is None:
+                self.__accum = FlatParameters(model.get_parameters(), zeros=True)
+                # Framework model, used to build the aggregation
+                self.__template = model.get_template() if isinstance(model, DetachedP2PFLModel) else model
+            update = model.get_sparse_update()
+            if update is not None:
+                accumulate_sparse_updates(self.__accum, [(update, num_samples)])
+            else:
+                self.__accum.add_scaled(model.get_parameters(), num_samples)
+            self.__accum_samples += num_samples
+            self.__accum_contributors += model.get_contributors()
+            self.__folded_model = None
+
+    def get_folded_model(self) -> P2PFLModel:
+        """
+        Get the average of the folded models. The result is reused until another model is folded.
+
+        Returns:
+            The average of the folded models, with their total number of samples.
+
+        Raises:
+            NoModelsToAggregateError: If no model has been folded.
+
+        """
+        with self.__fold_lock:
+            if self.__accum is None or self.__template is None:
+                raise NoModelsToAggregateError(f"({self.node_name}) Trying to get the running aggregation when there is no models")
+            if self.__folded_model is None:
+                params = FlatParameters(self.__accum)
+                params.divide(self.__accum_samples)
+                self.__folded_model = self.__template.build_detached_copy(
+                    params=params,
+                    num_samples=self.__accum_samples,
+                    contributors=list(self.__accum_contributors),
+                )
+            return self.__folded_model
+
+    def clear(self) -> None:
+        """Clear the aggregation (remove trainset, running aggregation and release locks)."""
+        super().clear()
+        with self.__fold_lock:
+            self.__accum = None
+            self.__accum_samples = 0
+            self.__accum_contributors = []
+            self.__template = None
+            self.__folded_model = None
+        with self.__total_lock:
+            self.__total_models = []
+            self.__total = None
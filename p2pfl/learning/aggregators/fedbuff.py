@@ -0,0 +1,152 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Federated Buffered Asynchronous Aggregation (FedBuff) Aggregator."""
+
+import threading
+from typing import List, Optional, Tuple
+
+from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters
+from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+
+def staleness_weight(staleness: int, exponent: float) -> float:
+    """
+    Weight of an update computed from an older model, ``(1 + staleness) ** -exponent``.
+
+    Args:
+        staleness: Number of rounds between the model the update started from and the current model.
+        exponent: Exponent of the polynomial decay (0 to ignore the staleness).
+
+    """
+    return float((1 + max(0, staleness)) ** -exponent)
+
+
+class FedBuff(Aggregator):
+    """
+    Federated Buffered Asynchronous Aggregation (FedBuff) [Nguyen et al., 2022].
+
+    Paper: https://arxiv.org/abs/2106.06639
+
+    Nodes do not wait for each other: they train from their current model and push the update (the difference between
+    the trained model and the model they started from), tagged with the round of that model. Updates are buffered and,
+    every time ``buffer_size`` updates are available, their weighted average is applied to the model and the round
+    advances. Updates are weighted by their samples and discounted by their staleness.
+
+    Args:
+        node_name: String with the name of the node.
+        buffer_size: Number of updates applied at once (``Settings.AGGREGATION_BUFFER_SIZE`` by default).
+        server_lr: Learning rate applied to the averaged update.
+        staleness_exponent: Exponent of the staleness discount (``Settings.AGGREGATION_STALENESS_EXPONENT`` by default).
+
+    """
+
+    def __init__(
+        self,
+        node_name: str = "unknown",
+        buffer_size: Optional[int] = None,
+        server_lr: float = 1.0,
+        staleness_exponent: Optional[float] = None,
+    ) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name)
+        self.partial_aggregation = False
+        self.asynchronous = True
+        self.buffer_size = max(1, Settings.AGGREGATION_BUFFER_SIZE if buffer_size is None else buffer_size)
+        self.server_lr = server_lr
+        self.staleness_exponent = Settings.AGGREGATION_STALENESS_EXPONENT if staleness_exponent is None else staleness_exponent
+
+        # Buffered updates (and the round they started from)
+        self.__buffer: List[Tuple[P2PFLModel, int]] = []
+        self.__buffer_lock = threading.Lock()
+
+    def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
+        """
+        Average updates, weighted by their samples (without staleness discount).
+
+        Args:
+            models: The updates.
+
+        Returns:
+            A P2PFLModel with the averaged update.
+
+        """
+        if len(models) == 0:
+            raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there is no models")
+        return self.__average([(m, 1.0) for m in models])
+
+    def add_update(self, update: P2PFLModel, round: int) -> None:
+        """
+        Buffer an update.
+
+        Args:
+            update: The update (difference between the trained model and the model it started from).
+            round: The round of the model the update started from.
+
+        """
+        with self.__buffer_lock:
+            self.__buffer.append((update, round))
+            buffered = len(self.__buffer)
+        logger.info(self.node_name, f"🧩 Update buffered ({buffered}/{self.buffer_size}) from {update.get_contributors()}")
+
+    def get_buffered_updates(self) -> int:
+        """Get the number of buffered updates."""
+        with self.__buffer_lock:
+            return len(self.__buffer)
+
+    def apply_updates(self, model: P2PFLModel, round: int) -> Optional[P2PFLModel]:
+        """
+        Apply a buffer of updates to a model, if enough updates are buffered.
+
+        Args:
+            model: The current model.
+            round: The round of the current model (to compute the staleness of the updates).
+
+        Returns:
+            The updated model (None if there are not enough updates).
+
+        """
+        with self.__buffer_lock:
+            if len(self.__buffer) < self.buffer_size:
+                return None
+            updates = self.__buffer[: self.buffer_size]
+            self.__buffer = self.__buffer[self.buffer_size :]
+
+        average = self.__average([(u, staleness_weight(round - r, self.staleness_exponent)) for u, r in updates])
+        params = FlatParameters(model.get_parameters())
+        params.add_scaled(average.get_parameters(), self.server_lr)
+        return model.build_detached_copy(params=params, num_samples=average.get_num_samples(), contributors=average.get_contributors())
+
+    def clear(self) -> None:
+        """Clear the aggregation and the buffered updates."""
+        super().clear()
+        with self.__buffer_lock:
+            self.__buffer = []
+
+    @staticmethod
+    def __average(updates: List[Tuple[P2PFLModel, float]]) -> P2PFLModel:
+        total_samples = sum(u.get_num_samples() for u, _ in updates)
+        accum = FlatParameters(updates[0][0].get_parameters(), zeros=True)
+        for update, discount in updates:
+            weight = update.get_num_samples() / total_samples if total_samples > 0 else 1 / len(updates)
+            accum.add_scaled(update.get_parameters(), weight * discount)
+        contributors = sorted({n for u, _ in updates for n in u.get_contributors()})
+        return updates[0][0].build_detached_copy(params=accum, num_samples=total_samples, contributors=contributors)
@@ -16,13 +16,15 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
+
 """Federated Median (FedMedian) Aggregator."""
 
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
 from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters, run_stacked
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 
 
@@ -31,20 +33,34 @@ class FedMedian(Aggregator):
     Federated Median (FedMedian) [Yin et al., 2018].
 
     Paper: https://arxiv.org/pdf/1803.01498v1.pdf
+
+    The coordinate-wise median is computed over blocks of the parameters, so at most ``num_models * chunk_size``
+    parameters are held per aggregation thread. The median of partial medians is not the median of the models, so
+    partial aggregations are not supported (models are gossiped as they are).
+
+    Args:
+        node_name: String with the name of the node.
+        chunk_size: Number of coordinates of every block (``Settings.AGGREGATION_CHUNK_SIZE`` by default).
+
     """
 
+    def __init__(self, node_name: str = "unknown", chunk_size: Optional[int] = None) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name)
+        self.partial_aggregation = False
+        self.chunk_size = chunk_size
+
     def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
         """
         Compute the median of the models.
 
         Args:
-            models: Dict with the models (node: model, num_samples).
+            models: List of models to aggregate.
 
         Returns:
             A P2PFLModel with the aggregated
 
         """
-        raise NotImplementedError("This method is not implemented yet (need to add tests)")
         # Check if there are models to aggregate
         if len(models) == 0:
             raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there are no models")
@@ -52,14 +68,30 @@ class FedMedian(Aggregator):
         # Total Samples
         total_samples = sum([m.get_num_samples() for m in models])
 
-        # Create a list to store the weights of each model
+        # Calculate the median of every layer
         weights = [m.get_parameters() for m in models]
+        median = FlatParameters(weights[0], zeros=True)
+        for i, layer in enumerate(median):
+            self.__median_layer([np.asarray(w[i]).reshape(-1) for w in weights], layer.reshape(-1))
 
-        # Calculate the median for each layer
-        median_weights = []
-        for layer_index in range(len(weights[0])):
-            layer_weights = [weights[model][layer_index] for model in range(len(weights))]
-            median_weights.append(np.median(np.array(layer_weights), axis=0))
+        # Get contributors
+        contributors: List[str] = []
+        for m in models:
+            contributors = contributors + m.get_contributors()
 
         # Return an aggregated p2pfl model
-        return models[0].build_copy(params=median_weights, num_samples=total_samples)
+        return models[0].build_detached_copy(params=median, num_samples=total_samples, contributors=contributors)
+
+    def __median_layer(self, layers: List[np.ndarray], out: np.ndarray) -> None:
+        # Middle positions (the same one if the number of models is odd)
+        kth = [(len(layers) - 1) // 2, len(layers) // 2]
+
+        def median_block(block: np.ndarray, start: int, end: int) -> None:
+            # Selection instead of a full sort
+            block.partition(kth, axis=0)
+            if kth[0] == kth[1]:
+                out[start:end] = block[kth[0]]
+            else:
+                out[start:end] = np.mean(block[kth], axis=0)
+
+        run_stacked(layers, median_block, self.chunk_size)
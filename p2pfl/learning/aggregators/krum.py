@@ -0,0 +1,196 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Krum and Multi-Krum Aggregators."""
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters, run_stacked
+from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+
+
+def pairwise_distances(weights: List[List[np.ndarray]], chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Compute the squared euclidean distances between the parameters of several models.
+
+    Distances are obtained from the Gram matrix of the flattened parameters (``d_ij = G_ii + G_jj - 2 G_ij``), which
+    is accumulated block by block. Blocks are centered first, so the distances between close models keep their
+    precision.
+
+    Args:
+        weights: The parameters of the models.
+        chunk_size: Number of coordinates of every block (``Settings.AGGREGATION_CHUNK_SIZE`` by default).
+
+    Returns:
+        The matrix of squared distances.
+
+    """
+    gram = np.zeros((len(weights), len(weights)), dtype=np.float64)
+    gram_lock = threading.Lock()
+
+    def add_block(block: np.ndarray, start: int, end: int) -> None:
+        centered = block - block.mean(axis=0)
+        block_gram = centered @ centered.T
+        with gram_lock:
+            gram[...] += block_gram
+
+    for i in range(len(weights[0])):
+        run_stacked([np.asarray(w[i]).reshape(-1) for w in weights], add_block, chunk_size)
+
+    norms = np.diag(gram)
+    return np.maximum(norms[:, None] + norms[None, :] - 2 * gram, 0)
+
+
+def krum_scores(distances: np.ndarray, num_byzantine: int) -> np.ndarray:
+    """
+    Compute the Krum score of every model: the sum of the distances to its ``n - f - 2`` closest models.
+
+    Args:
+        distances: The matrix of squared distances between the models.
+        num_byzantine: The number of byzantine models tolerated (f).
+
+    Returns:
+        The scores (lower is better).
+
+    """
+    num_models = len(distances)
+    # Closest models (at least one, if there are other models)
+    k = min(num_models - 1, max(1, num_models - num_byzantine - 2))
+    if k <= 0:
+        return np.zeros(num_models)
+    # The distance to itself (0) is the first one after sorting
+    return np.sort(distances, axis=1)[:, 1 : k + 1].sum(axis=1)
+
+
+def _weighted_average(models: List[P2PFLModel]) -> FlatParameters:
+    """
+    Compute the average of the parameters of several models, weighted by their number of samples.
+
+    Args:
+        models: The models.
+
+    Returns:
+        The averaged parameters.
+
+    """
+    total_samples = sum([m.get_num_samples() for m in models])
+    accum = FlatParameters(models[0].get_parameters(), zeros=True)
+    for m in models:
+        # Models without samples are averaged uniformly
+        accum.add_scaled(m.get_parameters(), m.get_num_samples() if total_samples > 0 else 1)
+    accum.divide(total_samples if total_samples > 0 else len(models))
+    return accum
+
+
+class Krum(Aggregator):
+    """
+    Krum [Blanchard et al., 2017].
+
+    Paper: https://arxiv.org/abs/1703.02757
+
+    Selects the model with the lowest sum of distances to its ``n - f - 2`` closest models. With ``num_selected > 1``
+    (Multi-Krum), the models with the lowest scores are averaged (weighted by their number of samples). Selections need
+    all the models, so partial aggregations are not supported.
+
+    Args:
+        node_name: String with the name of the node.
+        num_byzantine: Number of byzantine models tolerated (f).
+        num_selected: Number of selected models (m). If None, ``n - f``.
+        chunk_size: Number of coordinates of the blocks used to compute the distances (``Settings.AGGREGATION_CHUNK_SIZE``
+            by default).
+
+    """
+
+    def __init__(
+        self,
+        node_name: str = "unknown",
+        num_byzantine: int = 0,
+        num_selected: Optional[int] = 1,
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name)
+        self.partial_aggregation = False
+        self.num_byzantine = num_byzantine
+        self.num_selected = num_selected
+        self.chunk_size = chunk_size
+
+    def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
+        """
+        Aggregate the models with the lowest Krum scores.
+
+        Args:
+            models: List of models to aggregate.
+
+        Returns:
+            A P2PFLModel with the aggregated.
+
+        """
+        # Check if there are models to aggregate
+        if len(models) == 0:
+            raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there is no models")
+
+        # Select the models
+        distances = pairwise_distances([m.get_parameters() for m in models], self.chunk_size)
+        scores = krum_scores(distances, self.num_byzantine)
+        num_selected = len(models) - self.num_byzantine if self.num_selected is None else self.num_selected
+        num_selected = min(len(models), max(1, num_selected))
+        selected = [models[i] for i in np.argsort(scores, kind="stable")[:num_selected]]
+
+        # Get contributors (the aggregation covers all the models)
+        contributors: List[str] = []
+        for m in models:
+            contributors = contributors + m.get_contributors()
+
+        # Return an aggregated p2pfl model
+        return models[0].build_detached_copy(
+            params=_weighted_average(selected),
+            num_samples=sum([m.get_num_samples() for m in models]),
+            contributors=contributors,
+        )
+
+
+class MultiKrum(Krum):
+    """
+    Multi-Krum [Blanchard et al., 2017].
+
+    Averages the ``num_selected`` models with the lowest Krum scores (``n - f`` by default).
+
+    Args:
+        node_name: String with the name of the node.
+        num_byzantine: Number of byzantine models tolerated (f).
+        num_selected: Number of selected models (m). If None, ``n - f``.
+        chunk_size: Number of coordinates of the blocks used to compute the distances (``Settings.AGGREGATION_CHUNK_SIZE``
+            by default).
+
+    """
+
+    def __init__(
+        self,
+        node_name: str = "unknown",
+        num_byzantine: int = 0,
+        num_selected: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name, num_byzantine, num_selected, chunk_size)
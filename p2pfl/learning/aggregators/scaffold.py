@@ -23,6 +23,7 @@ from typing import Any, Dict, List
 import numpy as np
 
 from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 
 
@@ -70,46 +71,49 @@ class Scaffold(Aggregator):
         total_samples = sum([m.get_num_samples() for m in models])
         # initialize the accumulators for the model and the control variates
         first_model_weights = models[0].get_parameters()
-        accum_delta_y = [np.zeros_like(layer) for layer in first_model_weights]
+        accum_delta_y = FlatParameters(first_model_weights, zeros=True)
 
         # Accumulate weighted model updates
         for m in models:
             delta_y_i = self._get_and_validate_model_info(m)["delta_y_i"]
             num_samples = m.get_num_samples()
+            # Sparse models are relative to the global model, so their differences are the (sparsified) delta_y_i
+            update = m.get_sparse_update()
+            if update is None:
+                accum_delta_y.add_scaled(delta_y_i, num_samples)
+                continue
+            sparse_layers = update.get_layers()
+            update.add_differences_to(accum_delta_y, num_samples)
             for i, layer in enumerate(delta_y_i):
-                accum_delta_y[i] += layer * num_samples
+                if i not in sparse_layers:
+                    accum_delta_y[i] += layer * num_samples
 
-        # Normalize the accumulated model updates
-        accum_delta_y = [layer / total_samples for layer in accum_delta_y]
-        accum_delta_y = [layer * self.global_lr for layer in accum_delta_y]  # apply global learning rate
+        # Normalize the accumulated model updates and apply the global learning rate
+        accum_delta_y.divide(total_samples / self.global_lr)
 
         # Update global model
         if not self.global_model_params:
             self.global_model_params = models[0].get_parameters()
-        self.global_model_params = [param + delta for param, delta in zip(self.global_model_params, accum_delta_y)]
+        self.global_model_params = FlatParameters(self.global_model_params)
+        self.global_model_params.add_scaled(accum_delta_y, 1.0)
 
         # Accumulate control variates
         delta_c_i_first = self._get_and_validate_model_info(models[0])["delta_c_i"]
-        accum_c = [np.zeros_like(layer) for layer in delta_c_i_first]
-
         if delta_c_i_first is None:
             raise ValueError("delta_c_i cannot be None after validation")
+        accum_c = FlatParameters(delta_c_i_first, zeros=True)
 
         for m in models:
-            delta_c_i = self._get_and_validate_model_info(m)["delta_c_i"]
-            for i in range(len(accum_c)):
-                accum_c[i] += delta_c_i[i]
+            accum_c.add_scaled(self._get_and_validate_model_info(m)["delta_c_i"], 1.0)
 
         # Normalize the accumulated control variates
-        num_models = len(models)
-        accum_c = [layer / num_models for layer in accum_c]
+        accum_c.divide(len(models))
 
         # Update global c
         if not self.c:
-            self.c = [np.zeros_like(layer) for layer in accum_c]
-
-        for i in range(len(self.c)):
-            self.c[i] += accum_c[i]
+            self.c = FlatParameters(accum_c, zeros=True)
+        self.c = FlatParameters(self.c)
+        self.c.add_scaled(accum_c, 1.0)
 
         # Get contributors
         contributors = []
@@ -117,7 +121,11 @@ class Scaffold(Aggregator):
             contributors.extend(m.get_contributors())
 
         # Return the aggregated model with the global model parameters and the control variates
-        aggregated_model = models[0].build_copy(params=self.global_model_params, num_samples=total_samples, contributors=contributors)
+        aggregated_model = models[0].build_detached_copy(
+            params=self.global_model_params,
+            num_samples=total_samples,
+            contributors=contributors,
+        )
         aggregated_model.add_info("scaffold", {"global_c": self.c, "global_model_params": self.global_model_params})
 
         return aggregated_model
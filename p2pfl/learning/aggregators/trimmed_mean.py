@@ -0,0 +1,113 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Coordinate-wise Trimmed Mean Aggregator."""
+
+from typing import List, Optional
+
+import numpy as np
+
+from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters, run_stacked
+from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+
+
+def trimmed_mean(weights: List[List[np.ndarray]], num_trimmed: int, chunk_size: Optional[int] = None) -> FlatParameters:
+    """
+    Compute the coordinate-wise mean of several models, without the ``num_trimmed`` largest and smallest values.
+
+    Values are trimmed with a partial sort (``np.partition``) of blocks of coordinates.
+
+    Args:
+        weights: The parameters of the models.
+        num_trimmed: Number of values trimmed on each side (at most ``(n - 1) // 2``).
+        chunk_size: Number of coordinates of every block (``Settings.AGGREGATION_CHUNK_SIZE`` by default).
+
+    Returns:
+        The trimmed mean.
+
+    """
+    num_models = len(weights)
+    num_trimmed = max(0, min(num_trimmed, (num_models - 1) // 2))
+    kth = [num_trimmed, num_models - num_trimmed - 1]
+    result = FlatParameters(weights[0], zeros=True)
+    for i, layer in enumerate(result):
+        out = layer.reshape(-1)
+
+        def mean_block(block: np.ndarray, start: int, end: int, out: np.ndarray = out) -> None:
+            if num_trimmed > 0:
+                block.partition(kth, axis=0)
+            out[start:end] = np.mean(block[num_trimmed : num_models - num_trimmed], axis=0)
+
+        run_stacked([np.asarray(w[i]).reshape(-1) for w in weights], mean_block, chunk_size)
+    return result
+
+
+class TrimmedMean(Aggregator):
+    """
+    Coordinate-wise Trimmed Mean [Yin et al., 2018].
+
+    Paper: https://arxiv.org/abs/1803.01498
+
+    For every coordinate, the ``beta`` fraction of largest and smallest values are discarded and the rest are
+    averaged. Trimming needs all the models, so partial aggregations are not supported.
+
+    Args:
+        node_name: String with the name of the node.
+        beta: Fraction of the models trimmed on each side.
+        chunk_size: Number of coordinates of every block (``Settings.AGGREGATION_CHUNK_SIZE`` by default).
+
+    """
+
+    def __init__(self, node_name: str = "unknown", beta: float = 0.1, chunk_size: Optional[int] = None) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name)
+        self.partial_aggregation = False
+        self.beta = beta
+        self.chunk_size = chunk_size
+
+    def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
+        """
+        Compute the trimmed mean of the models.
+
+        Args:
+            models: List of models to aggregate.
+
+        Returns:
+            A P2PFLModel with the aggregated.
+
+        """
+        # Check if there are models to aggregate
+        if len(models) == 0:
+            raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there is no models")
+
+        # Total Samples
+        total_samples = sum([m.get_num_samples() for m in models])
+
+        # Trimmed mean
+        num_trimmed = int(self.beta * len(models))
+        params = trimmed_mean([m.get_parameters() for m in models], num_trimmed, self.chunk_size)
+
+        # Get contributors
+        contributors: List[str] = []
+        for m in models:
+            contributors = contributors + m.get_contributors()
+
+        # Return an aggregated p2pfl model
+        return models[0].build_detached_copy(params=params, num_samples=total_samples, contributors=contributors)
@@ -0,0 +1 @@
+"""Parameter codecs to reduce the size of the model payloads."""
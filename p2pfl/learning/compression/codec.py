@@ -0,0 +1,228 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Parameter codec abstraction."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError
+
+CodecEntry = Dict[str, Any]
+"""Codec applied to a payload: ``{"name": <codec name>, "meta": <json serializable metadata>}``."""
+
+
+class ParameterCodec(ABC):
+    """
+    Transformation applied to the model parameters before serializing them (and reverted after deserializing them).
+
+    Codecs return the metadata needed to revert the transformation, which is stored in the payload header.
+
+    """
+
+    delta: bool = False
+    """
+    True if the codec encodes the parameters relative to a base model that the receiver must also hold.
+    """
+
+    @staticmethod
+    @abstractmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        pass
+
+    def get_key(self) -> Any:
+        """
+        Get a key that identifies the output of the codec. Encoded parameters are reused while the key does not change.
+
+        Returns:
+            The codec key.
+
+        """
+        return self.get_name()
+
+    def on_round_start(self, params: List[np.ndarray], round: int) -> None:  # noqa: B027
+        """
+        Notify the codec that a new round starts.
+
+        Args:
+            params: The parameters of the global model at the start of the round.
+            round: The round.
+
+        """
+        pass
+
+    def on_local_update(self, params: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Transform the parameters of the local model after training (e.g. to sparsify the update).
+
+        Args:
+            params: The parameters of the local model.
+
+        Returns:
+            The parameters that the local model must take.
+
+        """
+        return params
+
+    @abstractmethod
+    def encode(self, params: List[np.ndarray]) -> Tuple[List[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Encode the parameters.
+
+        Args:
+            params: The parameters to encode.
+
+        Returns:
+            The encoded parameters and the metadata needed to decode them (None if the codec has not been applied).
+
+        """
+        pass
+
+    @abstractmethod
+    def decode(self, params: List[np.ndarray], meta: Dict[str, Any]) -> List[np.ndarray]:
+        """
+        Decode the parameters.
+
+        Args:
+            params: The encoded parameters.
+            meta: The metadata returned by the encoder.
+
+        Returns:
+            The decoded parameters.
+
+        Raises:
+            DecodingParamsError: If the parameters can not be decoded.
+
+        """
+        pass
+
+
+class CodecPipeline:
+    """
+    Ordered chain of codecs of a node.
+
+    Parameters are encoded by the codecs in order and decoded in the reverse order.
+
+    Args:
+        codecs: The codecs of the pipeline.
+
+    Raises:
+        ValueError: If several codecs are relative to a base model.
+
+    """
+
+    def __init__(self, codecs: List[ParameterCodec]) -> None:
+        """Initialize the pipeline."""
+        if sum(c.delta for c in codecs) > 1:
+            raise ValueError("Only one codec relative to a base model is supported.")
+        self.codecs = codecs
+
+    def get_codecs(self) -> List[ParameterCodec]:
+        """Get the codecs of the pipeline."""
+        return self.codecs
+
+    def get_key(self, delta: bool = True) -> Tuple[Any, ...]:
+        """
+        Get a key that identifies the output of the pipeline.
+
+        Args:
+            delta: If False, codecs relative to a base model are skipped.
+
+        """
+        return tuple(c.get_key() for c in self.codecs if delta or not c.delta)
+
+    def on_round_start(self, params: List[np.ndarray], round: int) -> None:
+        """
+        Notify the codecs that a new round starts.
+
+        Args:
+            params: The parameters of the global model at the start of the round.
+            round: The round.
+
+        """
+        for c in self.codecs:
+            c.on_round_start(params, round)
+
+    def on_local_update(self, params: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Transform the parameters of the local model after training.
+
+        Args:
+            params: The parameters of the local model.
+
+        Returns:
+            The parameters that the local model must take.
+
+        """
+        for c in self.codecs:
+            params = c.on_local_update(params)
+        return params
+
+    def encode(self, params: List[np.ndarray], delta: bool = True) -> Tuple[List[np.ndarray], List[CodecEntry]]:
+        """
+        Encode the parameters.
+
+        Args:
+            params: The parameters to encode.
+            delta: If False, codecs relative to a base model are skipped.
+
+        Returns:
+            The encoded parameters and the applied codecs.
+
+        """
+        applied: List[CodecEntry] = []
+        for c in self.codecs:
+            if c.delta and not delta:
+                continue
+            params, meta = c.encode(params)
+            if meta is not None:
+                applied.append({"name": c.get_name(), "meta": meta})
+        return params, applied
+
+    def decode(self, params: List[np.ndarray], applied: List[CodecEntry]) -> List[np.ndarray]:
+        """
+        Decode the parameters.
+
+        Codecs that are not in the pipeline are created from the :class:`CodecFactory`, so payloads of stateless
+        codecs (e.g. quantization) can be decoded by any node.
+
+        Args:
+            params: The encoded parameters.
+            applied: The codecs applied to the parameters.
+
+        Returns:
+            The decoded parameters.
+
+        Raises:
+            DeltaBaseMissingError: If the base model of a delta codec is not available (full weights are needed).
+            DecodingParamsError: If a codec is not available or the parameters can not be decoded.
+
+        """
+        from p2pfl.learning.compression.codec_factory import CodecFactory
+
+        codecs = {c.get_name(): c for c in self.codecs}
+        for entry in reversed(applied):
+            try:
+                codec = codecs[entry["name"]] if entry["name"] in codecs else CodecFactory.create_codec(entry["name"])
+            except ValueError as e:
+                raise DecodingParamsError(f"Codec {entry['name']} not available") from e
+            params = codec.decode(params, entry["meta"])
+        return params
@@ -0,0 +1,110 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""ParameterCodec factory."""
+
+from typing import Dict, List, Optional, Type, Union
+
+from p2pfl.learning.compression.codec import CodecPipeline, ParameterCodec
+from p2pfl.learning.compression.delta_codec import DeltaCodec
+from p2pfl.learning.compression.quantization import (
+    Bf16Codec,
+    Fp16Codec,
+    Int8ChannelCodec,
+    Int8Codec,
+    StochasticBf16Codec,
+    StochasticInt8ChannelCodec,
+    StochasticInt8Codec,
+)
+from p2pfl.learning.compression.sparsification import ThresholdCodec, TopKCodec
+
+###
+#   FACTORY
+###
+
+
+class CodecFactory:
+    """Factory for creating codecs by name (used to select them from the settings and to decode payloads)."""
+
+    _codec_registry: Dict[str, Type[ParameterCodec]] = {}
+
+    @classmethod
+    def register_codec(cls, codec: Type[ParameterCodec]) -> None:
+        """
+        Register a codec under its name.
+
+        Args:
+            codec: The codec class.
+
+        """
+        if codec.get_name() in cls._codec_registry:
+            raise ValueError(f"Codec {codec.get_name()} already registered.")
+        cls._codec_registry[codec.get_name()] = codec
+
+    @classmethod
+    def get_codec_names(cls) -> List[str]:
+        """Get the names of the registered codecs."""
+        return list(cls._codec_registry)
+
+    @classmethod
+    def create_codec(cls, name: str) -> ParameterCodec:
+        """
+        Create a codec.
+
+        Args:
+            name: The name of the codec.
+
+        Raises:
+            ValueError: If the codec is not registered.
+
+        """
+        if name not in cls._codec_registry:
+            raise ValueError(f"Codec {name} not registered.")
+        return cls._codec_registry[name]()
+
+    @classmethod
+    def create_pipeline(cls, codecs: Optional[List[Union[str, ParameterCodec]]]) -> Optional[CodecPipeline]:
+        """
+        Create a codec pipeline.
+
+        Args:
+            codecs: Codecs (or codec names) in encoding order.
+
+        Returns:
+            The pipeline (None if there are no codecs).
+
+        """
+        if not codecs:
+            return None
+        return CodecPipeline([cls.create_codec(c) if isinstance(c, str) else c for c in codecs])
+
+
+###
+#   REGISTER CODECS
+###
+
+CodecFactory.register_codec(DeltaCodec)
+CodecFactory.register_codec(TopKCodec)
+CodecFactory.register_codec(ThresholdCodec)
+CodecFactory.register_codec(Fp16Codec)
+CodecFactory.register_codec(Bf16Codec)
+CodecFactory.register_codec(StochasticBf16Codec)
+CodecFactory.register_codec(Int8Codec)
+CodecFactory.register_codec(Int8ChannelCodec)
+CodecFactory.register_codec(StochasticInt8Codec)
+CodecFactory.register_codec(StochasticInt8ChannelCodec)
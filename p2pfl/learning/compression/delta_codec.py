@@ -0,0 +1,138 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Delta codec."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from p2pfl.learning.compression.codec import ParameterCodec
+from p2pfl.learning.frameworks.exceptions import DeltaBaseMissingError
+
+
+def is_delta_layer(layer: np.ndarray, base_layer: np.ndarray) -> bool:
+    """Check if a layer can be encoded as the difference against the base layer (numeric, same shape and dtype)."""
+    return layer.shape == base_layer.shape and layer.dtype == base_layer.dtype and np.issubdtype(layer.dtype, np.number)
+
+
+class DeltaCodec(ParameterCodec):
+    """
+    Encode the parameters as the difference against the global model at the start of the round (the base).
+
+    All the nodes hold the same base when a round starts, so only ``params - base`` is sent, tagged with the round of
+    the base. Deltas of slowly changing models are small and compress well with the following codecs.
+
+    .. note::
+        Nodes aggregate the models in different orders, so bases can differ by rounding errors between nodes. These
+        differences are not accumulated across rounds, as every round starts from a new global model.
+
+    """
+
+    delta = True
+
+    def __init__(self) -> None:
+        """Initialize the codec."""
+        self.__base: Optional[Tuple[int, List[np.ndarray]]] = None
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "delta"
+
+    def get_key(self) -> Any:
+        """Get a key that identifies the output of the codec."""
+        base = self.__base
+        return (self.get_name(), base[0] if base is not None else None)
+
+    def get_base_round(self) -> Optional[int]:
+        """Get the round of the base model (None if not set)."""
+        base = self.__base
+        return base[0] if base is not None else None
+
+    def get_base(self) -> Optional[Tuple[int, List[np.ndarray]]]:
+        """Get the round and the parameters of the base model (None if not set)."""
+        return self.__base
+
+    def on_round_start(self, params: List[np.ndarray], round: int) -> None:
+        """
+        Store the global model as the base of the round.
+
+        Args:
+            params: The parameters of the global model at the start of the round.
+            round: The round.
+
+        """
+        # Copy: frameworks can share memory with the returned parameters and update them while training
+        self.__base = (round, [np.array(layer, copy=True) for layer in params])
+
+    def encode(self, params: List[np.ndarray]) -> Tuple[List[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Encode the parameters as the difference against the base.
+
+        Non-numeric layers and layers that do not match the base are sent as they are.
+
+        Args:
+            params: The parameters to encode.
+
+        Returns:
+            The encoded parameters and the metadata (None if there is no base yet).
+
+        """
+        base = self.__base
+        if base is None:
+            return params, None
+        round, base_params = base
+
+        encoded: List[np.ndarray] = []
+        layers: List[int] = []
+        for i, layer in enumerate(params):
+            layer = np.asarray(layer)
+            if i < len(base_params) and is_delta_layer(layer, base_params[i]):
+                encoded.append(np.subtract(layer, base_params[i]))
+                layers.append(i)
+            else:
+                encoded.append(layer)
+        return encoded, {"round": round, "layers": layers}
+
+    def decode(self, params: List[np.ndarray], meta: Dict[str, Any]) -> List[np.ndarray]:
+        """
+        Rebuild the parameters from the difference against the base.
+
+        Args:
+            params: The encoded parameters.
+            meta: The metadata returned by the encoder.
+
+        Returns:
+            The decoded parameters.
+
+        Raises:
+            DeltaBaseMissingError: If the base of the sender is not available.
+
+        """
+        base = self.__base
+        if base is None or base[0] != meta["round"]:
+            raise DeltaBaseMissingError(f"Base model of round {meta['round']} not available")
+        base_params = base[1]
+
+        decoded = list(params)
+        for i in meta["layers"]:
+            if i >= len(base_params) or base_params[i].shape != params[i].shape:
+                raise DeltaBaseMissingError("Base model does not match the delta")
+            decoded[i] = np.add(base_params[i], params[i], dtype=base_params[i].dtype)
+        return decoded
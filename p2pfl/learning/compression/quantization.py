@@ -0,0 +1,263 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Lossy quantization codecs.
+
+Only floating point layers are quantized, the rest are sent as they are. The original dtype of every quantized layer
+is recorded, so decoded parameters (and therefore aggregations) always use the original precision.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from p2pfl.learning.compression.codec import ParameterCodec
+
+_FP16_MAX = float(np.finfo(np.float16).max)
+
+
+def _is_quantizable(layer: np.ndarray) -> bool:
+    return np.issubdtype(layer.dtype, np.floating) and layer.size > 0
+
+
+class _CastCodec(ParameterCodec):
+    """Base class of codecs that cast every floating point layer to a smaller type."""
+
+    def encode(self, params: List[np.ndarray]) -> Tuple[List[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Cast the floating point layers.
+
+        Args:
+            params: The parameters to encode.
+
+        Returns:
+            The encoded parameters and the metadata (None if there are no floating point layers).
+
+        """
+        encoded: List[np.ndarray] = []
+        layers: Dict[str, str] = {}
+        for i, layer in enumerate(params):
+            layer = np.asarray(layer)
+            if _is_quantizable(layer):
+                encoded.append(self._cast(layer))
+                layers[str(i)] = layer.dtype.str
+            else:
+                encoded.append(layer)
+        if not layers:
+            return params, None
+        return encoded, {"layers": layers}
+
+    def decode(self, params: List[np.ndarray], meta: Dict[str, Any]) -> List[np.ndarray]:
+        """
+        Cast the layers back to their original dtype.
+
+        Args:
+            params: The encoded parameters.
+            meta: The metadata returned by the encoder.
+
+        Returns:
+            The decoded parameters.
+
+        """
+        decoded = list(params)
+        for i, dtype in meta["layers"].items():
+            decoded[int(i)] = self._uncast(params[int(i)], np.dtype(dtype))
+        return decoded
+
+    def _cast(self, layer: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def _uncast(self, layer: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        raise NotImplementedError
+
+
+class Fp16Codec(_CastCodec):
+    """Cast floating point layers to float16 (values out of range are clipped)."""
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "fp16"
+
+    def _cast(self, layer: np.ndarray) -> np.ndarray:
+        return np.clip(layer, -_FP16_MAX, _FP16_MAX).astype(np.float16)
+
+    def _uncast(self, layer: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        return layer.astype(dtype)
+
+
+class Bf16Codec(_CastCodec):
+    """
+    Cast floating point layers to bfloat16 (round to nearest even).
+
+    bfloat16 keeps the float32 range, so no clipping is needed. Values are sent as the 16 upper bits of their float32
+    representation.
+    """
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "bf16"
+
+    def _cast(self, layer: np.ndarray) -> np.ndarray:
+        bits = np.asarray(layer, dtype=np.float32, order="C").view(np.uint32)
+        rounded = bits + (np.uint32(0x7FFF) + ((bits >> 16) & np.uint32(1)))
+        # NaNs could be rounded to infinities
+        rounded = np.where(np.isnan(layer), np.uint32(0x7FC00000), rounded)
+        return (rounded >> 16).astype(np.uint16)
+
+    def _uncast(self, layer: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        bits = np.left_shift(layer.astype(np.uint32), np.uint32(16), dtype=np.uint32)
+        return np.asarray(bits).view(np.float32).astype(dtype, copy=False)
+
+
+class StochasticBf16Codec(Bf16Codec):
+    """Cast floating point layers to bfloat16 with stochastic rounding (unbiased in expectation)."""
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "bf16_stochastic"
+
+    def _cast(self, layer: np.ndarray) -> np.ndarray:
+        bits = np.asarray(layer, dtype=np.float32, order="C").view(np.uint32)
+        noise = np.random.default_rng().integers(0, 1 << 16, size=bits.shape, dtype=np.uint32)
+        # Infinities and NaNs are not rounded
+        rounded = np.where(np.isfinite(layer), bits + noise, bits)
+        return (rounded >> 16).astype(np.uint16)
+
+
+class Int8Codec(ParameterCodec):
+    """
+    Affine int8 quantization of floating point layers: ``x ≈ (q - zero_point) * scale``.
+
+    Scales and zero points are computed per layer, or per output channel (first axis) on the per-channel variants.
+    They are sent as extra float32/int8 arrays after the parameters.
+    """
+
+    per_channel: bool = False
+    stochastic: bool = False
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "int8"
+
+    def encode(self, params: List[np.ndarray]) -> Tuple[List[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Quantize the floating point layers.
+
+        Args:
+            params: The parameters to encode.
+
+        Returns:
+            The encoded parameters and the metadata (None if there are no floating point layers).
+
+        """
+        encoded: List[np.ndarray] = list(params)
+        extra: List[np.ndarray] = []
+        layers: Dict[str, str] = {}
+        rng = np.random.default_rng() if self.stochastic else None
+        for i, layer in enumerate(params):
+            layer = np.asarray(layer)
+            if not _is_quantizable(layer):
+                continue
+            q, scale, zero_point = self.__quantize(layer, rng)
+            encoded[i] = q
+            extra += [scale, zero_point]
+            layers[str(i)] = layer.dtype.str
+        if not layers:
+            return params, None
+        return encoded + extra, {"layers": layers}
+
+    def decode(self, params: List[np.ndarray], meta: Dict[str, Any]) -> List[np.ndarray]:
+        """
+        Dequantize the layers to their original dtype.
+
+        Args:
+            params: The encoded parameters.
+            meta: The metadata returned by the encoder.
+
+        Returns:
+            The decoded parameters.
+
+        """
+        num_params = len(params) - 2 * len(meta["layers"])
+        decoded = list(params[:num_params])
+        for j, (i, dtype) in enumerate(meta["layers"].items()):
+            q = decoded[int(i)]
+            scale, zero_point = params[num_params + 2 * j], params[num_params + 2 * j + 1]
+            shape = (-1,) + (1,) * (q.ndim - 1) if q.ndim > 0 else ()
+            x = (q.astype(np.float32) - zero_point.astype(np.float32).reshape(shape)) * scale.reshape(shape)
+            decoded[int(i)] = x.astype(np.dtype(dtype), copy=False)
+        return decoded
+
+    def __quantize(self, layer: np.ndarray, rng: Optional[np.random.Generator]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        x = layer.astype(np.float32, copy=False)
+        if self.per_channel and x.ndim > 1:
+            flat = x.reshape(x.shape[0], -1)
+            shape = (-1,) + (1,) * (x.ndim - 1)
+        else:
+            flat = x.reshape(1, -1)
+            shape = ()
+        # Range always includes 0, so it is exactly representable
+        low = np.minimum(flat.min(axis=1), 0)
+        high = np.maximum(flat.max(axis=1), 0)
+        scale = ((high - low) / 255).astype(np.float32)
+        scale[scale == 0] = 1
+        zero_point = np.round(-128 - low / scale).astype(np.float32)
+
+        scaled = x / scale.reshape(shape) + zero_point.reshape(shape)
+        q = np.floor(scaled + rng.random(x.shape, dtype=np.float32)) if rng is not None else np.round(scaled)
+        q = np.clip(q, -128, 127).astype(np.int8)
+        return q, scale, zero_point.astype(np.int8)
+
+
+class Int8ChannelCodec(Int8Codec):
+    """Affine int8 quantization with per-channel scales and zero points."""
+
+    per_channel = True
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "int8_channel"
+
+
+class StochasticInt8Codec(Int8Codec):
+    """Affine int8 quantization with stochastic rounding (unbiased in expectation)."""
+
+    stochastic = True
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "int8_stochastic"
+
+
+class StochasticInt8ChannelCodec(Int8Codec):
+    """Affine int8 quantization with per-channel scales and zero points and stochastic rounding."""
+
+    per_channel = True
+    stochastic = True
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "int8_channel_stochastic"
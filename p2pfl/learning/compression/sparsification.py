@@ -0,0 +1,315 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Sparsification codecs (top-k and threshold) with error feedback.
+
+After training, the update of the local model (against the base of the round) is sparsified and the coordinates that
+are not sent are kept in a residual, which is added to the update of the next rounds (error feedback). The local model
+takes the sparsified update, so it is sent as index/value pairs and aggregations of sparse models remain sparse.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from p2pfl.learning.compression.delta_codec import DeltaCodec, is_delta_layer
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError, DeltaBaseMissingError
+from p2pfl.settings import Settings
+
+
+def _index_dtype(size: int) -> np.dtype:
+    return np.dtype(np.int32) if size <= np.iinfo(np.int32).max else np.dtype(np.int64)
+
+
+class SparseUpdate:
+    """
+    Parameters represented as sparse differences against a base model.
+
+    Args:
+        base: The parameters of the base model.
+        layers: Sparse layers, as flat (row-major) indices and the differences at those indices.
+        dense: Layers that are not relative to the base.
+
+    """
+
+    def __init__(
+        self,
+        base: List[np.ndarray],
+        layers: Dict[int, Tuple[np.ndarray, np.ndarray]],
+        dense: Dict[int, np.ndarray],
+    ) -> None:
+        """Initialize the update."""
+        self.__base = base
+        self.__layers = layers
+        self.__dense = dense
+
+    def get_base(self) -> List[np.ndarray]:
+        """Get the parameters of the base model."""
+        return self.__base
+
+    def get_layers(self) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """Get the sparse layers (indices and differences)."""
+        return self.__layers
+
+    def get_dense_layers(self) -> Dict[int, np.ndarray]:
+        """Get the layers that are not relative to the base."""
+        return self.__dense
+
+    def nnz(self) -> int:
+        """Get the number of non-zero differences."""
+        return sum(indices.size for indices, _ in self.__layers.values())
+
+    def to_parameters(self) -> List[np.ndarray]:
+        """Build the dense parameters (``base + differences``)."""
+        params: List[np.ndarray] = []
+        for i in range(len(self.__layers) + len(self.__dense)):
+            if i in self.__dense:
+                params.append(self.__dense[i])
+            else:
+                indices, values = self.__layers[i]
+                layer = self.__base[i].copy()
+                layer.reshape(-1)[indices] += values
+                params.append(layer)
+        return params
+
+    def add_differences_to(self, accum: List[np.ndarray], weight: float) -> None:
+        """
+        Add the weighted differences of the sparse layers to an accumulator, in place. Only touches O(nnz) coordinates.
+
+        Args:
+            accum: Accumulator with the shapes of the parameters.
+            weight: The weight of the update.
+
+        """
+        for i, (indices, values) in self.__layers.items():
+            accum[i][np.unravel_index(indices, accum[i].shape)] += values * weight
+
+
+class SparseParameters(list):
+    """
+    Dense parameters that keep their sparse representation, so aggregators can avoid the dense layers.
+
+    Args:
+        update: The sparse update.
+
+    """
+
+    def __init__(self, update: SparseUpdate) -> None:
+        """Initialize the parameters."""
+        super().__init__(update.to_parameters())
+        self.__update = update
+
+    def get_update(self) -> SparseUpdate:
+        """Get the sparse representation of the parameters."""
+        return self.__update
+
+
+def accumulate_sparse_updates(accum: List[np.ndarray], updates: List[Tuple[SparseUpdate, float]]) -> None:
+    """
+    Add weighted sparse updates (``weight * parameters``) to an accumulator, in place.
+
+    Differences are added in O(nnz) per update. Bases are shared by the updates of a round, so every base layer is
+    added once, weighted by the sum of the weights of the updates that use it.
+
+    Args:
+        accum: Accumulator with the shapes of the parameters.
+        updates: The sparse updates and their weights.
+
+    """
+    bases: Dict[Tuple[int, int], Tuple[np.ndarray, float]] = {}
+    for update, weight in updates:
+        update.add_differences_to(accum, weight)
+        for i, layer in update.get_dense_layers().items():
+            accum[i] += layer * weight
+        for i in update.get_layers():
+            base_layer = update.get_base()[i]
+            key = (i, id(base_layer))
+            bases[key] = (base_layer, bases.get(key, (base_layer, 0))[1] + weight)
+    for (i, _), (base_layer, weight) in bases.items():
+        accum[i] += base_layer * weight
+
+
+class _SparseCodec(DeltaCodec):
+    """
+    Base class of the sparsification codecs.
+
+    Parameters are sent as the non-zero differences against the base of the round (index/value pairs). Layers whose
+    differences are not sparse enough are sent as they are, so any model can be encoded without loss.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the codec."""
+        super().__init__()
+        self.__residuals: Dict[int, np.ndarray] = {}
+
+    def on_local_update(self, params: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Sparsify the update of the local model, keeping the coordinates that are not sent in the residual.
+
+        Args:
+            params: The parameters of the local model.
+
+        Returns:
+            The parameters with the sparsified update (unchanged if there is no base yet).
+
+        """
+        base = self.get_base()
+        if base is None:
+            return params
+        base_params = base[1]
+
+        layers: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        dense: Dict[int, np.ndarray] = {}
+        for i, layer in enumerate(params):
+            layer = np.asarray(layer)
+            if i >= len(base_params) or layer.size == 0 or not is_delta_layer(layer, base_params[i]):
+                dense[i] = layer
+                continue
+            # Error feedback
+            update = np.subtract(layer, base_params[i]).reshape(-1)
+            residual = self.__residuals.get(i)
+            if residual is not None and residual.shape == update.shape:
+                update += residual
+            indices = self._select(update).astype(_index_dtype(update.size))
+            layers[i] = (indices, update[indices])
+            update[indices] = 0
+            self.__residuals[i] = update
+        return SparseParameters(SparseUpdate(base_params, layers, dense))
+
+    def encode(self, params: List[np.ndarray]) -> Tuple[List[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Encode the parameters as the non-zero differences against the base.
+
+        The differences of every sparse layer replace the layer, and their indices are appended after the parameters.
+
+        Args:
+            params: The parameters to encode.
+
+        Returns:
+            The encoded parameters and the metadata (None if there is no base yet or no layer is sparse).
+
+        """
+        base = self.get_base()
+        if base is None:
+            return params, None
+        round, base_params = base
+
+        encoded: List[np.ndarray] = list(params)
+        indices_list: List[np.ndarray] = []
+        layers: List[int] = []
+        for i, layer in enumerate(params):
+            layer = np.asarray(layer)
+            if i >= len(base_params) or not is_delta_layer(layer, base_params[i]):
+                continue
+            differences = np.subtract(layer, base_params[i]).reshape(-1)
+            indices = np.flatnonzero(differences).astype(_index_dtype(differences.size))
+            # Dense differences are cheaper to send as they are
+            if indices.size * (indices.itemsize + layer.itemsize) >= layer.nbytes:
+                continue
+            encoded[i] = differences[indices]
+            indices_list.append(indices)
+            layers.append(i)
+        if not layers:
+            return params, None
+        return encoded + indices_list, {"round": round, "layers": layers}
+
+    def decode(self, params: List[np.ndarray], meta: Dict[str, Any]) -> List[np.ndarray]:
+        """
+        Rebuild the parameters from the differences against the base.
+
+        Args:
+            params: The encoded parameters.
+            meta: The metadata returned by the encoder.
+
+        Returns:
+            The decoded parameters (:class:`SparseParameters`).
+
+        Raises:
+            DeltaBaseMissingError: If the base of the sender is not available.
+            DecodingParamsError: If the indices are not valid.
+
+        """
+        base = self.get_base()
+        if base is None or base[0] != meta["round"]:
+            raise DeltaBaseMissingError(f"Base model of round {meta['round']} not available")
+        base_params = base[1]
+
+        num_params = len(params) - len(meta["layers"])
+        layers: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        for j, i in enumerate(meta["layers"]):
+            if i >= len(base_params):
+                raise DeltaBaseMissingError("Base model does not match the sparse update")
+            indices, values = params[num_params + j], params[i]
+            if indices.shape != values.shape or (indices.size > 0 and (indices.min() < 0 or indices.max() >= base_params[i].size)):
+                raise DecodingParamsError("Invalid sparse layer")
+            layers[i] = (indices, values.astype(base_params[i].dtype, copy=False))
+        dense = {i: params[i] for i in range(num_params) if i not in layers}
+        return SparseParameters(SparseUpdate(base_params, layers, dense))
+
+    def _select(self, update: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class TopKCodec(_SparseCodec):
+    """
+    Send the largest (in magnitude) fraction of the coordinates of every layer of the update.
+
+    Args:
+        ratio: Fraction of coordinates sent (``Settings.SPARSIFICATION_RATIO`` by default).
+
+    """
+
+    def __init__(self, ratio: Optional[float] = None) -> None:
+        """Initialize the codec."""
+        super().__init__()
+        self.ratio = Settings.SPARSIFICATION_RATIO if ratio is None else ratio
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "topk"
+
+    def _select(self, update: np.ndarray) -> np.ndarray:
+        k = min(update.size, max(1, int(np.ceil(self.ratio * update.size))))
+        if k == update.size:
+            return np.arange(update.size)
+        return np.sort(np.argpartition(np.abs(update), -k)[-k:])
+
+
+class ThresholdCodec(_SparseCodec):
+    """
+    Send the coordinates of the update whose magnitude reaches a threshold.
+
+    Args:
+        threshold: Minimum magnitude of the coordinates sent (``Settings.SPARSIFICATION_THRESHOLD`` by default).
+
+    """
+
+    def __init__(self, threshold: Optional[float] = None) -> None:
+        """Initialize the codec."""
+        super().__init__()
+        self.threshold = Settings.SPARSIFICATION_THRESHOLD if threshold is None else threshold
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the codec name."""
+        return "threshold"
+
+    def _select(self, update: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(np.abs(update) >= self.threshold)
@@ -25,6 +25,12 @@ class DecodingParamsError(Exception):
     pass
 
 
+class DeltaBaseMissingError(DecodingParamsError):
+    """An exception raised when the base model needed to decode a delta is not available."""
+
+    pass
+
+
 class ModelNotMatchingError(Exception):
     """An exception raised when parameters do not match with the model."""
 
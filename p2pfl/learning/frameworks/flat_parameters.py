@@ -0,0 +1,245 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Flat parameter buffers.
+
+The layers of the main floating point dtype of a model are stored in one contiguous buffer, described by a layer table
+(position of every layer in the buffer). Aggregators operate on the whole buffer with a single in-place multiply-add per
+model, and frameworks get the layers as views of the buffer (no copies). Layers of other dtypes (e.g. integer counters)
+are kept apart.
+
+Operations over the buffer are split in chunks that are processed by a pool of threads (``Settings.AGGREGATION_WORKERS``).
+NumPy and BLAS release the GIL, so chunks are processed in parallel.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from p2pfl.settings import Settings
+
+try:
+    from scipy.linalg import blas  # type: ignore
+except ImportError:
+    blas = None
+
+
+def axpy(a: float, x: np.ndarray, y: np.ndarray) -> None:
+    """
+    Compute ``y += a * x`` in place, without temporary arrays when possible (fused BLAS operation if scipy is installed).
+
+    Args:
+        a: The scalar.
+        x: The array to add.
+        y: The contiguous array to update.
+
+    """
+    if blas is not None and y.ndim == 1 and y.dtype in (np.float32, np.float64) and y.flags.c_contiguous:
+        x = np.ascontiguousarray(x, dtype=y.dtype).reshape(-1)
+        if x.size == y.size:
+            (blas.saxpy if y.dtype == np.float32 else blas.daxpy)(x, y, a=a)
+            return
+    y += np.multiply(x, a, dtype=y.dtype, casting="unsafe").reshape(y.shape)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aggregation")
+            _executor_workers = workers
+        return _executor
+
+
+def _run_chunk(fn: Callable[[int, int], None], start: int, end: int) -> None:
+    _worker_state.active = True
+    try:
+        fn(start, end)
+    finally:
+        _worker_state.active = False
+
+
+def run_chunked(size: int, fn: Callable[[int, int], None]) -> None:
+    """
+    Apply a function to the chunks of a range of parameters, in parallel.
+
+    The range is split in up to ``Settings.AGGREGATION_WORKERS`` chunks of at least ``Settings.AGGREGATION_CHUNK_SIZE``
+    parameters. Small ranges (and calls made from an aggregation thread) are processed in the calling thread.
+
+    Args:
+        size: The number of parameters.
+        fn: Function called with the start and the end of every chunk. Chunks do not overlap.
+
+    """
+    num_chunks = min(Settings.AGGREGATION_WORKERS, size // max(1, Settings.AGGREGATION_CHUNK_SIZE))
+    if num_chunks <= 1 or getattr(_worker_state, "active", False):
+        fn(0, size)
+        return
+    bounds = [size * i // num_chunks for i in range(num_chunks + 1)]
+    executor = _get_executor(Settings.AGGREGATION_WORKERS)
+    futures = [executor.submit(_run_chunk, fn, bounds[i], bounds[i + 1]) for i in range(num_chunks)]
+    for future in futures:
+        future.result()
+
+
+def run_stacked(layers: List[np.ndarray], fn: Callable[[np.ndarray, int, int], None], block_size: Optional[int] = None) -> None:
+    """
+    Apply a function to blocks of coordinates of flat arrays of the same size, stacked one array per row.
+
+    Blocks are processed in parallel (:func:`run_chunked`) and at most ``len(layers) * block_size`` values are stacked
+    per thread.
+
+    Args:
+        layers: The flat arrays (e.g. the same layer of several models).
+        fn: Function called with every stacked block and its start and end. The block is reused between calls.
+        block_size: Number of coordinates of a block (``Settings.AGGREGATION_CHUNK_SIZE`` by default).
+
+    """
+    block_size = max(1, block_size or Settings.AGGREGATION_CHUNK_SIZE)
+    dtype = np.result_type(*layers)
+
+    def stack_chunk(start: int, end: int) -> None:
+        stack = np.empty((len(layers), min(block_size, end - start)), dtype=dtype)
+        for block_start in range(start, end, block_size):
+            block_end = min(block_start + block_size, end)
+            block = stack[:, : block_end - block_start]
+            for j, layer in enumerate(layers):
+                block[j] = layer[block_start:block_end]
+            fn(block, block_start, block_end)
+
+    run_chunked(layers[0].size, stack_chunk)
+
+
+def _buffer_dtype(layers: List[np.ndarray]) -> Optional[np.dtype]:
+    # Floating point dtype with most elements
+    sizes: Dict[np.dtype, int] = {}
+    for layer in layers:
+        if np.issubdtype(layer.dtype, np.floating):
+            sizes[layer.dtype] = sizes.get(layer.dtype, 0) + layer.size
+    return max(sizes, key=lambda dtype: sizes[dtype]) if sizes else None
+
+
+class FlatParameters(list):
+    """
+    Parameters stored in a flat contiguous buffer. The items of the list are views of the buffer.
+
+    Args:
+        params: The parameters (copied into the buffer).
+        zeros: If True, the parameters are only used for their shapes and dtypes and the buffer is zero-filled.
+
+    """
+
+    def __init__(self, params: List[np.ndarray], zeros: bool = False) -> None:
+        """Initialize the parameters."""
+        layers = [np.asarray(layer) for layer in params]
+        dtype = _buffer_dtype(layers)
+
+        # Layer table (index, start and end in the buffer)
+        layout: List[Tuple[int, int, int]] = []
+        size = 0
+        for i, layer in enumerate(layers):
+            if layer.dtype == dtype:
+                layout.append((i, size, size + layer.size))
+                size += layer.size
+        self.__layout = tuple(layout)
+        self.__buffer = np.zeros(size, dtype=dtype) if zeros else np.empty(size, dtype=dtype)
+
+        # Views of the buffer (the rest of the layers are copied apart)
+        items: List[np.ndarray] = []
+        flat_layers = iter(self.__layout)
+        for layer in layers:
+            if layer.dtype == dtype:
+                _, start, end = next(flat_layers)
+                view = self.__buffer[start:end].reshape(layer.shape)
+                if not zeros:
+                    view[...] = layer
+                items.append(view)
+            else:
+                items.append(np.zeros_like(layer) if zeros else layer.copy())
+        super().__init__(items)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle the parameters as a plain list, so the views are not pickled along with the buffer."""
+        return (list, (list(self),))
+
+    def get_buffer(self) -> np.ndarray:
+        """Get the flat buffer."""
+        return self.__buffer
+
+    def add_scaled(self, params: List[np.ndarray], weight: float) -> None:
+        """
+        Add weighted parameters (``weight * params``) in place.
+
+        Parameters with the same layer table are added with a single operation over every chunk of the buffer.
+
+        Args:
+            params: The parameters to add.
+            weight: The weight of the parameters.
+
+        """
+        buffer = self.__buffer
+        if isinstance(params, FlatParameters) and params.__layout == self.__layout:
+            source = params.__buffer
+
+            def add_chunk(start: int, end: int) -> None:
+                axpy(weight, source[start:end], buffer[start:end])
+
+        else:
+            layers = [(np.asarray(params[i]).reshape(-1), start, end) for i, start, end in self.__layout]
+
+            def add_chunk(start: int, end: int) -> None:
+                for layer, layer_start, layer_end in layers:
+                    lo, hi = max(start, layer_start), min(end, layer_end)
+                    if lo < hi:
+                        axpy(weight, layer[lo - layer_start : hi - layer_start], buffer[lo:hi])
+
+        run_chunked(buffer.size, add_chunk)
+        for i in self.__get_apart_layers():
+            self[i] = self[i] + params[i] * weight
+
+    def divide(self, divisor: float) -> None:
+        """
+        Divide the parameters in place (layers out of the buffer are replaced by the result of the division).
+
+        Args:
+            divisor: The divisor.
+
+        """
+        buffer = self.__buffer
+
+        def divide_chunk(start: int, end: int) -> None:
+            np.divide(buffer[start:end], divisor, out=buffer[start:end])
+
+        run_chunked(buffer.size, divide_chunk)
+        for i in self.__get_apart_layers():
+            self[i] = np.divide(self[i], divisor)
+
+    def __get_apart_layers(self) -> List[int]:
+        flat_layers = {i for i, _, _ in self.__layout}
+        return [i for i in range(len(self)) if i not in flat_layers]
@@ -128,6 +128,7 @@ class FlaxLearner(Learner):
                     logger.log_metric(self._self_addr, "epoch", epoch)
                     logger.log_metric(self._self_addr, "loss", avg_loss)
                     logger.log_metric(self._self_addr, "accuracy", avg_acc)
+                self.flax_model.increase_version()
 
             # Set model contribution
             self.flax_model.set_contribution([self._self_addr], self.data.get_num_samples(train=True))
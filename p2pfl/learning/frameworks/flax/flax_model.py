@@ -19,7 +19,6 @@
 """Flax Model for P2PFL."""
 
 import copy
-import pickle
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
@@ -52,7 +51,7 @@ class FlaxModel(P2PFLModel):
         super().__init__(model, None, num_samples, contributors, additional_info)
         self.model_params = init_params
         if params:
-            if isinstance(params, bytes):
+            if isinstance(params, (bytes, bytearray)):
                 params, _ = self.decode_parameters(params)
             self.model_params = self.__np_to_dict(self.model_params, params)
 
@@ -88,7 +87,7 @@ class FlaxModel(P2PFLModel):
             ModelNotMatchingError: If parameters don't match the model.
 
         """
-        if isinstance(params, bytes):
+        if isinstance(params, (bytes, bytearray)):
             params, _ = self.decode_parameters(params)
 
         try:
@@ -98,28 +97,7 @@ class FlaxModel(P2PFLModel):
                 raise ValueError("Unvalid parameters.")
         except Exception as e:
             raise ModelNotMatchingError("Not matching models") from e
-
-    def encode_parameters(self, params: Optional[List[np.ndarray]] = None) -> bytes:
-        """
-        Encode the parameters of the model.
-
-        Args:
-            params: The parameters of the model.
-
-        """
-        model_params = (
-            self.model_params
-            if not (params and self.model_params)
-            else self.__np_to_dict(
-                copy.deepcopy(self.model_params),
-                params,
-            )
-        )
-        data_to_serialize = {
-            "params": model_params,
-            "additional_info": self.additional_info,
-        }
-        return pickle.dumps(data_to_serialize)
+        self.increase_version()
 
     def decode_parameters(self, data: bytes) -> Tuple[List[np.ndarray], Dict[str, Any]]:
         """
@@ -129,14 +107,11 @@ class FlaxModel(P2PFLModel):
             data: The parameters of the model.
 
         """
-        try:
-            loaded_data = pickle.loads(data)
-            params_dict = loaded_data["params"]
-            additional_info = loaded_data.get("additional_info", {})
-            params = self.__dict_to_np(params_dict)
-            return params, additional_info
-        except Exception as e:
-            raise ModelNotMatchingError("Error decoding parameters") from e
+        params, additional_info = super().decode_parameters(data)
+        # Legacy pickle payloads carry the flax parameter dict
+        if isinstance(params, dict):
+            params = self.__dict_to_np(params)
+        return params, additional_info
 
     def build_copy(self, **kwargs) -> "P2PFLModel":
         """
@@ -149,7 +124,12 @@ class FlaxModel(P2PFLModel):
             A copy of the model.
 
         """
+        # Codecs are set before the parameters, as they are needed to decode them
+        params = kwargs.pop("params", None)
         flax_model = self.__class__(copy.deepcopy(self.model), copy.deepcopy(self.model_params), **kwargs)
+        flax_model.set_codecs(self.codecs)
+        if params is not None:
+            flax_model.set_parameters(params)
         return flax_model
 
     def get_framework(self) -> str:
@@ -27,7 +27,7 @@ from p2pfl.learning.aggregators.aggregator import Aggregator
 from p2pfl.learning.dataset.p2pfl_dataset import P2PFLDataset
 from p2pfl.learning.frameworks.callback import P2PFLCallback
 from p2pfl.learning.frameworks.callback_factory import CallbackFactory
-from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.learning.frameworks.p2pfl_model import DetachedP2PFLModel, P2PFLModel
 
 
 class Learner(ABC):
@@ -67,13 +67,20 @@ class Learner(ABC):
         """
         Set the model of the learner.
 
+        The codecs of the current model are kept, as they hold the node's codec state. Detached models are bound to the
+        current model.
+
         Args:
             model: The model of the learner.
 
         """
-        if isinstance(model, P2PFLModel):
+        if isinstance(model, DetachedP2PFLModel):
+            self.model.bind(model)
+        elif isinstance(model, P2PFLModel):
+            if model is not self.model and self.model.get_codecs() is not None:
+                model.set_codecs(self.model.get_codecs())
             self.model = model
-        elif isinstance(model, (list, bytes)):
+        elif isinstance(model, (list, bytes, bytearray)):
             self.model.set_parameters(model)
 
         # Update callbacks with model info
@@ -19,12 +19,16 @@
 """P2PFL model abstraction."""
 
 import copy
-import pickle
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
-from p2pfl.learning.frameworks.exceptions import DecodingParamsError
+from p2pfl.learning.compression.codec import CodecPipeline
+from p2pfl.learning.compression.sparsification import SparseParameters, SparseUpdate
+from p2pfl.learning.frameworks import serialization
+from p2pfl.learning.frameworks.exceptions import ModelNotMatchingError
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters
+from p2pfl.settings import Settings
 
 
 class P2PFLModel:
@@ -35,6 +39,12 @@ class P2PFLModel:
 
     The key concept is the extraction of the model weights in a common format for all the frameworks.
 
+    Every change of the parameters increases the model version, which is used to reuse the encoded
+    parameters while they remain unchanged.
+
+    Parameters can be transformed by a pipeline of codecs (e.g. delta encoding) when encoded. The pipeline holds
+    node state (such as the base model of the round), so it is shared by all the copies of the model.
+
     Args:
         model: The model to encapsulate.
 
@@ -42,6 +52,9 @@ class P2PFLModel:
 
     """
 
+    __sparse_update: Optional[SparseUpdate] = None
+    codecs: Optional[CodecPipeline] = None
+
     def __init__(
         self,
         model: Any,
@@ -61,6 +74,10 @@ class P2PFLModel:
         self.additional_info: Dict[str, Any] = {}
         if additional_info is not None:
             self.additional_info = additional_info
+        self.codecs: Optional[CodecPipeline] = None
+        self.__version = 0
+        self.__encoded_cache: Dict[Tuple[Any, ...], bytes] = {}
+        self.__decoded_sparse_update: Optional[SparseUpdate] = None
         if params is not None:
             self.set_parameters(params)
 
@@ -68,37 +85,105 @@ class P2PFLModel:
         """Get the model."""
         return self.model
 
-    def encode_parameters(self, params: Optional[List[np.ndarray]] = None) -> bytes:
+    def get_version(self) -> int:
+        """Get the version of the model parameters."""
+        return self.__version
+
+    def increase_version(self) -> None:
+        """
+        Increase the version of the model parameters, invalidating the encoded parameters.
+
+        It must be called whenever the parameters are modified outside ``set_parameters`` (e.g. when training).
+        """
+        self.__version += 1
+        self.__encoded_cache = {}
+        # The sparse representation is only kept for the parameters that have just been decoded
+        self.__sparse_update, self.__decoded_sparse_update = self.__decoded_sparse_update, None
+
+    def set_codecs(self, codecs: Optional[CodecPipeline]) -> None:
+        """
+        Set the codecs used to encode and decode the parameters.
+
+        Args:
+            codecs: The codec pipeline (None to send the raw parameters).
+
+        """
+        self.codecs = codecs
+        self.__encoded_cache = {}
+
+    def get_codecs(self) -> Optional[CodecPipeline]:
+        """Get the codecs used to encode and decode the parameters."""
+        return self.codecs
+
+    def encode_parameters(self, params: Optional[List[np.ndarray]] = None, delta: bool = True) -> bytes:
         """
         Encode the parameters of the model.
 
+        The format is given by ``Settings.SERIALIZATION_FORMAT`` (binary by default, pickle as fallback). When
+        encoding the model's own parameters, the result is reused until the model version changes.
+
         Args:
             params: The parameters of the model.
+            delta: If False, codecs relative to a base model are skipped (the receiver may not hold it).
 
         """
-        if params is None:
-            params = self.get_parameters()
-        data_to_serialize = {
-            "params": params,
-            "additional_info": self.additional_info,
-        }
-        return pickle.dumps(data_to_serialize)
+        if params is not None:
+            return self.__encode(params, delta)
+
+        # Key read before the parameters, so a concurrent update never gets cached as current
+        cache = self.__encoded_cache
+        key = (self.__version, Settings.SERIALIZATION_FORMAT, self.codecs.get_key(delta) if self.codecs is not None else None)
+        if key not in cache:
+            cache[key] = self.__encode(self.get_parameters(), delta)
+        return cache[key]
+
+    def __encode(self, params: List[np.ndarray], delta: bool) -> bytes:
+        codecs: List[Dict[str, Any]] = []
+        if self.codecs is not None:
+            params, codecs = self.codecs.encode(params, delta)
+        return serialization.encode_parameters(params, self.additional_info, Settings.SERIALIZATION_FORMAT, codecs)
 
     def decode_parameters(self, data: bytes) -> Tuple[List[np.ndarray], Dict[str, Any]]:
         """
         Decode the parameters of the model.
 
+        The format is detected from the payload, so both binary and pickle encodings are accepted. Layers
+        of binary payloads are read-only views over ``data``.
+
         Args:
             data: The parameters of the model.
 
+        Raises:
+            DecodingParamsError: If the parameters can not be decoded.
+
+        """
+        params, additional_info, codecs = serialization.decode_parameters(data)
+        if codecs:
+            params = (self.codecs if self.codecs is not None else CodecPipeline([])).decode(params, codecs)
+        self.__decoded_sparse_update = params.get_update() if isinstance(params, SparseParameters) else None
+        return params, additional_info
+
+    def get_sparse_update(self) -> Optional[SparseUpdate]:
         """
-        try:
-            loaded_data = pickle.loads(data)
-            params = loaded_data["params"]
-            additional_info = loaded_data["additional_info"]
-            return params, additional_info
-        except Exception as e:
-            raise DecodingParamsError("Error decoding parameters") from e
+        Get the sparse representation of the parameters.
+
+        It is available when the parameters come from a sparse payload or a sparsified local update. Aggregators use it
+        to accumulate only the non-zero differences.
+
+        Returns:
+            The sparse update (None if the parameters are not sparse).
+
+        """
+        return self.__sparse_update
+
+    def compress_local_update(self) -> None:
+        """Apply the local update transformations of the codecs (e.g. sparsification with error feedback) after training."""
+        if self.codecs is None:
+            return
+        params = self.codecs.on_local_update(self.get_parameters())
+        self.set_parameters(params)
+        if isinstance(params, SparseParameters):
+            self.__sparse_update = params.get_update()
 
     def get_parameters(self) -> List[np.ndarray]:
         """
@@ -112,7 +197,7 @@ class P2PFLModel:
 
     def set_parameters(self, params: Union[List[np.ndarray], bytes]) -> None:
         """
-        Set the parameters of the model.
+        Set the parameters of the model. Implementations must increase the model version.
 
         Args:
             params: The parameters of the model.
@@ -133,6 +218,7 @@ class P2PFLModel:
 
         """
         self.additional_info[callback] = info
+        self.increase_version()
 
     def get_info(self, callback: Optional[str] = None) -> Any:
         """
@@ -182,7 +268,49 @@ class P2PFLModel:
             A copy of the model.
 
         """
-        return self.__class__(copy.deepcopy(self.model), **kwargs)
+        # Codecs are set before the parameters, as they are needed to decode them
+        params = kwargs.pop("params", None)
+        model_copy = self.__class__(copy.deepcopy(self.model), **kwargs)
+        model_copy.set_codecs(self.codecs)
+        if params is not None:
+            model_copy.set_parameters(params)
+        return model_copy
+
+    def build_detached_copy(self, **kwargs) -> "P2PFLModel":
+        """
+        Build a copy of the model that only holds the parameters (the framework model is not copied).
+
+        Used for the models received and aggregated during a round, so their cost only depends on the number of
+        parameters. They are bound to the framework model when set on the learner.
+
+        Args:
+            **kwargs: Parameters of the model initialization.
+
+        Returns:
+            A detached copy of the model.
+
+        """
+        # Codecs are set before the parameters, as they are needed to decode them
+        params = kwargs.pop("params", None)
+        model_copy = DetachedP2PFLModel(self, **kwargs)
+        model_copy.set_codecs(self.codecs)
+        model_copy.set_parameters(params if params is not None else copy.deepcopy(self.get_parameters()))
+        return model_copy
+
+    def bind(self, model: "P2PFLModel") -> None:
+        """
+        Take the parameters, contribution and additional information of another model (e.g. a detached one).
+
+        Args:
+            model: The model to take.
+
+        Raises:
+            ModelNotMatchingError: If parameters don't match the model.
+
+        """
+        self.set_contribution(model.contributors, model.num_samples)
+        self.additional_info = dict(model.additional_info)
+        self.set_parameters(model.get_parameters())
 
     def get_framework(self) -> str:
         """
@@ -193,3 +321,101 @@ class P2PFLModel:
 
         """
         raise NotImplementedError
+
+
+class DetachedP2PFLModel(P2PFLModel):
+    """
+    Model that only holds its parameters, contribution and additional information.
+
+    Parameters are checked against the shapes of the framework model (the template), which is not copied. Dense
+    parameters are packed into a flat buffer, so aggregations take a single operation per model.
+
+    Args:
+        template: The model whose parameters are held.
+        params: The parameters of the model.
+        num_samples: The number of samples.
+        contributors: The contributors of the model.
+        additional_info: Additional information.
+
+    """
+
+    def __init__(
+        self,
+        template: P2PFLModel,
+        params: Optional[Union[List[np.ndarray], bytes]] = None,
+        num_samples: Optional[int] = None,
+        contributors: Optional[List[str]] = None,
+        additional_info: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the model."""
+        self.__shapes: Optional[List[Tuple[int, ...]]] = None
+        if isinstance(template, DetachedP2PFLModel):
+            self.__shapes = template.get_shapes()
+            template = template.get_template()
+        self.__template = template
+        self.__params: List[np.ndarray] = []
+        super().__init__(None, params, num_samples, contributors, additional_info)
+
+    def get_template(self) -> P2PFLModel:
+        """Get the framework model whose parameters are held."""
+        return self.__template
+
+    def get_shapes(self) -> List[Tuple[int, ...]]:
+        """Get the shapes of the parameters of the framework model."""
+        if self.__shapes is None:
+            self.__shapes = [np.shape(layer) for layer in self.__template.get_parameters()]
+        return self.__shapes
+
+    def get_parameters(self) -> List[np.ndarray]:
+        """
+        Get the parameters of the model.
+
+        Returns:
+            The parameters of the model
+
+        """
+        return self.__params
+
+    def set_parameters(self, params: Union[List[np.ndarray], bytes]) -> None:
+        """
+        Set the parameters of the model.
+
+        Args:
+            params: The parameters of the model.
+
+        Raises:
+            ModelNotMatchingError: If parameters don't match the model.
+
+        """
+        if isinstance(params, (bytes, bytearray)):
+            params, additional_info = self.decode_parameters(params)
+            self.additional_info.update(additional_info)
+
+        shapes = self.get_shapes()
+        if len(params) != len(shapes) or any(np.shape(layer) != shape for layer, shape in zip(params, shapes)):
+            raise ModelNotMatchingError("Not matching models")
+        self.__params = params if isinstance(params, (FlatParameters, SparseParameters)) else FlatParameters(params)
+        self.increase_version()
+
+    def build_copy(self, **kwargs) -> "P2PFLModel":
+        """
+        Build a copy of the model. Copies of detached models are also detached.
+
+        Args:
+            **kwargs: Parameters of the model initialization.
+
+        Returns:
+            A copy of the model.
+
+        """
+        return self.build_detached_copy(**kwargs)
+
+    def get_framework(self) -> str:
+        """
+        Retrieve the model framework name.
+
+        Returns:
+            The name of the model framework.
+
+        """
+        return self.__template.get_framework()
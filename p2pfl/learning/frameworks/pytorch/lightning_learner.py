@@ -90,6 +90,7 @@ class LightningLearner(Learner):
                 pt_model, pt_data = self.__get_pt_model_data()
                 self.__trainer.fit(pt_model, pt_data)
                 self.__trainer = None
+                self.model.increase_version()
 
             # Set model contribution
             self.model.set_contribution([self._self_addr], self.data.get_num_samples())
@@ -80,7 +80,7 @@ class LightningModel(P2PFLModel):
 
         """
         # Decode parameters
-        if isinstance(params, bytes):
+        if isinstance(params, (bytes, bytearray)):
             params, additional_info = self.decode_parameters(params)
             self.additional_info.update(additional_info)
 
@@ -96,6 +96,7 @@ class LightningModel(P2PFLModel):
             self.model.load_state_dict(state_dict)
         except Exception as e:
             raise ModelNotMatchingError("Not matching models") from e
+        self.increase_version()
 
     def get_framework(self) -> str:
         """
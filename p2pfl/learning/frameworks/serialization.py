@@ -0,0 +1,171 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Binary wire format for model parameters.
+
+Layout of an encoded payload::
+
+    | MAGIC (4B) | VERSION (1B) | HEADER LEN (4B, LE) | JSON HEADER | PADDING | SEGMENT 0 | PADDING | SEGMENT 1 | ...
+
+The header describes, for every layer, its dtype, shape, offset and size inside the payload, and the codecs
+applied to the parameters (see :mod:`p2pfl.learning.compression`). Every segment
+starts at an offset aligned to ``ALIGNMENT`` bytes, so decoding only builds ``np.frombuffer`` views over the
+received buffer (no intermediate copies). The additional information of the model is stored as an extra
+pickled segment.
+
+Payloads produced by the legacy pickle format are still understood by :func:`decode_parameters`.
+"""
+
+import json
+import pickle
+import struct
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+MAGIC = b"P2PW"
+VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<4sBI")
+
+
+class SerializationFormat(Enum):
+    """Wire formats supported to encode model parameters."""
+
+    BINARY = "binary"
+    PICKLE = "pickle"
+
+
+def is_binary_payload(data: BytesLike) -> bool:
+    """
+    Check if a payload has been encoded with the binary format.
+
+    Args:
+        data: The encoded payload.
+
+    """
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def _is_serializable(layer: np.ndarray) -> bool:
+    # Object and extension dtypes (e.g. bfloat16) can not be rebuilt from its dtype string
+    return not layer.dtype.hasobject and np.dtype(layer.dtype.str) == layer.dtype
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def encode_parameters(
+    params: List[np.ndarray],
+    additional_info: Dict[str, Any],
+    serialization_format: Union[SerializationFormat, str] = SerializationFormat.BINARY,
+    codecs: Optional[List[Dict[str, Any]]] = None,
+) -> bytes:
+    """
+    Encode the parameters of a model.
+
+    Args:
+        params: The parameters of the model.
+        additional_info: The additional information of the model.
+        serialization_format: Format used to encode the parameters.
+        codecs: Codecs applied to the parameters (needed to decode them).
+
+    Returns:
+        The encoded parameters.
+
+    """
+    layers = [np.asarray(layer) for layer in params]
+    codecs = codecs if codecs is not None else []
+    if SerializationFormat(serialization_format) == SerializationFormat.PICKLE or not all(_is_serializable(la) for la in layers):
+        return pickle.dumps({"params": layers, "additional_info": additional_info, "codecs": codecs})
+
+    # Segments: one per layer + additional info
+    segments: List[Union[np.ndarray, bytes]] = [np.ascontiguousarray(layer).reshape(-1).view(np.uint8) for layer in layers]
+    segments.append(pickle.dumps(additional_info, protocol=5))
+
+    # Header (offsets are relative to the start of the data section)
+    layers_header = []
+    offset = 0
+    for layer, segment in zip(layers, segments):
+        offset += _padding(offset)
+        layers_header.append({"dtype": layer.dtype.str, "shape": list(layer.shape), "offset": offset, "nbytes": len(segment)})
+        offset += len(segment)
+    offset += _padding(offset)
+    info_header = {"offset": offset, "nbytes": len(segments[-1])}
+    header = {"layers": layers_header, "info": info_header, "codecs": codecs}
+    header_bytes = json.dumps(header, separators=(",", ":"), sort_keys=True).encode()
+
+    # Build the payload (single copy of every segment)
+    preamble = _PREAMBLE.pack(MAGIC, VERSION, len(header_bytes))
+    head = preamble + header_bytes
+    chunks: List[Union[np.ndarray, bytes]] = [head, b"\0" * _padding(len(head))]
+    position = 0
+    for segment_header, segment in zip([*layers_header, info_header], segments):
+        chunks.append(b"\0" * (segment_header["offset"] - position))
+        chunks.append(segment)
+        position = segment_header["offset"] + segment_header["nbytes"]
+    return b"".join(chunks)
+
+
+def decode_parameters(data: BytesLike) -> Tuple[List[np.ndarray], Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Decode the parameters of a model.
+
+    Layers are returned as read-only views over ``data`` when the binary format is used.
+
+    Args:
+        data: The encoded parameters (binary or pickle format).
+
+    Returns:
+        The parameters, the additional information of the model and the codecs applied to the parameters.
+
+    Raises:
+        DecodingParamsError: If the payload can not be decoded.
+
+    """
+    try:
+        if not is_binary_payload(data):
+            loaded_data = pickle.loads(data)
+            return loaded_data["params"], loaded_data["additional_info"], loaded_data.get("codecs", [])
+
+        _, version, header_len = _PREAMBLE.unpack_from(data, 0)
+        if version != VERSION:
+            raise DecodingParamsError(f"Unsupported binary format version: {version}")
+        header_end = _PREAMBLE.size + header_len
+        header = json.loads(bytes(data[_PREAMBLE.size : header_end]))
+        data_start = header_end + _padding(header_end)
+
+        params = []
+        for layer in header["layers"]:
+            dtype = np.dtype(layer["dtype"])
+            array = np.frombuffer(data, dtype=dtype, count=layer["nbytes"] // dtype.itemsize, offset=data_start + layer["offset"])
+            params.append(array.reshape(layer["shape"]))
+        info_start = data_start + header["info"]["offset"]
+        additional_info = pickle.loads(memoryview(data)[info_start : info_start + header["info"]["nbytes"]])
+        return params, additional_info, header.get("codecs", [])
+    except DecodingParamsError:
+        raise
+    except Exception as e:
+        raise DecodingParamsError("Error decoding parameters") from e
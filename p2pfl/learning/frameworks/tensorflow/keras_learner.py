@@ -77,6 +77,7 @@ class KerasLearner(Learner):
                     epochs=self.epochs,
                     callbacks=self.callbacks,  # type: ignore
                 )
+                self.model.increase_version()
 
             # Set model contribution
             self.model.set_contribution([self._self_addr], self.data.get_num_samples(train=True))
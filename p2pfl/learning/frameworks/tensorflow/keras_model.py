@@ -92,7 +92,7 @@ class KerasModel(P2PFLModel):
             ModelNotMatchingError: If parameters don't match the model.
 
         """
-        if isinstance(params, bytes):
+        if isinstance(params, (bytes, bytearray)):
             params, additional_info = self.decode_parameters(params)
             self.additional_info.update(additional_info)
 
@@ -101,6 +101,7 @@ class KerasModel(P2PFLModel):
             self.model.set_weights(params)
         except ValueError as e:
             raise ModelNotMatchingError("Parameters don't match the model. Please check the model architecture and the parameters.") from e
+        self.increase_version()
 
     def get_framework(self) -> str:
         """
@@ -21,8 +21,9 @@ import contextlib
 import os
 import threading
 import traceback
-from typing import Any, Dict, Optional, Type
+from typing import Any, Dict, List, Optional, Type, Union
 
+from p2pfl.communication.commands.message.delta_base_missing_command import DeltaBaseMissingCommand
 from p2pfl.communication.commands.message.metrics_command import MetricsCommand
 from p2pfl.communication.commands.message.model_initialized_command import ModelInitializedCommand
 from p2pfl.communication.commands.message.models_agregated_command import ModelsAggregatedCommand
@@ -30,9 +31,11 @@ from p2pfl.communication.commands.message.models_ready_command import ModelsRead
 from p2pfl.communication.commands.message.start_learning_command import StartLearningCommand
 from p2pfl.communication.commands.message.stop_learning_command import StopLearningCommand
 from p2pfl.communication.commands.message.vote_train_set_command import VoteTrainSetCommand
+from p2pfl.communication.commands.weights.async_update_command import AsyncUpdateCommand
 from p2pfl.communication.commands.weights.full_model_command import FullModelCommand
 from p2pfl.communication.commands.weights.init_model_command import InitModelCommand
 from p2pfl.communication.commands.weights.partial_model_command import PartialModelCommand
+from p2pfl.communication.commands.weights.ring_chunk_command import RingAllGatherCommand, RingReduceScatterCommand
 from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
 from p2pfl.communication.protocols.grpc.grpc_communication_protocol import (
     GrpcCommunicationProtocol,
@@ -40,6 +43,8 @@ from p2pfl.communication.protocols.grpc.grpc_communication_protocol import (
 from p2pfl.exceptions import LearnerRunningException, NodeRunningException, ZeroRoundsException
 from p2pfl.learning.aggregators.aggregator import Aggregator
 from p2pfl.learning.aggregators.fedavg import FedAvg
+from p2pfl.learning.compression.codec import ParameterCodec
+from p2pfl.learning.compression.codec_factory import CodecFactory
 from p2pfl.learning.dataset.p2pfl_dataset import P2PFLDataset
 from p2pfl.learning.frameworks.learner import Learner
 from p2pfl.learning.frameworks.learner_factory import LearnerFactory
@@ -47,6 +52,7 @@ from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 from p2pfl.learning.frameworks.simulation import try_init_learner_with_ray
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
+from p2pfl.settings import Settings
 from p2pfl.stages.workflows import LearningWorkflow
 
 # Disbalbe grpc log (pytorch causes warnings)
@@ -76,6 +82,7 @@ class Node:
         learner: The learner class to be used.
         aggregator: The aggregator class to be used.
         protocol: The communication protocol to be used.
+        codecs: Codecs (or codec names) used to encode the model weights, in order. Defaults to ``Settings.WEIGHTS_CODECS``.
         **kwargs: Additional arguments.
 
     .. todo::
@@ -95,6 +102,7 @@ class Node:
         aggregator: Optional[Aggregator] = None,
         protocol: Type[CommunicationProtocol] = GrpcCommunicationProtocol,
         simulation: bool = False,
+        codecs: Optional[List[Union[str, ParameterCodec]]] = None,
         **kwargs,
     ) -> None:
         """Initialize a node."""
@@ -106,6 +114,9 @@ class Node:
         self.aggregator = FedAvg() if aggregator is None else aggregator
 
         # Learning
+        codec_pipeline = CodecFactory.create_pipeline(codecs if codecs is not None else Settings.WEIGHTS_CODECS)
+        if codec_pipeline is not None:
+            model.set_codecs(codec_pipeline)
         if learner is None:  # if no learner, use factory default
             learner = LearnerFactory.create_learner(model)
         self.learner = try_init_learner_with_ray(learner, model, data, self.addr, self.aggregator)
@@ -127,9 +138,13 @@ class Node:
             ModelsAggregatedCommand(self.state),
             ModelsReadyCommand(self.state),
             MetricsCommand(self.state),
+            DeltaBaseMissingCommand(self.state),
             InitModelCommand(self.state, self.stop, self.aggregator, self.learner),
             PartialModelCommand(self.state, self.stop, self.aggregator, self._communication_protocol, self.learner),
-            FullModelCommand(self.state, self.stop, self.aggregator, self.learner),
+            FullModelCommand(self.state, self.stop, self.aggregator, self._communication_protocol, self.learner),
+            RingReduceScatterCommand(self.state),
+            RingAllGatherCommand(self.state),
+            AsyncUpdateCommand(self.state, self.stop, self.aggregator, self.learner),
         ]
         self._communication_protocol.add_command(commands)
 
@@ -18,7 +18,7 @@
 """Node state."""
 
 import threading
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from p2pfl.experiment import Experiment
 
@@ -34,6 +34,10 @@ class NodeState:
         learner(Learner): The learner of the node.
         models_aggregated(Dict[str, List[str]]): The models aggregated by the node.
         nei_status(Dict[str, int]): The status of the neighbors.
+        delta_base_missing(Set[str]): Nodes that can not decode delta-encoded models in the current round.
+        ring_chunks(Dict[Tuple[int, str, int], Tuple[bytes, List[str], int]]): The chunks received in a ring all-reduce,
+            by round, command and chunk index (payload, contributors and number of samples).
+        ring_chunks_condition(threading.Condition): The condition notified when a ring chunk is received.
         train_set(List[str]): The train set of the node.
         train_set_votes(Dict[str, Dict[str, int]]): The votes of the train set.
         train_set_votes_lock(threading.Lock): The lock for the train set votes.
@@ -63,6 +67,13 @@ class NodeState:
         # Other neis state (only round)
         self.nei_status: Dict[str, int] = {}
 
+        # Nodes without the base model of the round (they need full weights)
+        self.delta_base_missing: Set[str] = set()
+
+        # Ring all-reduce (chunks can arrive before the node reaches their step, or even their round)
+        self.ring_chunks: Dict[Tuple[int, str, int], Tuple[Union[bytes, bytearray], List[str], int]] = {}
+        self.ring_chunks_condition = threading.Condition()
+
         # Train Set
         self.train_set: List[str] = []
         self.train_set_votes: Dict[str, Dict[str, int]] = {}
@@ -121,6 +132,9 @@ class NodeState:
 
         self.experiment.increase_round()
         self.models_aggregated = {}
+        self.delta_base_missing = set()
+        with self.ring_chunks_condition:
+            self.ring_chunks = {k: v for k, v in self.ring_chunks.items() if k[0] >= self.experiment.round}
 
     def clear(self) -> None:
         """Clear the state."""
@@ -19,6 +19,7 @@
 """Module to define constants for the p2pfl system."""
 
 import os
+from typing import List, Optional
 
 ###################
 # Global Settings #
@@ -35,6 +36,38 @@ class Settings:
     """
     Maximum time (seconds) to wait for a gRPC request.
     """
+    GRPC_CHUNK_SIZE: int = 4 * 1024 * 1024
+    """
+    Size (bytes) of the chunks in which models are streamed over gRPC. Larger models are sent with the streaming RPC.
+    """
+    GRPC_CONTROL_WORKERS: int = 2
+    """
+    Number of threads of a gRPC server that execute the commands of control messages (heartbeats, votes...).
+    """
+    GRPC_WEIGHTS_WORKERS: int = 2
+    """
+    Number of threads of a gRPC server that execute the commands of weight payloads. They are apart from the control
+    threads, so control messages are not delayed by model transfers.
+    """
+    GRPC_WEIGHTS_QUEUE_SIZE: int = 8
+    """
+    Maximum number of weight payloads of a gRPC server waiting for a thread. Payloads beyond it are discarded (they are
+    gossiped again).
+    """
+    GRPC_ASYNC_WORKERS: int = 16
+    """
+    Number of threads, shared by all the nodes of the process, that run the blocking work of the asyncio gRPC protocol
+    (handshakes, compression...) out of the event loop.
+    """
+    WEIGHTS_COMPRESSION: str = "none"
+    """
+    Lossless compression of the weight payloads sent over gRPC ("zstd", "lz4", "zlib" or "none"). It is agreed with
+    every neighbor in the handshake, falling back to another compression supported by both nodes.
+    """
+    WEIGHTS_COMPRESSION_LEVEL: Optional[int] = None
+    """
+    Compression level (None for the default of the compression). Higher levels trade CPU for bandwidth.
+    """
     LOG_LEVEL: str = "INFO"
     """
     Log level for the system.
@@ -51,6 +84,10 @@ class Settings:
     """
     Disable Ray for debugging (even if installed).
     """
+    SERIALIZATION_FORMAT: str = "binary"
+    """
+    Format used to encode model parameters ("binary" or "pickle"). Decoding detects the format automatically.
+    """
 
     ######
     # HEARTBEAT
@@ -143,6 +180,48 @@ class Settings:
     """
     Time (seconds) to wait for the heartbeats to converge before a learning round starts.
     """
+    AGGREGATION_TREE_ARITY: int = 0
+    """
+    If greater than 0, the train set aggregates along a tree with this arity (rebuilt every round) instead of gossiping
+    partial aggregations between all its members. Only used with aggregators that support partial aggregations.
+    """
+    AGGREGATION_BUFFER_SIZE: int = 4
+    """
+    Number of updates applied at once by asynchronous aggregators (FedBuff).
+    """
+    AGGREGATION_STALENESS_EXPONENT: float = 0.5
+    """
+    Exponent of the staleness discount of asynchronous aggregators: updates from a model ``s`` rounds old are weighted
+    by ``(1 + s) ** -exponent``.
+    """
+    AGGREGATION_RING: bool = False
+    """
+    If True, the train set aggregates with a ring all-reduce (reduce-scatter and all-gather of chunks of the weighted
+    parameters) instead of gossiping partial aggregations. Every member sends ``2 * (n - 1) / n`` times the model size.
+    Only used with aggregators that support partial aggregations and if ``AGGREGATION_TREE_ARITY`` is 0.
+    """
+    WEIGHTS_CODECS: List[str] = []
+    """
+    Codecs applied (in order) to the weight payloads, e.g. ``["delta", "int8_channel"]``. Available: delta, topk,
+    threshold, fp16, bf16, bf16_stochastic, int8, int8_channel, int8_stochastic and int8_channel_stochastic. Only one
+    of delta, topk and threshold can be used. Can be overridden per node.
+    """
+    SPARSIFICATION_RATIO: float = 0.01
+    """
+    Fraction of the coordinates of every layer of the local update sent by the ``topk`` codec.
+    """
+    SPARSIFICATION_THRESHOLD: float = 1e-3
+    """
+    Minimum magnitude of the coordinates of the local update sent by the ``threshold`` codec.
+    """
+    AGGREGATION_WORKERS: int = os.cpu_count() or 1
+    """
+    Number of threads used to aggregate the parameters (chunks of the parameters are aggregated in parallel).
+    """
+    AGGREGATION_CHUNK_SIZE: int = 1 << 18
+    """
+    Minimum number of parameters of a chunk processed by an aggregation thread.
+    """
 
     ######
     # WEB
@@ -0,0 +1,138 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""Asynchronous train stage."""
+
+from typing import Optional, Type, Union
+
+import numpy as np
+
+from p2pfl.communication.commands.message.metrics_command import MetricsCommand
+from p2pfl.communication.commands.weights.async_update_command import AsyncUpdateCommand
+from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
+from p2pfl.learning.aggregators.aggregator import Aggregator
+from p2pfl.learning.frameworks.learner import Learner
+from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.management.logger import logger
+from p2pfl.node_state import NodeState
+from p2pfl.stages.stage import EarlyStopException, Stage, check_early_stop
+from p2pfl.stages.stage_factory import StageFactory
+
+
+class AsyncTrainStage(Stage):
+    """
+    Asynchronous train stage (aggregators with ``asynchronous`` set, e.g. FedBuff).
+
+    There is no train set nor round barrier: every node trains from its current model, pushes the update to the rest of
+    the nodes (tagged with the round of the model it started from) and applies the updates buffered meanwhile. Every
+    buffer applied finishes a round. The stage is repeated until the last round.
+    """
+
+    @staticmethod
+    def name():
+        """Return the name of the stage."""
+        return "AsyncTrainStage"
+
+    @staticmethod
+    def execute(
+        state: Optional[NodeState] = None,
+        communication_protocol: Optional[CommunicationProtocol] = None,
+        learner: Optional[Learner] = None,
+        aggregator: Optional[Aggregator] = None,
+        **kwargs,
+    ) -> Union[Type["Stage"], None]:
+        """Execute the stage."""
+        if state is None or communication_protocol is None or aggregator is None or learner is None:
+            raise Exception("Invalid parameters on AsyncTrainStage.")
+
+        try:
+            check_early_stop(state)
+            round = state.round
+            if round is None or state.total_rounds is None:
+                raise ValueError("Round or total rounds not set.")
+
+            # Train from the current model
+            model = learner.get_model().build_detached_copy()
+            logger.info(state.addr, "🏋️‍♀️ Training...")
+            learner.fit()
+
+            check_early_stop(state)
+
+            # Push the update, tagged with the round of the model it started from
+            trained = learner.get_model()
+            update = model.build_detached_copy(
+                params=[np.subtract(t, b) for t, b in zip(trained.get_parameters(), model.get_parameters())],
+                num_samples=trained.get_num_samples(),
+                contributors=[state.addr],
+            )
+            aggregator.add_update(update, round)
+            AsyncTrainStage.__push_update(state, communication_protocol, update, round)
+
+            check_early_stop(state)
+
+            # Apply the buffered updates (updates that have not arrived yet are not waited)
+            updated_model = aggregator.apply_updates(model, round)
+            while updated_model is not None:
+                model = updated_model
+                state.increase_round()
+                logger.round_finished(state.addr)
+                logger.info(state.addr, f"🎉 Round {state.round} of {state.total_rounds} finished.")
+                if state.round is None or state.round >= state.total_rounds:
+                    break
+                updated_model = aggregator.apply_updates(model, state.round)
+            learner.set_model(model)
+
+            # Next Step or Finish
+            if state.round is not None and state.round < state.total_rounds:
+                return StageFactory.get_stage("AsyncTrainStage")
+            AsyncTrainStage.__evaluate(state, learner, communication_protocol)
+            state.clear()
+            logger.info(state.addr, "😋 Training finished!!")
+            return None
+        except EarlyStopException:
+            return None
+
+    @staticmethod
+    def __push_update(state: NodeState, communication_protocol: CommunicationProtocol, update: P2PFLModel, round: int) -> None:
+        # Sent to every known node (also the ones that are not directly connected)
+        msg = communication_protocol.build_weights(
+            AsyncUpdateCommand.get_name(),
+            round,
+            update.encode_parameters(delta=False),
+            update.get_contributors(),
+            update.get_num_samples(),
+        )
+        for nei in communication_protocol.get_neighbors(only_direct=False):
+            communication_protocol.send(nei, msg, create_connection=True)
+        logger.info(state.addr, f"📤 Update of round {round} pushed.")
+
+    @staticmethod
+    def __evaluate(state: NodeState, learner: Learner, communication_protocol: CommunicationProtocol) -> None:
+        logger.info(state.addr, "🔬 Evaluating...")
+        results = learner.evaluate()
+        logger.info(state.addr, f"📈 Evaluated. Results: {results}")
+        # Send metrics
+        if len(results) > 0:
+            logger.info(state.addr, "📢 Broadcasting metrics.")
+            flattened_metrics = [str(item) for pair in results.items() for item in pair]
+            communication_protocol.broadcast(
+                communication_protocol.build_msg(
+                    MetricsCommand.get_name(),
+                    flattened_metrics,
+                    round=state.round,
+                )
+            )
@@ -75,7 +75,7 @@ class GossipModelStage(Stage):
         def model_fn(node: str) -> Any:
             if state.round is None:
                 raise Exception("Round not initialized")
-            encoded_model = learner.get_model().encode_parameters()
+            encoded_model = learner.get_model().encode_parameters(delta=node not in state.delta_base_missing)
             return communication_protocol.build_weights(FullModelCommand.get_name(), state.round, encoded_model)
 
         # Gossip
@@ -0,0 +1,259 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""Ring all-reduce stage."""
+
+import time
+from typing import List, Optional, Tuple, Type, Union
+
+import numpy as np
+
+from p2pfl.communication.commands.message.models_ready_command import ModelsReadyCommand
+from p2pfl.communication.commands.weights.ring_chunk_command import RingAllGatherCommand, RingReduceScatterCommand
+from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
+from p2pfl.learning.aggregators.aggregator import Aggregator
+from p2pfl.learning.frameworks import serialization
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters
+from p2pfl.learning.frameworks.learner import Learner
+from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.management.logger import logger
+from p2pfl.node_state import NodeState
+from p2pfl.settings import Settings
+from p2pfl.stages.stage import EarlyStopException, Stage, check_early_stop
+from p2pfl.stages.stage_factory import StageFactory
+
+
+class AllReduceRing:
+    """
+    Ring of a train set for a bandwidth-optimal all-reduce.
+
+    Members are sorted (every node builds the same ring) and the parameters are split in one chunk per member. In the
+    reduce-scatter phase, every member adds the chunk received from its predecessor to its own and sends the sum to its
+    successor, so after ``n - 1`` steps every member holds one chunk summed over the ring. In the all-gather phase, the
+    summed chunks go around the ring in ``n - 1`` more steps.
+
+    Args:
+        nodes: The train set.
+
+    """
+
+    def __init__(self, nodes: List[str]) -> None:
+        """Initialize the ring."""
+        self.members = sorted(set(nodes))
+        self.__positions = {n: i for i, n in enumerate(self.members)}
+
+    def get_successor(self, node: str) -> str:
+        """
+        Get the member that receives the chunks of a node.
+
+        Args:
+            node: The node.
+
+        """
+        return self.members[(self.__positions[node] + 1) % len(self.members)]
+
+    def get_predecessor(self, node: str) -> str:
+        """
+        Get the member that sends its chunks to a node.
+
+        Args:
+            node: The node.
+
+        """
+        return self.members[(self.__positions[node] - 1) % len(self.members)]
+
+    def get_chunk_bounds(self, size: int) -> List[Tuple[int, int]]:
+        """
+        Split a number of parameters in one chunk per member.
+
+        Args:
+            size: The number of parameters.
+
+        Returns:
+            The start and the end of every chunk.
+
+        """
+        n = len(self.members)
+        return [(size * i // n, size * (i + 1) // n) for i in range(n)]
+
+    def get_schedule(self, node: str) -> List[Tuple[str, int, int]]:
+        """
+        Get the steps of a node in the all-reduce.
+
+        Args:
+            node: The node.
+
+        Returns:
+            The command, the chunk sent to the successor and the chunk received from the predecessor of every step.
+
+        """
+        n = len(self.members)
+        i = self.__positions[node]
+        reduce_scatter = [(RingReduceScatterCommand.get_name(), (i - s) % n, (i - s - 1) % n) for s in range(n - 1)]
+        all_gather = [(RingAllGatherCommand.get_name(), (i + 1 - s) % n, (i - s) % n) for s in range(n - 1)]
+        return reduce_scatter + all_gather
+
+    @staticmethod
+    def is_enabled(state: NodeState, aggregator: Aggregator) -> bool:
+        """
+        Check if the train set aggregates with a ring all-reduce.
+
+        Args:
+            state: The node state.
+            aggregator: The aggregator of the node (it must support partial aggregations).
+
+        """
+        return Settings.AGGREGATION_RING and aggregator.partial_aggregation and len(set(state.train_set)) > 1
+
+
+class RingAllReduceStage(Stage):
+    """
+    Ring all-reduce stage.
+
+    The members of the train set compute the weighted average of their models with a ring all-reduce over the weighted
+    parameters. Chunks travel in ``Weights`` messages (with the index of the chunk) and every member sends and receives
+    ``2 * (n - 1) / n`` times the model size, whatever the size of the train set. If a member does not answer, the node
+    falls back to the gossip of partial aggregations.
+    """
+
+    @staticmethod
+    def name():
+        """Return the name of the stage."""
+        return "RingAllReduceStage"
+
+    @staticmethod
+    def execute(
+        state: Optional[NodeState] = None,
+        communication_protocol: Optional[CommunicationProtocol] = None,
+        learner: Optional[Learner] = None,
+        aggregator: Optional[Aggregator] = None,
+        **kwargs,
+    ) -> Union[Type["Stage"], None]:
+        """Execute the stage."""
+        if state is None or communication_protocol is None or aggregator is None or learner is None:
+            raise Exception("Invalid parameters on RingAllReduceStage.")
+
+        try:
+            check_early_stop(state)
+            ring = AllReduceRing(state.train_set)
+            logger.info(state.addr, f"💍 Ring all-reduce with {len(ring.members)} nodes.")
+            agg_model = RingAllReduceStage.__all_reduce(state, communication_protocol, learner.get_model(), ring)
+
+            check_early_stop(state)
+            if agg_model is None:
+                logger.warning(state.addr, "💍 Ring all-reduce failed. Falling back to the gossip of partial aggregations.")
+                from p2pfl.stages.base_node.train_stage import TrainStage
+
+                return TrainStage.gossip_aggregation(state, communication_protocol, learner, aggregator)
+            learner.set_model(agg_model)
+
+            # Share that aggregation is done
+            communication_protocol.broadcast(communication_protocol.build_msg(ModelsReadyCommand.get_name(), [], round=state.round))
+
+            # Next stage (neighbors out of the train set)
+            return StageFactory.get_stage("GossipModelStage")
+        except EarlyStopException:
+            return None
+
+    @staticmethod
+    def __all_reduce(
+        state: NodeState,
+        communication_protocol: CommunicationProtocol,
+        model: P2PFLModel,
+        ring: AllReduceRing,
+    ) -> Optional[P2PFLModel]:
+        round = state.round
+        if round is None:
+            raise Exception("Round not initialized.")
+
+        # Weighted parameters (all the layers must be in the flat buffer)
+        params = model.get_parameters()
+        flat = FlatParameters(params, zeros=True)
+        buffer = flat.get_buffer()
+        if buffer.size != sum(np.size(layer) for layer in params):
+            logger.info(state.addr, "Layers of several dtypes can not be reduced along the ring.")
+            return None
+        flat.add_scaled(params, model.get_num_samples())
+
+        bounds = ring.get_chunk_bounds(buffer.size)
+        contributors = [[state.addr] for _ in bounds]
+        num_samples = [model.get_num_samples() for _ in bounds]
+        successor = ring.get_successor(state.addr)
+        predecessor = ring.get_predecessor(state.addr)
+        deadline = time.monotonic() + Settings.AGGREGATION_TIMEOUT
+
+        for cmd, sent, received in ring.get_schedule(state.addr):
+            # Send a chunk to the successor
+            start, end = bounds[sent]
+            msg = communication_protocol.build_weights(
+                cmd,
+                round,
+                serialization.encode_parameters([buffer[start:end]], {}, Settings.SERIALIZATION_FORMAT),
+                contributors[sent],
+                num_samples[sent],
+                chunk_index=sent,
+            )
+            try:
+                communication_protocol.send(successor, msg, raise_error=True, create_connection=True)
+            except Exception:
+                return None
+
+            # Receive a chunk from the predecessor
+            chunk = RingAllReduceStage.__wait_chunk(state, (round, cmd, received), deadline)
+            if chunk is None:
+                logger.info(state.addr, f"Chunk {received} ({cmd}) not received from {predecessor}.")
+                return None
+            payload, chunk_contributors, chunk_num_samples = chunk
+            start, end = bounds[received]
+            try:
+                values = serialization.decode_parameters(payload)[0]
+            except Exception as e:
+                logger.error(state.addr, f"Error decoding a ring chunk: {e}")
+                return None
+            if len(values) != 1 or values[0].size != end - start:
+                logger.error(state.addr, f"Ring chunk {received} from {predecessor} does not match the model.")
+                return None
+            if cmd == RingReduceScatterCommand.get_name():
+                buffer[start:end] += values[0]
+                contributors[received] = contributors[received] + chunk_contributors
+                num_samples[received] += chunk_num_samples
+            else:
+                buffer[start:end] = values[0]
+                contributors[received] = chunk_contributors
+                num_samples[received] = chunk_num_samples
+
+        # Every chunk must be summed over the whole ring
+        if any(sorted(c) != ring.members for c in contributors) or len(set(num_samples)) != 1 or num_samples[0] <= 0:
+            logger.info(state.addr, "Chunks of the ring all-reduce are not complete.")
+            return None
+        flat.divide(num_samples[0])
+        return model.build_detached_copy(params=flat, num_samples=num_samples[0], contributors=ring.members)
+
+    @staticmethod
+    def __wait_chunk(
+        state: NodeState,
+        key: Tuple[int, str, int],
+        deadline: float,
+    ) -> Optional[Tuple[Union[bytes, bytearray], List[str], int]]:
+        with state.ring_chunks_condition:
+            while key not in state.ring_chunks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or state.round != key[0]:
+                    return None
+                # Woken up periodically to check early stops
+                state.ring_chunks_condition.wait(timeout=min(remaining, 1))
+            return state.ring_chunks.pop(key)
@@ -53,6 +53,7 @@ class RoundFinishedStage(Stage):
         # Set Next Round
         aggregator.clear()
         state.increase_round()
+        RoundFinishedStage.__start_codecs_round(state, learner)
         logger.round_finished(state.addr)
 
         # Next Step or Finish
@@ -73,6 +74,14 @@ class RoundFinishedStage(Stage):
             logger.info(state.addr, "😋 Training finished!!")
             return None
 
+    @staticmethod
+    def __start_codecs_round(state: NodeState, learner: Learner) -> None:
+        # The aggregated model is the base of the next round
+        model = learner.get_model()
+        codecs = model.get_codecs()
+        if codecs is not None and state.round is not None:
+            codecs.on_round_start(model.get_parameters(), state.round)
+
     @staticmethod
     def __evaluate(state: NodeState, learner: Learner, communication_protocol: CommunicationProtocol) -> None:
         logger.info(state.addr, "🔬 Evaluating...")
@@ -65,6 +65,7 @@ class StartLearningStage(Stage):
         # Wait and gossip model inicialization
         logger.info(state.addr, "⏳ Waiting initialization.")
         state.model_initialized_lock.acquire()
+        StartLearningStage.__start_codecs_round(state, learner)
         # Communicate Initialization
         communication_protocol.broadcast(communication_protocol.build_msg(ModelInitializedCommand.get_name()))
         logger.info(state.addr, "🗣️ Gossiping model initialization.")
@@ -75,9 +76,20 @@ class StartLearningStage(Stage):
         if wait_time > 0:
             time.sleep(wait_time)
 
+        # Asynchronous aggregators: no train set nor round barrier
+        if aggregator.asynchronous:
+            return StageFactory.get_stage("AsyncTrainStage")
+
         # Vote
         return StageFactory.get_stage("VoteTrainSetStage")
 
+    @staticmethod
+    def __start_codecs_round(state: NodeState, learner: Learner) -> None:
+        model = learner.get_model()
+        codecs = model.get_codecs()
+        if codecs is not None and state.round is not None:
+            codecs.on_round_start(model.get_parameters(), state.round)
+
     @staticmethod
     def __gossip_model(
         state: NodeState,
@@ -100,7 +112,8 @@ class StartLearningStage(Stage):
         def model_fn(_: str) -> Any:
             if state.round is None:
                 raise Exception("Round not initialized.")
-            encoded_model = learner.get_model().encode_parameters()
+            # Initial model always sent full (receivers have no base model yet)
+            encoded_model = learner.get_model().encode_parameters(delta=False)
             return communication_protocol.build_weights(InitModelCommand.get_name(), state.round, encoded_model)
 
         # Gossip
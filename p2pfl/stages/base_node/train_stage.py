@@ -28,6 +28,8 @@ from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregat
 from p2pfl.learning.frameworks.learner import Learner
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
+from p2pfl.stages.base_node.ring_all_reduce_stage import AllReduceRing
+from p2pfl.stages.base_node.tree_aggregation_stage import AggregationTree
 from p2pfl.stages.stage import EarlyStopException, Stage, check_early_stop
 from p2pfl.stages.stage_factory import StageFactory
 
@@ -55,8 +57,13 @@ class TrainStage(Stage):
         try:
             check_early_stop(state)
 
-            # Set Models To Aggregate
-            aggregator.set_nodes_to_aggregate(state.train_set)
+            # Set Models To Aggregate (the subtree of the node if the train set aggregates along a tree)
+            tree_aggregation = AggregationTree.is_enabled(aggregator)
+            if tree_aggregation:
+                state.aggregated_model_event.clear()
+                aggregator.set_nodes_to_aggregate(AggregationTree.from_state(state).get_subtree(state.addr))
+            else:
+                aggregator.set_nodes_to_aggregate(state.train_set)
 
             check_early_stop(state)
 
@@ -69,6 +76,9 @@ class TrainStage(Stage):
             logger.info(state.addr, "🏋️‍♀️ Training...")
             learner.fit()
 
+            # Compress the local update (e.g. sparsification with error feedback)
+            learner.get_model().compress_local_update()
+
             check_early_stop(state)
 
             # Aggregate Model
@@ -83,21 +93,50 @@ class TrainStage(Stage):
                     round=state.round,
                 )
             )
-            TrainStage.__gossip_model_aggregation(state, communication_protocol, aggregator)
+            if tree_aggregation:
+                return StageFactory.get_stage("TreeAggregationStage")
+            if AllReduceRing.is_enabled(state, aggregator):
+                return StageFactory.get_stage("RingAllReduceStage")
+            return TrainStage.gossip_aggregation(state, communication_protocol, learner, aggregator)
+        except EarlyStopException:
+            return None
 
-            check_early_stop(state)
+    @staticmethod
+    def gossip_aggregation(
+        state: NodeState,
+        communication_protocol: CommunicationProtocol,
+        learner: Learner,
+        aggregator: Aggregator,
+    ) -> Union[Type["Stage"], None]:
+        """
+        Aggregate the models of the train set by gossiping partial aggregations, and set the aggregated model.
 
-            # Set aggregated model
-            agg_model = aggregator.wait_and_get_aggregation()
-            learner.set_model(agg_model)
+        Args:
+            state: The node state.
+            communication_protocol: The communication protocol.
+            learner: The learner.
+            aggregator: The aggregator (holding the model of the node).
 
-            # Share that aggregation is done
-            communication_protocol.broadcast(communication_protocol.build_msg(ModelsReadyCommand.get_name(), [], round=state.round))
+        Returns:
+            The next stage.
 
-            # Next stage
-            return StageFactory.get_stage("GossipModelStage")
-        except EarlyStopException:
-            return None
+        Raises:
+            EarlyStopException: If the learning is stopped.
+
+        """
+        TrainStage.__gossip_model_aggregation(state, communication_protocol, aggregator)
+
+        check_early_stop(state)
+
+        # Set aggregated model
+        agg_model = aggregator.wait_and_get_aggregation()
+        learner.set_model(agg_model)
+
+        # Share that aggregation is done
+        communication_protocol.broadcast(communication_protocol.build_msg(ModelsReadyCommand.get_name(), [], round=state.round))
+
+        # Next stage
+        return StageFactory.get_stage("GossipModelStage")
 
     @staticmethod
     def __evaluate(state: NodeState, learner: Learner, communication_protocol: CommunicationProtocol) -> None:
@@ -161,7 +200,7 @@ class TrainStage(Stage):
             return communication_protocol.build_weights(
                 PartialModelCommand.get_name(),
                 state.round,
-                model.encode_parameters(),
+                model.encode_parameters(delta=node not in state.delta_base_missing),
                 model.get_contributors(),
                 model.get_num_samples(),
             )
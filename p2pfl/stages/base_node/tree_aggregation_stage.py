@@ -0,0 +1,254 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""Tree aggregation stage."""
+
+import random
+from typing import Any, List, Optional, Type, Union
+
+from p2pfl.communication.commands.message.models_ready_command import ModelsReadyCommand
+from p2pfl.communication.commands.weights.full_model_command import FullModelCommand
+from p2pfl.communication.commands.weights.partial_model_command import PartialModelCommand
+from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
+from p2pfl.learning.aggregators.aggregator import Aggregator
+from p2pfl.learning.frameworks.learner import Learner
+from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.management.logger import logger
+from p2pfl.node_state import NodeState
+from p2pfl.settings import Settings
+from p2pfl.stages.stage import EarlyStopException, Stage, check_early_stop
+from p2pfl.stages.stage_factory import StageFactory
+
+
+class AggregationTree:
+    """
+    Deterministic k-ary aggregation tree of a train set.
+
+    Nodes are shuffled with the round as seed (so the root changes every round) and placed in a complete k-ary tree.
+    Every node has at most ``arity`` children and the depth of the tree is ``O(log_k n)``.
+
+    Args:
+        nodes: The train set.
+        round: The round.
+        arity: The maximum number of children of a node.
+
+    """
+
+    def __init__(self, nodes: List[str], round: int, arity: int) -> None:
+        """Initialize the tree."""
+        self.arity = max(1, arity)
+        self.__order = sorted(set(nodes))
+        random.Random(round).shuffle(self.__order)
+        self.__positions = {n: i for i, n in enumerate(self.__order)}
+
+    def get_root(self) -> str:
+        """Get the root of the tree."""
+        return self.__order[0]
+
+    def get_parent(self, node: str) -> Optional[str]:
+        """
+        Get the parent of a node.
+
+        Args:
+            node: The node.
+
+        Returns:
+            The parent (None for the root).
+
+        """
+        i = self.__positions[node]
+        return None if i == 0 else self.__order[(i - 1) // self.arity]
+
+    def get_children(self, node: str) -> List[str]:
+        """
+        Get the children of a node.
+
+        Args:
+            node: The node.
+
+        """
+        first = self.__positions[node] * self.arity + 1
+        return self.__order[first : first + self.arity]
+
+    def get_subtree(self, node: str) -> List[str]:
+        """
+        Get the nodes of the subtree of a node (including the node).
+
+        Args:
+            node: The node.
+
+        """
+        subtree: List[str] = []
+        pending = [node]
+        while pending:
+            n = pending.pop()
+            subtree.append(n)
+            pending.extend(self.get_children(n))
+        return subtree
+
+    @staticmethod
+    def from_state(state: NodeState) -> "AggregationTree":
+        """
+        Build the tree of the current round of a node.
+
+        Args:
+            state: The node state.
+
+        """
+        if state.round is None:
+            raise Exception("Round not initialized.")
+        return AggregationTree(state.train_set, state.round, Settings.AGGREGATION_TREE_ARITY)
+
+    @staticmethod
+    def is_enabled(aggregator: Aggregator) -> bool:
+        """
+        Check if the train set aggregates along a tree.
+
+        Args:
+            aggregator: The aggregator of the node (it must support partial aggregations).
+
+        """
+        return Settings.AGGREGATION_TREE_ARITY > 0 and aggregator.partial_aggregation
+
+
+class TreeAggregationStage(Stage):
+    """
+    Tree aggregation stage.
+
+    Partial aggregations flow up the aggregation tree: every node aggregates its model with the partial aggregations
+    of its children and sends the result to its parent. The root gets the aggregated model, which is pushed back down
+    the tree. Every node only exchanges models with its parent and its children.
+    """
+
+    @staticmethod
+    def name():
+        """Return the name of the stage."""
+        return "TreeAggregationStage"
+
+    @staticmethod
+    def execute(
+        state: Optional[NodeState] = None,
+        communication_protocol: Optional[CommunicationProtocol] = None,
+        learner: Optional[Learner] = None,
+        aggregator: Optional[Aggregator] = None,
+        **kwargs,
+    ) -> Union[Type["Stage"], None]:
+        """Execute the stage."""
+        if state is None or communication_protocol is None or aggregator is None or learner is None:
+            raise Exception("Invalid parameters on TreeAggregationStage.")
+
+        try:
+            tree = AggregationTree.from_state(state)
+            parent = tree.get_parent(state.addr)
+
+            # Aggregate the subtree (own model and partial aggregations of the children)
+            check_early_stop(state)
+            subtree_model = aggregator.wait_and_get_aggregation()
+
+            check_early_stop(state)
+            if parent is None:
+                logger.info(state.addr, "🌳 Aggregated model at the root of the tree.")
+                learner.set_model(subtree_model)
+            else:
+                # Send it up and wait for the aggregated model
+                TreeAggregationStage.__send_to_parent(state, communication_protocol, subtree_model, parent)
+                logger.info(state.addr, f"⏳ Waiting the aggregated model from {parent}.")
+                if not state.aggregated_model_event.wait(timeout=Settings.AGGREGATION_TIMEOUT):
+                    logger.warning(state.addr, "⏰ Aggregated model not received. Using the aggregation of the subtree.")
+                    learner.set_model(subtree_model)
+
+            check_early_stop(state)
+            state.aggregated_model_event.set()
+
+            # Share that aggregation is done and push the model down
+            communication_protocol.broadcast(communication_protocol.build_msg(ModelsReadyCommand.get_name(), [], round=state.round))
+            TreeAggregationStage.__send_to_children(state, communication_protocol, learner, tree.get_children(state.addr))
+
+            # Next stage (neighbors out of the train set)
+            return StageFactory.get_stage("GossipModelStage")
+        except EarlyStopException:
+            return None
+
+    @staticmethod
+    def __send_to_parent(
+        state: NodeState,
+        communication_protocol: CommunicationProtocol,
+        model: P2PFLModel,
+        parent: str,
+    ) -> None:
+        contributors = model.get_contributors()
+
+        def early_stopping_fn() -> bool:
+            # The parent can push the aggregated model down without this subtree (timeout)
+            return state.round is None or state.aggregated_model_event.is_set()
+
+        def get_candidates_fn() -> List[str]:
+            aggregated = state.models_aggregated.get(parent, [])
+            return [] if all(n in aggregated for n in contributors) else [parent]
+
+        def status_fn() -> Any:
+            return state.models_aggregated.get(parent, [])
+
+        def model_fn(node: str) -> Any:
+            if state.round is None:
+                raise Exception("Round not initialized.")
+            return communication_protocol.build_weights(
+                PartialModelCommand.get_name(),
+                state.round,
+                model.encode_parameters(delta=node not in state.delta_base_missing),
+                contributors,
+                model.get_num_samples(),
+            )
+
+        communication_protocol.gossip_weights(
+            early_stopping_fn,
+            get_candidates_fn,
+            status_fn,
+            model_fn,
+            create_connection=True,
+        )
+
+    @staticmethod
+    def __send_to_children(
+        state: NodeState,
+        communication_protocol: CommunicationProtocol,
+        learner: Learner,
+        children: List[str],
+    ) -> None:
+        fixed_round = state.round
+        if fixed_round is None:
+            raise Exception("Round not initialized.")
+
+        def get_candidates_fn() -> List[str]:
+            return [n for n in children if state.nei_status.get(n, -1) < fixed_round]
+
+        def status_fn() -> Any:
+            return get_candidates_fn()
+
+        def model_fn(node: str) -> Any:
+            if state.round is None:
+                raise Exception("Round not initialized.")
+            encoded_model = learner.get_model().encode_parameters(delta=node not in state.delta_base_missing)
+            return communication_protocol.build_weights(FullModelCommand.get_name(), state.round, encoded_model)
+
+        communication_protocol.gossip_weights(
+            lambda: check_early_stop(state, raise_exception=False),
+            get_candidates_fn,
+            status_fn,
+            model_fn,
+            create_connection=True,
+        )
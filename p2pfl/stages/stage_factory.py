@@ -51,6 +51,18 @@ class StageFactory:
             from p2pfl.stages.base_node.train_stage import TrainStage
 
             return TrainStage
+        elif stage_name == "AsyncTrainStage":
+            from p2pfl.stages.base_node.async_train_stage import AsyncTrainStage
+
+            return AsyncTrainStage
+        elif stage_name == "RingAllReduceStage":
+            from p2pfl.stages.base_node.ring_all_reduce_stage import RingAllReduceStage
+
+            return RingAllReduceStage
+        elif stage_name == "TreeAggregationStage":
+            from p2pfl.stages.base_node.tree_aggregation_stage import TreeAggregationStage
+
+            return TreeAggregationStage
         elif stage_name == "VoteTrainSetStage":
             from p2pfl.stages.base_node.vote_train_set_stage import VoteTrainSetStage
 
@@ -17,9 +17,12 @@
 #
 """P2PFL communication tests."""
 
+import threading
 import time
-from typing import Type
+import zlib
+from typing import Any, Dict, Type
 
+import grpc
 import pytest
 
 from p2pfl.communication.commands.command import Command
@@ -29,7 +32,10 @@ from p2pfl.communication.protocols.exceptions import (
     NeighborNotConnectedError,
     ProtocolNotStartedError,
 )
+from p2pfl.communication.protocols.grpc import compression
+from p2pfl.communication.protocols.grpc.async_grpc_communication_protocol import AsyncGrpcCommunicationProtocol
 from p2pfl.communication.protocols.grpc.grpc_communication_protocol import GrpcCommunicationProtocol
+from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
 from p2pfl.communication.protocols.memory.memory_communication_protocol import InMemoryCommunicationProtocol
 from p2pfl.settings import Settings
 from p2pfl.utils.utils import set_test_settings, wait_convergence
@@ -54,7 +60,7 @@ class MockCommand(Command):
         self.flag = True
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_connect_invalid_node(protocol_class):
     """Test that a node can't connect to an invalid node."""
     protocol1 = protocol_class()
@@ -65,7 +71,7 @@ def test_connect_invalid_node(protocol_class):
     protocol1.stop()
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_basic_communication(protocol_class: Type[CommunicationProtocol]):
     """Test the start and stop methods."""
     # Create 2 communication protocols
@@ -122,7 +128,7 @@ def test_basic_communication(protocol_class: Type[CommunicationProtocol]):
     protocol2.stop()
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_neightboor_management_and_gossip(protocol_class: Type[CommunicationProtocol]):
     """Test the neighbor management."""
     # Create the protocols
@@ -192,7 +198,7 @@ def test_neightboor_management_and_gossip(protocol_class: Type[CommunicationProt
     protocol5.stop()
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_node_abrupt_down(protocol_class: Type[CommunicationProtocol]):
     """Test that a node abruptly down is removed from the neighbors list."""
     # Create 2 communication protocols
@@ -224,3 +230,205 @@ def test_node_abrupt_down(protocol_class: Type[CommunicationProtocol]):
 
     # Stop the protocol 1
     protocol1.stop()
+
+
+class MockWeightsCommand(Command):
+    """Mock weights command for testing purposes."""
+
+    def __init__(self) -> None:
+        """Initialize the mock command."""
+        self.weights = None
+        self.kwargs: Dict[str, Any] = {}
+        self.calls = 0
+        self.admitted = True
+
+    @staticmethod
+    def get_name() -> str:
+        """Get the name of the command."""
+        return "mock_weights_command"
+
+    def admit(self, source, round, **kwargs) -> bool:
+        """Check if the weights are needed."""
+        return self.admitted
+
+    def execute(self, source, round, weights=None, **kwargs) -> bool:
+        """Execute the command."""
+        self.weights = weights
+        self.kwargs = kwargs
+        self.calls += 1
+        return True
+
+
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol])
+def test_grpc_weights_streaming(protocol_class: Type[CommunicationProtocol]):
+    """Test that models larger than a chunk are streamed."""
+    chunk_size = Settings.GRPC_CHUNK_SIZE
+    Settings.GRPC_CHUNK_SIZE = 1000
+    try:
+        protocol1 = protocol_class()
+        protocol2 = protocol_class()
+        protocol1.start()
+        protocol2.start()
+        command = MockWeightsCommand()
+        protocol2.add_command(command)
+        assert protocol1.connect(protocol2.get_address()) is True
+
+        # Several chunks, the last one partial
+        weights = bytes(range(256)) * 20
+        protocol1.send(protocol2.get_address(), protocol1.build_weights(command.get_name(), 1, weights, ["a"], 3), raise_error=True)
+        assert command.weights == weights
+        assert isinstance(command.weights, bytearray)  # preallocated buffer
+
+        # Index of the chunk of the parameters (ring all-reduce) in the header
+        msg = protocol1.build_weights(command.get_name(), 1, weights[::-1], ["a"], 3, chunk_index=5)
+        protocol1.send(protocol2.get_address(), msg, raise_error=True)
+        assert command.kwargs["chunk_index"] == 5
+
+        # Corrupted model
+        header = protocol1.build_weights(command.get_name(), 1, b"", ["a"], 3)
+        chunks = [
+            node_pb2.WeightsChunk(header=node_pb2.WeightsHeader(message=header, size=4)),
+            node_pb2.WeightsChunk(data=b"1234"),
+            node_pb2.WeightsChunk(trailer=node_pb2.WeightsTrailer(crc32=zlib.crc32(b"1235"))),
+        ]
+        with grpc.insecure_channel(protocol2.get_address()) as channel:
+            response = node_pb2_grpc.NodeServicesStub(channel).send_stream(iter(chunks))
+        assert response.error
+
+        protocol1.stop()
+        protocol2.stop()
+    finally:
+        Settings.GRPC_CHUNK_SIZE = chunk_size
+
+
+def test_grpc_weights_compression():
+    """Test that the compression of the weights is agreed in the handshake."""
+    assert compression.negotiate(["unknown", "zlib"]) == ""  # disabled
+    compression_setting = Settings.WEIGHTS_COMPRESSION
+    Settings.WEIGHTS_COMPRESSION = "zlib"
+    try:
+        assert compression.get_supported_compressions()[0] == "zlib"
+        assert compression.negotiate(["unknown", "zlib"]) == "zlib"
+        assert compression.decompress(compression.compress(b"weights" * 100, "zlib"), "zlib") == b"weights" * 100
+
+        protocol1 = GrpcCommunicationProtocol()
+        protocol2 = GrpcCommunicationProtocol()
+        protocol1.start()
+        protocol2.start()
+        command = MockWeightsCommand()
+        protocol2.add_command(command)
+        assert protocol1.connect(protocol2.get_address()) is True
+        assert protocol1._neighbors.get_compression(protocol2.get_address()) == "zlib"
+        assert protocol2._neighbors.get_compression(protocol1.get_address()) == "zlib"
+
+        weights = bytes(10000)
+        protocol1.send(protocol2.get_address(), protocol1.build_weights(command.get_name(), 1, weights, ["a"], 3), raise_error=True)
+        assert command.weights == weights
+
+        protocol1.stop()
+        protocol2.stop()
+    finally:
+        Settings.WEIGHTS_COMPRESSION = compression_setting
+
+
+def test_grpc_weights_dedup():
+    """Test that weights already taken by the receiver are not transferred again."""
+    chunk_size = Settings.GRPC_CHUNK_SIZE
+    Settings.GRPC_CHUNK_SIZE = 1000
+    try:
+        protocol1 = GrpcCommunicationProtocol()
+        protocol2 = GrpcCommunicationProtocol()
+        protocol3 = GrpcCommunicationProtocol()
+        protocol1.start()
+        protocol2.start()
+        protocol3.start()
+        command = MockWeightsCommand()
+        protocol2.add_command(command)
+        assert protocol1.connect(protocol2.get_address()) is True
+        assert protocol3.connect(protocol2.get_address()) is True
+
+        # Same model from several neighbors (streamed and not streamed)
+        weights = bytes(range(256)) * 20
+        protocol1.send(protocol2.get_address(), protocol1.build_weights(command.get_name(), 1, weights, ["a"], 3), raise_error=True)
+        protocol3.send(protocol2.get_address(), protocol3.build_weights(command.get_name(), 1, weights, ["a"], 3), raise_error=True)
+        protocol1.send(protocol2.get_address(), protocol1.build_weights(command.get_name(), 1, weights[:100], ["a"], 3), raise_error=True)
+        protocol3.send(protocol2.get_address(), protocol3.build_weights(command.get_name(), 1, weights[:100], ["a"], 3), raise_error=True)
+        assert command.calls == 2
+
+        # Only skipped in the same round
+        protocol1.send(protocol2.get_address(), protocol1.build_weights(command.get_name(), 2, weights, ["a"], 3), raise_error=True)
+        assert command.calls == 3
+
+        # Not needed (discarded before the transfer)
+        command.admitted = False
+        protocol1.send(protocol2.get_address(), protocol1.build_weights(command.get_name(), 3, weights, ["a"], 3), raise_error=True)
+        assert command.calls == 3
+
+        protocol1.stop()
+        protocol2.stop()
+        protocol3.stop()
+    finally:
+        Settings.GRPC_CHUNK_SIZE = chunk_size
+
+
+class BlockingWeightsCommand(MockWeightsCommand):
+    """Mock weights command that blocks until it is released."""
+
+    def __init__(self) -> None:
+        """Initialize the mock command."""
+        super().__init__()
+        self.release = threading.Event()
+
+    def execute(self, source, round, weights=None, **kwargs) -> bool:
+        """Execute the command."""
+        self.release.wait()
+        return super().execute(source, round, weights=weights, **kwargs)
+
+
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol])
+def test_grpc_priority_lanes(protocol_class: Type[CommunicationProtocol]):
+    """Test that control messages are not delayed by weights and that the weights queue is bounded."""
+    workers, queue_size = Settings.GRPC_WEIGHTS_WORKERS, Settings.GRPC_WEIGHTS_QUEUE_SIZE
+    Settings.GRPC_WEIGHTS_WORKERS, Settings.GRPC_WEIGHTS_QUEUE_SIZE = 1, 1
+    try:
+        protocol1 = protocol_class()
+        protocol2 = protocol_class()
+        protocol1.start()
+        protocol2.start()
+        weights_command = BlockingWeightsCommand()
+        command = MockCommand()
+        protocol2.add_command([weights_command, command])
+        assert protocol1.connect(protocol2.get_address()) is True
+
+        # One model in process and one queued
+        senders = []
+        for i in range(2):
+            msg = protocol1.build_weights(weights_command.get_name(), 1, bytes([i]) * 100, ["a"], 3)
+            senders.append(threading.Thread(target=protocol1.send, args=(protocol2.get_address(), msg)))
+            senders[-1].start()
+            time.sleep(0.5)
+        assert protocol2._server.get_queue_depth() == {"control": 0, "weights": 1}
+
+        # Control messages are executed meanwhile
+        protocol1.send(protocol2.get_address(), protocol1.build_msg(command.get_name()), raise_error=True)
+        time.sleep(0.5)
+        assert command.flag is True
+
+        # Queue full (discarded)
+        protocol1.send(
+            protocol2.get_address(),
+            protocol1.build_weights(weights_command.get_name(), 1, bytes([2]) * 100, ["a"], 3),
+            raise_error=True,
+        )
+        assert weights_command.calls == 0
+
+        weights_command.release.set()
+        for sender in senders:
+            sender.join()
+        assert weights_command.calls == 2
+        assert protocol2._server.get_queue_depth() == {"control": 0, "weights": 0}
+
+        protocol1.stop()
+        protocol2.stop()
+    finally:
+        Settings.GRPC_WEIGHTS_WORKERS, Settings.GRPC_WEIGHTS_QUEUE_SIZE = workers, queue_size
@@ -0,0 +1,99 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Aggregator throughput benchmarks."""
+
+import time
+from typing import List
+
+import numpy as np
+import pytest
+
+from p2pfl.learning.aggregators.aggregator import Aggregator
+from p2pfl.learning.aggregators.bulyan import Bulyan
+from p2pfl.learning.aggregators.fedavg import FedAvg
+from p2pfl.learning.aggregators.fedmedian import FedMedian
+from p2pfl.learning.aggregators.krum import Krum, MultiKrum
+from p2pfl.learning.aggregators.trimmed_mean import TrimmedMean
+from p2pfl.learning.frameworks.p2pfl_model import DetachedP2PFLModel, P2PFLModel
+
+NUM_PARAMETERS = 100_000
+"""
+Number of parameters of the benchmarked models.
+"""
+MAX_SECONDS = 20
+"""
+Generous bound of a single aggregation (only catches per-coordinate or per-pair Python loops).
+"""
+
+
+class BenchmarkModel(P2PFLModel):
+    """Parameter-only model used as the template of the benchmarked models."""
+
+    def __init__(self, params: List[np.ndarray]) -> None:
+        """Initialize the model."""
+        super().__init__(None, params=params, num_samples=1, contributors=["template"])
+        self.__params = params
+
+    def get_parameters(self) -> List[np.ndarray]:
+        """Get the model parameters."""
+        return self.__params
+
+    def set_parameters(self, params) -> None:
+        """Set the model parameters."""
+        self.__params = params
+
+    def get_framework(self) -> str:
+        """Get the framework."""
+        return "numpy"
+
+
+def __build_models(num_models: int) -> List[P2PFLModel]:
+    rng = np.random.default_rng(0)
+    shapes = [(NUM_PARAMETERS // 2 // 100, 100), (NUM_PARAMETERS // 2,)]
+    template = BenchmarkModel([np.zeros(shape, dtype=np.float32) for shape in shapes])
+    return [
+        DetachedP2PFLModel(
+            template,
+            [rng.standard_normal(shape, dtype=np.float32) for shape in shapes],
+            num_samples=1,
+            contributors=[str(i)],
+        )
+        for i in range(num_models)
+    ]
+
+
+@pytest.mark.parametrize("num_models", [10, 50, 200])
+@pytest.mark.parametrize(
+    "aggregator",
+    [FedAvg, FedMedian, lambda: Krum(num_byzantine=2), lambda: MultiKrum(num_byzantine=2), TrimmedMean, lambda: Bulyan(num_byzantine=2)],
+)
+def test_aggregation_throughput(num_models: int, aggregator) -> None:
+    """Benchmark the aggregation of 10 to 200 models."""
+    agg: Aggregator = aggregator()
+    models = __build_models(num_models)
+
+    start = time.perf_counter()
+    res = agg.aggregate(models)
+    elapsed = time.perf_counter() - start
+
+    throughput = num_models * NUM_PARAMETERS / elapsed / 1e6
+    print(f"{type(agg).__name__}: {num_models} models in {elapsed:.3f}s ({throughput:.1f}M parameters/s)")
+    assert len(res.get_contributors()) == num_models
+    assert all(np.isfinite(layer).all() for layer in res.get_parameters())
+    assert elapsed < MAX_SECONDS
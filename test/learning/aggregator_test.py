@@ -18,14 +18,23 @@
 """Learning tests."""
 
 import contextlib
+import pickle
 import time
 from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
 import pytest
 
+from p2pfl.learning.aggregators.bulyan import Bulyan
 from p2pfl.learning.aggregators.fedavg import FedAvg
-from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.learning.aggregators.fedbuff import FedBuff, staleness_weight
+from p2pfl.learning.aggregators.fedmedian import FedMedian
+from p2pfl.learning.aggregators.krum import Krum, MultiKrum, pairwise_distances
+from p2pfl.learning.aggregators.trimmed_mean import TrimmedMean
+from p2pfl.learning.frameworks.exceptions import ModelNotMatchingError
+from p2pfl.learning.frameworks.flat_parameters import FlatParameters
+from p2pfl.learning.frameworks.p2pfl_model import DetachedP2PFLModel, P2PFLModel
+from p2pfl.settings import Settings
 
 # Import PyTorch models if available
 with contextlib.suppress(ImportError):
@@ -80,6 +89,50 @@ def test_avg_simple():
     assert set(res.get_contributors()) == {"1", "2", "3"}
 
 
+def test_flat_parameters():
+    """Test the flat buffers of the parameters."""
+    params = [np.ones((2, 3), dtype=np.float32), np.array(5), np.arange(4, dtype=np.float32)]
+    flat = FlatParameters(params)
+    assert flat.get_buffer().size == 10
+    assert np.shares_memory(flat[0], flat.get_buffer()) and np.shares_memory(flat[2], flat.get_buffer())
+    assert all(np.array_equal(a, b) for a, b in zip(flat, params))
+
+    # Fused (same layer table) and layer by layer
+    accum = FlatParameters(params, zeros=True)
+    accum.add_scaled(flat, 2.0)
+    accum.add_scaled(params, 1.0)
+    accum.divide(3)
+    assert all(np.allclose(a, b) for a, b in zip(accum, params))
+
+    # Pickled as a plain list
+    unpickled = pickle.loads(pickle.dumps(accum))
+    assert type(unpickled) is list and all(np.array_equal(a, b) for a, b in zip(unpickled, accum))
+
+
+def test_flat_parameters_chunked():
+    """Test that operations split in chunks (threads) match the operations over the whole buffer."""
+    rng = np.random.default_rng(0)
+    params = [rng.random((7, 5), dtype=np.float32), rng.random(13, dtype=np.float32), np.arange(3)]
+    weights = [1.0, 3.0, 0.5]
+
+    def aggregate() -> List[np.ndarray]:
+        accum = FlatParameters(params, zeros=True)
+        accum.add_scaled(FlatParameters(params), weights[0])
+        accum.add_scaled([layer * 2 for layer in params], weights[1])
+        accum.add_scaled(params, weights[2])
+        accum.divide(sum(weights))
+        return accum
+
+    expected = aggregate()
+    workers, chunk_size = Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_CHUNK_SIZE
+    Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_CHUNK_SIZE = 4, 4
+    try:
+        result = aggregate()
+    finally:
+        Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_CHUNK_SIZE = workers, chunk_size
+    assert all(np.allclose(a, b) for a, b in zip(result, expected))
+
+
 def test_avg_complex():
     """Test complex aggregation (models)."""
     # Initial Model
@@ -113,6 +166,64 @@ def test_avg_complex():
     assert set(res.get_contributors()) == {"1", "2", "3"}
 
 
+def test_detached_models():
+    """Test that received and aggregated models only hold the parameters until they are set on the model."""
+    model = LightningModel(MLP(), num_samples=1, contributors=["1"])
+    params = [layer.copy() for layer in model.get_parameters()]
+
+    # Received model (decoded without copying the framework model)
+    encoded_params = model.encode_parameters([layer + 2.0 for layer in params])
+    received = model.build_detached_copy(params=encoded_params, num_samples=1, contributors=["2"])
+    assert isinstance(received, DetachedP2PFLModel)
+    assert received.get_model() is None
+    assert received.get_framework() == model.get_framework()
+    with pytest.raises(ModelNotMatchingError):
+        model.build_detached_copy(params=params[:-1])
+
+    # Aggregations of detached models are also detached
+    res = FedAvg().aggregate([model, received])
+    assert isinstance(res, DetachedP2PFLModel)
+
+    # Bind
+    model.bind(res)
+    for i, layer in enumerate(model.get_parameters()):
+        assert np.allclose(layer, params[i] + 1.0, atol=1e-6)
+    assert set(model.get_contributors()) == {"1", "2"}
+    assert model.get_num_samples() == 2
+
+
+def test_incremental_avg():
+    """Test that the incremental FedAvg folds the received models as they arrive."""
+    model = LightningModel(MLP(), num_samples=1, contributors=["1"])
+    received = [
+        model.build_detached_copy(params=[layer + i for layer in model.get_parameters()], num_samples=i, contributors=[str(i)])
+        for i in range(2, 5)
+    ]
+    expected = FedAvg().aggregate([model, *received])
+
+    aggregator = FedAvg(incremental=True)
+    aggregator.set_nodes_to_aggregate(["1", "2", "3", "4"])
+    aggregator.add_model(model)
+    for m in received:
+        aggregator.add_model(m)
+    assert set(aggregator.get_aggregated_models()) == {"1", "2", "3", "4"}
+    assert aggregator.get_folded_model().get_num_samples() == 9
+
+    # Partial aggregations still exclude the local model
+    partial = aggregator.get_model(["2"])
+    assert partial.get_contributors() == ["1"]
+    partial = aggregator.get_model(["1"])
+    assert set(partial.get_contributors()) == {"2", "3", "4"}
+
+    res = aggregator.wait_and_get_aggregation(timeout=1)
+    for layer, expected_layer in zip(res.get_parameters(), expected.get_parameters()):
+        assert np.allclose(layer, expected_layer, atol=1e-5)
+    assert set(res.get_contributors()) == {"1", "2", "3", "4"}
+
+    aggregator.clear()
+    assert aggregator.get_aggregated_models() == []
+
+
 def test_aggregator_lifecycle():
     """Test the aggregator lock."""
     aggregator = FedAvg()
@@ -132,6 +243,12 @@ def test_aggregator_lifecycle():
     # Check if the model was added
     assert aggregator.get_aggregated_models() == ["node1"]
 
+    # Models are checked before decoding them
+    assert not aggregator.is_model_needed(["node1"])
+    assert not aggregator.is_model_needed(["node2", "node4"])
+    assert not aggregator.is_model_needed([])
+    assert aggregator.is_model_needed(["node2", "node3"])
+
     # Add the rest of the models
     model23 = LightningModel(MLP(), num_samples=1, contributors=["node2", "node3"])
     aggregator.add_model(model23)
@@ -153,10 +270,173 @@ def test_aggregator_lifecycle():
     assert aggregator.get_aggregated_models() == []
 
 
-"""
+def test_contributor_bookkeeping():
+    """Test the contributors of the aggregation with a large train set."""
+    nodes = [f"node{i}" for i in range(300)]
+    aggregator = FedAvg()
+    aggregator.set_nodes_to_aggregate(nodes)
+    for i in range(0, 270, 3):
+        model = P2PFLModelMock(None, params=[np.ones(2)], num_samples=1, contributors=nodes[i : i + 3])
+        assert len(aggregator.add_model(model)) == i + 3
+
+    # Overlapping and unknown contributors are rejected
+    assert aggregator.add_model(P2PFLModelMock(None, params=[np.ones(2)], num_samples=1, contributors=["node0", "node280"])) == []
+    assert aggregator.add_model(P2PFLModelMock(None, params=[np.ones(2)], num_samples=1, contributors=["node280", "unknown"])) == []
+    assert aggregator.get_missing_models() == set(nodes[270:])
+    assert not aggregator._finish_aggregation_event.is_set()
+
+    aggregator.add_model(P2PFLModelMock(None, params=[np.ones(2)], num_samples=1, contributors=nodes[270:]))
+    assert aggregator.get_missing_models() == set()
+    assert sorted(aggregator.get_aggregated_models()) == sorted(nodes)
+    assert aggregator._finish_aggregation_event.is_set()
+
+
+def test_partial_aggregations():
+    """Test the partial aggregations (subtracted from the total and memoized until a model is added)."""
+    rng = np.random.default_rng(0)
+    models = [P2PFLModelMock(None, params=[rng.random((4, 3)), rng.random(5)], num_samples=i + 1, contributors=[str(i)]) for i in range(6)]
+    aggregator = FedAvg()
+    aggregator.set_nodes_to_aggregate([str(i) for i in range(6)])
+    for m in models[:5]:
+        aggregator.add_model(m)
+
+    partial_model = aggregator.get_model(["0", "3"])
+    expected = FedAvg().aggregate([models[i] for i in [1, 2, 4]])
+    assert all(np.allclose(a, b) for a, b in zip(partial_model.get_parameters(), expected.get_parameters()))
+    assert set(partial_model.get_contributors()) == {"1", "2", "4"}
+    assert partial_model.get_num_samples() == 2 + 3 + 5
+
+    # Memoized by the excluded contributors
+    assert aggregator.get_model(["3", "0"]) is partial_model
+    assert aggregator.get_model(["0", "3", "5"]) is partial_model
+
+    # Most of the models excluded
+    partial_model = aggregator.get_model(["0", "1", "2", "3"])
+    assert np.allclose(partial_model.get_parameters()[0], models[4].get_parameters()[0])
+
+    # Adding a model invalidates the partial aggregations
+    aggregator.add_model(models[5])
+    partial_model = aggregator.get_model(["0", "3"])
+    expected = FedAvg().aggregate([models[i] for i in [1, 2, 4, 5]])
+    assert all(np.allclose(a, b) for a, b in zip(partial_model.get_parameters(), expected.get_parameters()))
+
+
 def test_median_simple():
-    raise NotImplementedError
+    """Test median aggregation (simple arrays)."""
+    models = [
+        P2PFLModelMock(None, params=[np.array([1.0, 8.0, 3.0])], num_samples=1, contributors=["1"]),
+        P2PFLModelMock(None, params=[np.array([4.0, 5.0, 6.0])], num_samples=1, contributors=["2"]),
+        P2PFLModelMock(None, params=[np.array([7.0, 2.0, 9.0])], num_samples=1, contributors=["3"]),
+    ]
+    aggregator = FedMedian()
+    assert not aggregator.partial_aggregation
+    res = aggregator.aggregate(models)
+    assert np.array_equal(res.get_parameters()[0], np.array([4, 5, 6]))
+    assert set(res.get_contributors()) == {"1", "2", "3"}
+
+    # Even number of models (mean of the middle values)
+    models.append(P2PFLModelMock(None, params=[np.array([0.0, 0.0, 0.0])], num_samples=1, contributors=["4"]))
+    res = aggregator.aggregate(models)
+    assert np.allclose(res.get_parameters()[0], np.array([2.5, 3.5, 4.5]))
+
 
 def test_median_complex():
-    raise NotImplementedError
-"""
+    """Test median aggregation by blocks (random arrays)."""
+    rng = np.random.default_rng(0)
+    for num_models in [4, 5]:
+        weights = [[rng.random((7, 5), dtype=np.float32), rng.random(13, dtype=np.float32)] for _ in range(num_models)]
+        models = [P2PFLModelMock(None, params=w, num_samples=1, contributors=[str(i)]) for i, w in enumerate(weights)]
+
+        workers, chunk_size = Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_CHUNK_SIZE
+        Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_CHUNK_SIZE = 3, 4
+        try:
+            res = FedMedian(chunk_size=3).aggregate(models)
+        finally:
+            Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_CHUNK_SIZE = workers, chunk_size
+
+        for i, layer in enumerate(res.get_parameters()):
+            assert np.allclose(layer, np.median([w[i] for w in weights], axis=0))
+
+
+def __byzantine_models(num_honest: int, num_byzantine: int) -> List[P2PFLModel]:
+    rng = np.random.default_rng(0)
+    models: List[P2PFLModel] = []
+    for i in range(num_honest + num_byzantine):
+        scale = 100.0 if i >= num_honest else 1.0
+        params = [1 + scale * rng.standard_normal((6, 5)), 1 + scale * rng.standard_normal(7)]
+        models.append(P2PFLModelMock(None, params=params, num_samples=1, contributors=[str(i)]))
+    return models
+
+
+def test_pairwise_distances():
+    """Test the distances between models (Gram matrix by blocks)."""
+    models = __byzantine_models(5, 0)
+    weights = [m.get_parameters() for m in models]
+    flat = np.array([np.concatenate([layer.reshape(-1) for layer in w]) for w in weights])
+    expected = ((flat[:, None, :] - flat[None, :, :]) ** 2).sum(axis=2)
+    assert np.allclose(pairwise_distances(weights, chunk_size=4), expected)
+
+
+def test_krum():
+    """Test Krum and Multi-Krum (byzantine models are never selected)."""
+    models = __byzantine_models(7, 2)
+    res = Krum(num_byzantine=2, chunk_size=8).aggregate(models)
+    assert any(all(np.array_equal(a, b) for a, b in zip(res.get_parameters(), m.get_parameters())) for m in models[:7])
+    assert set(res.get_contributors()) == {str(i) for i in range(9)}
+
+    # Multi-Krum averages the n - f best models (the honest ones)
+    res = MultiKrum(num_byzantine=2).aggregate(models)
+    expected = FedAvg().aggregate(models[:7])
+    assert all(np.allclose(a, b) for a, b in zip(res.get_parameters(), expected.get_parameters()))
+    assert not Krum().partial_aggregation and not MultiKrum().partial_aggregation
+
+
+def test_trimmed_mean():
+    """Test the coordinate-wise trimmed mean."""
+    models = [
+        P2PFLModelMock(None, params=[np.array([1.0, -50.0, 3.0])], num_samples=1, contributors=["1"]),
+        P2PFLModelMock(None, params=[np.array([2.0, 2.0, 4.0])], num_samples=1, contributors=["2"]),
+        P2PFLModelMock(None, params=[np.array([3.0, 3.0, 500.0])], num_samples=1, contributors=["3"]),
+        P2PFLModelMock(None, params=[np.array([100.0, 4.0, 5.0])], num_samples=1, contributors=["4"]),
+    ]
+    res = TrimmedMean(beta=0.25, chunk_size=2).aggregate(models)
+    assert np.allclose(res.get_parameters()[0], np.array([2.5, 2.5, 4.5]))
+    assert set(res.get_contributors()) == {"1", "2", "3", "4"}
+
+    # Without trimming, it is the mean
+    res = TrimmedMean(beta=0).aggregate(models)
+    assert np.allclose(res.get_parameters()[0], np.mean([m.get_parameters()[0] for m in models], axis=0))
+
+
+def test_bulyan():
+    """Test Bulyan (the result is close to the honest models)."""
+    models = __byzantine_models(9, 2)
+    res = Bulyan(num_byzantine=2, chunk_size=8).aggregate(models)
+    honest = FedAvg().aggregate(models[:9]).get_parameters()
+    assert all(np.abs(a - b).max() < 2 for a, b in zip(res.get_parameters(), honest))
+    assert set(res.get_contributors()) == {str(i) for i in range(11)}
+    assert not Bulyan().partial_aggregation
+
+
+def test_fedbuff():
+    """Test that FedBuff applies the buffered updates, discounted by their staleness."""
+    model = P2PFLModelMock(None, params=[np.array([1.0, 1.0])], num_samples=1, contributors=["0"])
+    aggregator = FedBuff(buffer_size=2, server_lr=1.0, staleness_exponent=1.0)
+    assert aggregator.asynchronous and not aggregator.partial_aggregation
+
+    # Not enough updates
+    aggregator.add_update(P2PFLModelMock(None, params=[np.array([1.0, 0.0])], num_samples=1, contributors=["1"]), 3)
+    assert aggregator.apply_updates(model, 3) is None
+
+    # Fresh update (weight 1) and an update 1 round old (weight 1/2), averaged by samples
+    aggregator.add_update(P2PFLModelMock(None, params=[np.array([0.0, 4.0])], num_samples=3, contributors=["2"]), 2)
+    res = aggregator.apply_updates(model, 3)
+    assert res is not None
+    assert np.allclose(res.get_parameters()[0], np.array([1.0 + 1 / 4, 1.0 + 3 / 4 * 4 / 2]))
+    assert set(res.get_contributors()) == {"1", "2"}
+    assert aggregator.get_buffered_updates() == 0
+
+    # Staleness discount
+    assert staleness_weight(0, 0.5) == 1.0
+    assert staleness_weight(3, 0.5) == 0.5
+    assert staleness_weight(-1, 0.5) == 1.0  # updates from a round ahead
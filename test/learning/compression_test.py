@@ -0,0 +1,258 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2022 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""Compression codecs tests."""
+
+import contextlib
+
+import numpy as np
+import pytest
+
+from p2pfl.learning.aggregators.fedavg import FedAvg
+from p2pfl.learning.compression.codec import CodecPipeline
+from p2pfl.learning.compression.codec_factory import CodecFactory
+from p2pfl.learning.compression.delta_codec import DeltaCodec
+from p2pfl.learning.compression.quantization import StochasticInt8Codec
+from p2pfl.learning.compression.sparsification import SparseParameters, TopKCodec
+from p2pfl.learning.frameworks import serialization
+from p2pfl.learning.frameworks.exceptions import DeltaBaseMissingError
+
+with contextlib.suppress(ImportError):
+    from p2pfl.learning.frameworks.pytorch.lightning_model import MLP, LightningModel
+
+
+def __build_model(seed: int) -> "LightningModel":
+    model = LightningModel(MLP(seed=seed))
+    model.set_codecs(CodecPipeline([DeltaCodec()]))
+    return model
+
+
+def test_delta_codec():
+    """Test delta encoding and decoding against the round base."""
+    base = [np.random.rand(3, 3).astype(np.float32), np.arange(4), np.array([True, False])]
+    sender, receiver = DeltaCodec(), DeltaCodec()
+    sender.on_round_start(base, 1)
+    receiver.on_round_start(base, 1)
+
+    params = [base[0] + 0.5, base[1] + 2, base[2]]
+    encoded, meta = sender.encode(params)
+    assert meta == {"round": 1, "layers": [0, 1]}
+    assert np.allclose(encoded[0], 0.5)
+
+    decoded = receiver.decode(encoded, meta)
+    for layer, decoded_layer in zip(params, decoded):
+        assert np.array_equal(layer, decoded_layer)
+        assert layer.dtype == decoded_layer.dtype
+
+    # Base of another round
+    receiver.on_round_start(base, 2)
+    with pytest.raises(DeltaBaseMissingError):
+        receiver.decode(encoded, meta)
+
+
+def test_delta_codec_no_base():
+    """Test that parameters are sent as they are without a base."""
+    params = [np.ones(3)]
+    encoded, meta = DeltaCodec().encode(params)
+    assert meta is None
+    assert encoded is params
+
+
+def test_delta_encoding_torch():
+    """Test delta-encoded models between nodes sharing the round base."""
+    sender, receiver = __build_model(1), __build_model(2)
+    receiver.set_parameters(sender.get_parameters())
+    sender.get_codecs().on_round_start(sender.get_parameters(), 0)  # type: ignore
+    receiver.get_codecs().on_round_start(receiver.get_parameters(), 0)  # type: ignore
+
+    # Update and send
+    sender.set_parameters([layer + 1 for layer in sender.get_parameters()])
+    encoded_params = sender.encode_parameters()
+    assert serialization.decode_parameters(encoded_params)[2][0]["name"] == "delta"
+
+    model = receiver.build_copy(params=encoded_params)
+    for layer1, layer2 in zip(sender.get_parameters(), model.get_parameters()):
+        assert np.allclose(layer1, layer2)
+
+
+def test_delta_fallback_torch():
+    """Test that nodes without the base receive full weights."""
+    sender, receiver = __build_model(1), __build_model(2)
+    sender.get_codecs().on_round_start(sender.get_parameters(), 0)  # type: ignore
+
+    # Missing base
+    with pytest.raises(DeltaBaseMissingError):
+        receiver.build_copy(params=sender.encode_parameters())
+
+    # Full weights
+    encoded_params = sender.encode_parameters(delta=False)
+    assert serialization.decode_parameters(encoded_params)[2] == []
+    model = receiver.build_copy(params=encoded_params)
+    for layer1, layer2 in zip(sender.get_parameters(), model.get_parameters()):
+        assert np.array_equal(layer1, layer2)
+
+
+@pytest.mark.parametrize(
+    "name,tolerance",
+    [
+        ("fp16", 1e-3),
+        ("bf16", 1e-2),
+        ("bf16_stochastic", 2e-2),
+        ("int8", 2e-2),
+        ("int8_channel", 2e-2),
+        ("int8_stochastic", 3e-2),
+        ("int8_channel_stochastic", 3e-2),
+    ],
+)
+def test_quantization_codecs(name, tolerance):
+    """Test that quantized layers are dequantized to their original dtype."""
+    rng = np.random.default_rng(0)
+    params = [
+        rng.normal(size=(16, 8)).astype(np.float32),
+        rng.normal(size=16),
+        np.zeros((4, 4), dtype=np.float32),
+        np.arange(5),
+        np.float32(3.5) * np.ones(()),
+    ]
+    codec = CodecFactory.create_codec(name)
+    encoded, meta = codec.encode(params)
+    assert meta is not None
+
+    # Any node decodes the payload (stateless codec)
+    payload = serialization.encode_parameters(encoded, {}, codecs=[{"name": name, "meta": meta}])
+    decoded_params, _, codecs = serialization.decode_parameters(payload)
+    decoded = CodecPipeline([]).decode(decoded_params, codecs)
+
+    assert len(decoded) == len(params)
+    for layer, decoded_layer in zip(params, decoded):
+        assert decoded_layer.dtype == layer.dtype
+        assert decoded_layer.shape == layer.shape
+        assert np.allclose(layer, decoded_layer, atol=tolerance * max(1, np.abs(layer).max()))
+    assert np.array_equal(decoded[3], params[3])
+
+
+def test_stochastic_rounding_unbiased():
+    """Test that stochastic rounding is unbiased in expectation."""
+    layer = np.full(1000, 0.3, dtype=np.float32)
+    layer[0] = 1.0  # range
+    codec = StochasticInt8Codec()
+    mean = np.mean([codec.decode(*codec.encode([layer]))[0][1:].mean() for _ in range(20)])  # type: ignore
+    assert abs(mean - 0.3) < 1e-3
+
+
+def test_codec_pipeline_from_names():
+    """Test codec selection by name."""
+    pipeline = CodecFactory.create_pipeline(["delta", "int8_channel"])
+    assert pipeline is not None
+    assert [c.get_name() for c in pipeline.get_codecs()] == ["delta", "int8_channel"]
+    assert CodecFactory.create_pipeline([]) is None
+    with pytest.raises(ValueError):
+        CodecFactory.create_codec("unknown")
+
+
+def test_delta_quantization_torch():
+    """Test delta encoding followed by quantization."""
+    sender, receiver = __build_model(1), __build_model(2)
+    sender.set_codecs(CodecFactory.create_pipeline(["delta", "int8_channel"]))
+    receiver.set_parameters(sender.get_parameters())
+    sender.get_codecs().on_round_start(sender.get_parameters(), 0)  # type: ignore
+    receiver.get_codecs().on_round_start(receiver.get_parameters(), 0)  # type: ignore
+
+    sender.set_parameters([layer + 0.01 for layer in sender.get_parameters()])
+    model = receiver.build_copy(params=sender.encode_parameters())
+    for layer1, layer2 in zip(sender.get_parameters(), model.get_parameters()):
+        assert np.allclose(layer1, layer2, atol=1e-4)
+
+
+def test_topk_error_feedback():
+    """Test that the coordinates that are not sent are added to the next updates."""
+    base = [np.zeros(10, dtype=np.float32), np.array([True])]
+    update = np.arange(1, 11, dtype=np.float32)
+    codec = TopKCodec(ratio=0.5)
+
+    # Largest half of the update
+    codec.on_round_start(base, 0)
+    params = codec.on_local_update([base[0] + update, base[1]])
+    assert isinstance(params, SparseParameters)
+    assert params.get_update().nnz() == 5
+    assert np.array_equal(params[0], np.where(update > 5, update, 0))
+    assert np.array_equal(params[1], base[1])
+
+    # No update, the residual is sent
+    codec.on_round_start(base, 1)
+    params = codec.on_local_update(base)
+    assert np.array_equal(params[0], np.where(update <= 5, update, 0))
+
+
+def test_sparse_encoding():
+    """Test the index/value encoding of sparse models."""
+    base = [np.random.rand(20, 5).astype(np.float32), np.random.rand(4), np.arange(3)]
+    sender, receiver = TopKCodec(ratio=0.1), TopKCodec(ratio=0.1)
+    sender.on_round_start(base, 0)
+    receiver.on_round_start(base, 0)
+
+    params = sender.on_local_update([base[0] + np.random.rand(20, 5).astype(np.float32), base[1] + 1, base[2]])
+    encoded, meta = sender.encode(params)
+    assert meta == {"round": 0, "layers": [0, 1, 2]}
+    assert [layer.size for layer in encoded] == [10, 1, 0, 10, 1, 0]
+
+    decoded = receiver.decode(encoded, meta)
+    assert isinstance(decoded, SparseParameters)
+    assert decoded.get_update().nnz() == 11
+    for layer, decoded_layer in zip(params, decoded):
+        assert np.array_equal(layer, decoded_layer)
+        assert layer.dtype == decoded_layer.dtype
+
+    # Dense differences are sent as they are
+    encoded, meta = sender.encode([base[0] + 1, base[1], base[2]])
+    assert meta == {"round": 0, "layers": [1, 2]}
+    assert np.array_equal(encoded[0], base[0] + 1)
+
+    # Base of another round
+    receiver.on_round_start(base, 1)
+    with pytest.raises(DeltaBaseMissingError):
+        receiver.decode(encoded, meta)
+
+    # Only one codec relative to a base model
+    with pytest.raises(ValueError):
+        CodecPipeline([DeltaCodec(), TopKCodec()])
+
+
+def test_sparse_aggregation_torch():
+    """Test that sparse models are aggregated like dense models."""
+    receiver = __build_model(0)
+    receiver.set_codecs(CodecPipeline([TopKCodec(ratio=0.05)]))
+    receiver.get_codecs().on_round_start(receiver.get_parameters(), 0)  # type: ignore
+
+    models, decoded_models = [], []
+    for seed in [1, 2]:
+        model = receiver.build_copy(params=receiver.get_parameters(), num_samples=seed * 10, contributors=[str(seed)])
+        model.set_codecs(CodecPipeline([TopKCodec(ratio=0.05)]))
+        model.get_codecs().on_round_start(model.get_parameters(), 0)  # type: ignore
+        model.set_parameters(__build_model(seed).get_parameters())
+        model.compress_local_update()
+        models.append(model)
+        decoded_models.append(receiver.build_copy(params=model.encode_parameters(), num_samples=seed * 10, contributors=[str(seed)]))
+
+    assert all(m.get_sparse_update() is not None for m in decoded_models)
+    sparse_aggregation = FedAvg().aggregate(decoded_models)
+    for m in models:
+        m.set_parameters(m.get_parameters())  # drops the sparse representation
+        assert m.get_sparse_update() is None
+    dense_aggregation = FedAvg().aggregate(models)
+    for layer1, layer2 in zip(sparse_aggregation.get_parameters(), dense_aggregation.get_parameters()):
+        assert np.allclose(layer1, layer2, atol=1e-6)
@@ -26,6 +26,7 @@ from datasets import DatasetDict, load_dataset  # type: ignore
 
 from p2pfl.experiment import Experiment
 from p2pfl.learning.dataset.p2pfl_dataset import P2PFLDataset
+from p2pfl.learning.frameworks import serialization
 from p2pfl.learning.frameworks.exceptions import ModelNotMatchingError
 from p2pfl.management.logger import logger
 
@@ -140,6 +141,52 @@ def test_encoding_torch():
     assert additional_info == p2pfl_model1.additional_info
 
 
+def test_encoding_cache_torch():
+    """Test that encoded parameters are reused until the model changes."""
+    p2pfl_model = LightningModel(MLP_PT())
+    encoded_params = p2pfl_model.encode_parameters()
+    assert p2pfl_model.encode_parameters() is encoded_params
+
+    # Setting parameters invalidates the cache
+    version = p2pfl_model.get_version()
+    p2pfl_model.set_parameters([layer + 1 for layer in p2pfl_model.get_parameters()])
+    assert p2pfl_model.get_version() > version
+    new_encoded_params = p2pfl_model.encode_parameters()
+    assert new_encoded_params != encoded_params
+
+    # Adding info invalidates the cache
+    p2pfl_model.add_info("callback", {"a": 1})
+    _, additional_info = p2pfl_model.decode_parameters(p2pfl_model.encode_parameters())
+    assert additional_info == {"callback": {"a": 1}}
+
+
+def test_binary_encoding_views():
+    """Test that binary decoding builds views over the payload."""
+    params = [np.random.rand(4, 3).astype(np.float32), np.arange(5), np.array(1.0)]
+    encoded_params = serialization.encode_parameters(params, {"callback": {"a": 1}})
+    assert serialization.is_binary_payload(encoded_params)
+
+    decoded_params, additional_info, codecs = serialization.decode_parameters(encoded_params)
+    assert codecs == []
+    for layer, decoded_layer in zip(params, decoded_params):
+        assert decoded_layer.dtype == layer.dtype
+        assert np.array_equal(layer, decoded_layer)
+        assert decoded_layer.base is not None and not decoded_layer.flags.writeable
+    assert additional_info == {"callback": {"a": 1}}
+
+
+def test_pickle_encoding_fallback():
+    """Test that pickle-encoded parameters are still decoded."""
+    p2pfl_model1 = LightningModel(MLP_PT())
+    encoded_params = serialization.encode_parameters(p2pfl_model1.get_parameters(), {}, serialization.SerializationFormat.PICKLE)
+    assert not serialization.is_binary_payload(encoded_params)
+
+    p2pfl_model2 = LightningModel(MLP_PT())
+    p2pfl_model2.set_parameters(encoded_params)
+    for layer1, layer2 in zip(p2pfl_model1.get_parameters(), p2pfl_model2.get_parameters()):
+        assert np.array_equal(layer1, layer2)
+
+
 def test_encoding_tensorflow():
     """Test encoding and decoding of parameters."""
     model = MLP_KERAS()
@@ -3,3 +3,73 @@ Test all the stages.
 
 Note: Not necessary for now, node_test.py is enough.
 """
+
+import math
+
+import numpy as np
+
+from p2pfl.stages.base_node.ring_all_reduce_stage import AllReduceRing
+from p2pfl.stages.base_node.tree_aggregation_stage import AggregationTree
+
+
+def test_aggregation_tree():
+    """Test the shape of the aggregation tree."""
+    nodes = [f"node{i}" for i in range(100)]
+    tree = AggregationTree(nodes, round=3, arity=3)
+
+    # Deterministic (same round and train set in any order)
+    assert tree.get_root() == AggregationTree(list(reversed(nodes)), round=3, arity=3).get_root()
+
+    # Bounded fan-in/out and logarithmic depth
+    depths = {}
+    for n in nodes:
+        assert len(tree.get_children(n)) <= 3
+        depth, parent = 0, tree.get_parent(n)
+        while parent is not None:
+            depth, parent = depth + 1, tree.get_parent(parent)
+        depths[n] = depth
+    assert depths[tree.get_root()] == 0
+    assert max(depths.values()) <= math.ceil(math.log(len(nodes), 3))
+
+    # Subtrees of the children of the root cover the train set
+    children_subtrees = [set(tree.get_subtree(c)) for c in tree.get_children(tree.get_root())]
+    assert sum(len(s) for s in children_subtrees) == len(nodes) - 1
+    assert set(tree.get_subtree(tree.get_root())) == set(nodes)
+
+
+def test_all_reduce_ring():
+    """Test that the schedule of the ring all-reduce sums every chunk over the ring."""
+    nodes = [f"node{i}" for i in range(7)]
+    ring = AllReduceRing(list(reversed(nodes)))
+    assert ring.members == nodes
+    assert ring.get_successor("node6") == "node0"
+    assert ring.get_predecessor("node0") == "node6"
+
+    # Simulate the steps (every node sends a chunk to its successor, then receives one from its predecessor)
+    size = 103
+    bounds = ring.get_chunk_bounds(size)
+    vectors = {n: np.random.rand(size) for n in nodes}
+    expected = sum(vectors.values())
+    buffers = {n: v.copy() for n, v in vectors.items()}
+    schedules = {n: ring.get_schedule(n) for n in nodes}
+    sent_sizes = {n: 0 for n in nodes}
+    for step in range(2 * (len(nodes) - 1)):
+        messages = {}
+        for n in nodes:
+            cmd, sent, _ = schedules[n][step]
+            start, end = bounds[sent]
+            messages[ring.get_successor(n)] = (cmd, sent, buffers[n][start:end].copy())
+            sent_sizes[n] += end - start
+        for n in nodes:
+            cmd, sent, received = schedules[n][step]
+            assert messages[n][:2] == (cmd, received)
+            start, end = bounds[received]
+            if cmd == "ring_reduce_scatter":
+                buffers[n][start:end] += messages[n][2]
+            else:
+                buffers[n][start:end] = messages[n][2]
+
+    for n in nodes:
+        assert np.allclose(buffers[n], expected)
+        # Bandwidth: 2 * (n - 1) / n of the model size (up to the rounding of the chunks)
+        assert abs(sent_sizes[n] - 2 * (len(nodes) - 1) * size / len(nodes)) <= 2 * len(nodes)